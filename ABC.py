@@ -1,19 +1,424 @@
+import asyncio
+import bisect
+import concurrent.futures
+import csv
+import datetime
+import functools
+import heapq
+import html
+import inspect
+import io
+import itertools
+import json
+import mmap
+import multiprocessing
+import os
+import pickle
+import queue
+import re
+import struct
+import sys
+import tempfile
+import threading
 import time
-
+import types
+from array import array
+from collections import Counter, OrderedDict
+from collections.abc import Mapping, MutableMapping
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+class Histogram:
+    # Fixed log2 buckets from 1us to ~134s; percentiles are bucket upper bounds
+    BOUNDS = tuple(1e-6 * 2 ** i for i in range(28))
+    __slots__ = ("lock", "count", "errors", "counts", "total")
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.count = 0
+        self.errors = 0
+        self.counts = [0] * (len(self.BOUNDS) + 1)
+        self.total = 0.0
+
+    def observe(self, value, error=False):
+        i = bisect.bisect_left(self.BOUNDS, value)
+        with self.lock:
+            self.count += 1
+            self.errors += error
+            self.counts[i] += 1
+            self.total += value
+
+    def percentile(self, q):
+        if not self.count:
+            return 0.0
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= q * self.count:
+                return self.BOUNDS[i] if i < len(self.BOUNDS) else float("inf")
+
+class MetricsRegistry:
+    def __init__(self):
+        self.enabled = True
+        self._metrics = {}  # name -> Histogram
+        self._lock = threading.Lock()
+
+    def metric(self, name):
+        metric = self._metrics.get(name)
+        if metric is None:
+            with self._lock:
+                metric = self._metrics.setdefault(name, Histogram())
+        return metric
+
+    def observe(self, name, elapsed, error=False):
+        self.metric(name).observe(elapsed, error)
+
+    def snapshot(self):
+        result = {}
+        for name, metric in list(self._metrics.items()):
+            with metric.lock:
+                if not metric.count:
+                    continue
+                result[name] = {"count": metric.count, "errors": metric.errors, "total_s": metric.total,
+                                "p50_s": metric.percentile(0.5), "p95_s": metric.percentile(0.95),
+                                "p99_s": metric.percentile(0.99)}
+        return result
+
+    def reset(self):
+        # zeroed in place: instrumented functions keep a reference to their Histogram
+        for metric in list(self._metrics.values()):
+            with metric.lock:
+                metric.reset()
+
+    def render_text(self):
+        lines = [f"{'operation':<40}{'count':>9}{'errors':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}"]
+        for name, m in sorted(self.snapshot().items()):
+            lines.append(f"{name:<40}{m['count']:>9}{m['errors']:>8}{m['p50_s'] * 1e3:>10.3f}"
+                         f"{m['p95_s'] * 1e3:>10.3f}{m['p99_s'] * 1e3:>10.3f}")
+        return "\n".join(lines) + "\n"
+
+    def render_prometheus(self):
+        lines = ["# TYPE cms_operation_seconds histogram"]
+        errors_total = ["# TYPE cms_operation_errors_total counter"]
+        for name, metric in sorted(self._metrics.items()):
+            with metric.lock:
+                count, errors, counts, total = metric.count, metric.errors, list(metric.counts), metric.total
+            if not count:
+                continue
+            cumulative = 0
+            for bound, n in zip(Histogram.BOUNDS + (float("inf"),), counts):
+                cumulative += n
+                le = "+Inf" if bound == float("inf") else f"{bound:.6g}"
+                lines.append(f'cms_operation_seconds_bucket{{op="{name}",le="{le}"}} {cumulative}')
+            lines.append(f'cms_operation_seconds_sum{{op="{name}"}} {total}')
+            lines.append(f'cms_operation_seconds_count{{op="{name}"}} {count}')
+            errors_total.append(f'cms_operation_errors_total{{op="{name}"}} {errors}')
+        return "\n".join(lines + errors_total) + "\n"
+
+    def dump(self, path, format="text"):
+        data = self.render_prometheus() if format == "prometheus" else self.render_text()
+        tmp = path + ".tmp"
+        with open(tmp, "w") as f:
+            f.write(data)
+        os.replace(tmp, path)
+
+metrics = MetricsRegistry()
+
+def timed(name):
+    def decorate(func):
+        metric = metrics.metric(name)
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def wrapper(*args, **kwargs):
+                if not metrics.enabled:
+                    return await func(*args, **kwargs)
+                start = time.perf_counter()
+                try:
+                    result = await func(*args, **kwargs)
+                except BaseException:
+                    metric.observe(time.perf_counter() - start, True)
+                    raise
+                metric.observe(time.perf_counter() - start)
+                return result
+        else:
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if not metrics.enabled:
+                    return func(*args, **kwargs)
+                start = time.perf_counter()
+                try:
+                    result = func(*args, **kwargs)
+                except BaseException:
+                    metric.observe(time.perf_counter() - start, True)
+                    raise
+                metric.observe(time.perf_counter() - start)
+                return result
+        return wrapper
+    return decorate
+
+def instrument_class(cls):
+    # wraps every public method defined on cls (plain, static, class and async)
+    for attr, value in list(vars(cls).items()):
+        if attr.startswith("_"):
+            continue
+        name = f"{cls.__name__}.{attr}"
+        if isinstance(value, (staticmethod, classmethod)):
+            setattr(cls, attr, type(value)(timed(name)(value.__func__)))
+        elif inspect.isfunction(value):
+            setattr(cls, attr, timed(name)(value))
+    return cls
+
+@timed("get_element_by_id")
 def get_element_by_id(id, db):
     return db.get(id)
 
+class ResultCache:
+    # Memoized read results with LRU/TTL eviction. Each entry records the
+    # dependency tags it was computed from; mutators invalidate exactly those
+    # tags. Results are shared between callers and must be treated as read-only.
+    def __init__(self, maxsize=65536, ttl=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.enabled = True
+        self._entries = OrderedDict()   # key -> (value, expires_at, deps)
+        self._dependents = {}           # dep -> {key, ...}
+        self._epoch = 0                 # bumped by every invalidation
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.evictions = self.expirations = self.invalidations = 0
+
+    def _drop(self, key):
+        # caller holds self._lock
+        _, _, deps = self._entries.pop(key)
+        for dep in deps:
+            keys = self._dependents.get(dep)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._dependents[dep]
+
+    def fetch(self, key, deps, compute):
+        if not self.enabled:
+            return compute()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[1] is None or entry[1] > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry[0]
+                self._drop(key)
+                self.expirations += 1
+            self.misses += 1
+            epoch = self._epoch
+        value = compute()
+        with self._lock:
+            # an invalidation while computing may have made value stale: don't keep it
+            if self._epoch == epoch and key not in self._entries:
+                expires = time.monotonic() + self.ttl if self.ttl is not None else None
+                self._entries[key] = (value, expires, deps)
+                for dep in deps:
+                    self._dependents.setdefault(dep, set()).add(key)
+                while len(self._entries) > self.maxsize:
+                    self._drop(next(iter(self._entries)))
+                    self.evictions += 1
+        return value
+
+    def invalidate(self, *deps):
+        with self._lock:
+            self._epoch += 1
+            for dep in deps:
+                for key in list(self._dependents.get(dep, ())):
+                    self._drop(key)
+                    self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._epoch += 1
+            self._entries.clear()
+            self._dependents.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {"size": len(self._entries), "maxsize": self.maxsize, "hits": self.hits, "misses": self.misses,
+                    "hit_rate": self.hits / lookups if lookups else 0.0, "evictions": self.evictions,
+                    "expirations": self.expirations, "invalidations": self.invalidations}
+
+result_cache = ResultCache()
+
+def cached(*deps):
+    # Memoizes a read method in self.cache. deps are callables (self, *args)
+    # returning the dependency tag (or a list of tags) that the method's
+    # mutators invalidate.
+    def decorate(func):
+        name = func.__qualname__
+        @functools.wraps(func)
+        def wrapper(self, *args):
+            tags = []
+            for dep in deps:
+                tag = dep(self, *args)
+                if isinstance(tag, list):
+                    tags.extend(tag)
+                else:
+                    tags.append(tag)
+            return self.cache.fetch((name, self, args), tuple(tags), lambda: func(self, *args))
+        return wrapper
+    return decorate
+
 def display_db(db):
     for key, value in db.items():
         print(f"{key} : {value}")
 
+class OutputSink:
+    # Where entities send their event records: {"event", "entity", "message", ...fields}
+    def emit(self, record):
+        raise NotImplementedError
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.flush()
+
+class PrintSink(OutputSink):
+    # the plain-text output the entities have always printed
+    def emit(self, record):
+        print(record["message"])
+
+class NullSink(OutputSink):
+    def emit(self, record):
+        pass
+
+class JsonLinesSink(OutputSink):
+    def __init__(self, stream=None, batch_size=1000, background=False):
+        self._owns_stream = isinstance(stream, str)
+        self.stream = open(stream, "a", encoding="utf-8") if self._owns_stream else (stream if stream is not None else sys.stdout)
+        self.batch_size = batch_size
+        self._encoder = json.JSONEncoder(default=str, ensure_ascii=False)
+        self._buffer = []
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._queue = None
+        if background:
+            self._queue = queue.Queue()
+            self._writer = threading.Thread(target=self._run, daemon=True)
+            self._writer.start()
+
+    def emit(self, record):
+        record["ts"] = time.time()
+        with self._lock:
+            self._buffer.append(record)
+            if len(self._buffer) < self.batch_size:
+                return
+            batch, self._buffer = self._buffer, []
+        self._submit(batch)
+
+    def _submit(self, batch):
+        if self._queue is not None:
+            self._queue.put(batch)
+        else:
+            self._write(batch)
+
+    def _write(self, batch):
+        data = "".join(self._encoder.encode(record) + "\n" for record in batch)
+        with self._write_lock:
+            self.stream.write(data)
+            self.stream.flush()
+
+    def _run(self):
+        while True:
+            batch = self._queue.get()
+            if batch is not None:
+                self._write(batch)
+            self._queue.task_done()
+            if batch is None:
+                break
+
+    def flush(self):
+        with self._lock:
+            batch, self._buffer = self._buffer, []
+        if batch:
+            self._submit(batch)
+        if self._queue is not None:
+            self._queue.join()
+
+    def close(self):
+        self.flush()
+        if self._queue is not None:
+            self._queue.put(None)
+            self._writer.join()
+            self._queue = None
+        if self._owns_stream:
+            self.stream.close()
+
+class MembershipRegistry:
+    # Reverse index student_id -> everything the student belongs to. Entities
+    # link/unlink themselves as members join and leave.
+    def __init__(self):
+        self._affiliations = {}  # student_id -> {(kind, entity, detail): None}
+        self._lock = threading.Lock()
+
+    def link(self, student_id, kind, entity, detail=None):
+        with self._lock:
+            self._affiliations.setdefault(student_id, {})[(kind, entity, detail)] = None
+
+    def unlink(self, student_id, kind, entity, detail=None):
+        with self._lock:
+            links = self._affiliations.get(student_id)
+            if links is not None:
+                links.pop((kind, entity, detail), None)
+                if not links:
+                    del self._affiliations[student_id]
+
+    def affiliations(self, student_id):
+        with self._lock:
+            links = list(self._affiliations.get(student_id, ()))
+        return [{"kind": kind, "entity": entity.name, "detail": detail} for kind, entity, detail in links]
+
+    def links(self, student_id, kind):
+        # [(entity, detail), ...] for one kind of affiliation, entities by identity
+        with self._lock:
+            return [(entity, detail) for k, entity, detail in self._affiliations.get(student_id, ()) if k == kind]
+
+    def offboard(self, student_ids):
+        # removes each student from every club, society and hostel room; library
+        # loans can't be dropped, so they are returned as outstanding
+        outstanding = {}
+        for student_id in student_ids:
+            with self._lock:
+                links = list(self._affiliations.get(student_id, ()))
+            for kind, entity, detail in links:
+                if kind == "library":
+                    outstanding.setdefault(student_id, []).append({"library": entity.name, "title": detail})
+                else:
+                    entity.offboard(student_id, detail)
+        return outstanding
+
+membership_registry = MembershipRegistry()
+
 class CollegeEntity:
     clg_name = None
     clg_address = None
+    registry = membership_registry
+    sink = PrintSink()
+    cache = result_cache
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        instrument_class(cls)
 
     def __init__(self, name):
         self.name = name
 
+    def emit(self, event, message, **fields):
+        self.sink.emit({"event": event, "entity": self.name, "message": message, **fields})
+
     def display_info(self):
         print(f"{self.__class__.__name__}: {self.name}")
 
@@ -26,6 +431,9 @@ class CollegeEntity:
     def get_college_info(cls):
         print(f"College Name: {cls.clg_name}, College Address: {cls.clg_address}")
 
+def set_sink(sink):
+    CollegeEntity.sink = sink
+
 class Course:
     def __init__(self, course_id, course_name):
         self.course_id = course_id
@@ -60,6 +468,724 @@ class Faculty:
     def display_profile(self):
         print(f"ID: {self.faculty_id}, Name: {self.name}, Department: {self.department}, Phone: {self.phone}, Email: {self.email}")
 
+def _mark_dirty(db, key):
+    # lets persistent dbs re-log values that were mutated in place
+    if hasattr(db, "mark_dirty"):
+        db.mark_dirty(key)
+
+def _index_key(value):
+    # Course objects are keyed by their id so lookups don't need the same instance
+    return getattr(value, "course_id", value)
+
+class CompactStudent:
+    __slots__ = ("student_id", "roll_no", "name", "year", "course", "fees", "branch", "phone", "email")
+    __init__ = Student.__init__
+    display_profile = Student.display_profile
+
+class CompactFaculty:
+    __slots__ = ("faculty_id", "name", "department", "phone", "email")
+    __init__ = Faculty.__init__
+    display_profile = Faculty.display_profile
+
+class TableRow:
+    __slots__ = ("_table", "_row")
+
+    def __init__(self, table, row):
+        object.__setattr__(self, "_table", table)
+        object.__setattr__(self, "_row", row)
+
+    def __getattr__(self, field):
+        return self._table.get_value(self._row, field)
+
+    def __setattr__(self, field, value):
+        self._table.set_value(self._row, field, value)
+
+    def display_profile(self):
+        self._table.record_class.display_profile(self)
+
+class RecordTable(Mapping):
+    # Coded and numeric columns are typed arrays; string columns are packed
+    # into one UTF-8 buffer addressed by array("I") starts/lengths, and keys
+    # are found through an open-addressing index of row numbers. A stored
+    # record holds no Python objects until it is read.
+    record_class = None
+    KEY = None
+    FIELDS = ()
+    CODED = ()     # low-cardinality columns stored as codes into a shared value list
+    NUMERIC = {}   # column -> array typecode
+
+    def __init__(self, records=()):
+        self._columns = {}
+        for field in self.FIELDS:
+            if field in self.CODED:
+                self._columns[field] = array("H")
+            elif field in self.NUMERIC:
+                self._columns[field] = array(self.NUMERIC[field])
+            else:
+                self._columns[field] = (array("I"), array("I"))  # starts, lengths into _strings
+        self._strings = bytearray()
+        self._garbage = 0  # buffer bytes orphaned by set_value
+        self._codes = {field: {} for field in self.CODED}
+        self._values = {field: [] for field in self.CODED}
+        self._size = 0
+        self._index = array("i", [-1]) * 8  # hash slot -> row, -1 if empty
+        for record in records:
+            self.append(record)
+
+    def _encode(self, field, value):
+        code = self._codes[field].get(_index_key(value))
+        if code is None:
+            code = len(self._values[field])
+            self._codes[field][_index_key(value)] = code
+            self._values[field].append(value)
+        return code
+
+    def _pack(self, field, value):
+        if not isinstance(value, str):
+            raise TypeError(f"{self.record_class.__name__}.{field} must be a str, not {type(value).__name__}")
+        data = value.encode()
+        start = len(self._strings)
+        self._strings += data
+        return start, len(data)
+
+    def _string(self, field, row):
+        starts, lengths = self._columns[field]
+        start = starts[row]
+        return self._strings[start:start + lengths[row]].decode()
+
+    def _slot(self, key):
+        # slot holding key's row, or the empty slot where it would go
+        data = key.encode()
+        starts, lengths = self._columns[self.KEY]
+        mask = len(self._index) - 1
+        slot = hash(key) & mask
+        while True:
+            row = self._index[slot]
+            if row < 0 or (lengths[row] == len(data) and self._strings[starts[row]:starts[row] + len(data)] == data):
+                return slot
+            slot = (slot + 1) & mask
+
+    def _grow(self):
+        self._index = array("i", [-1]) * (len(self._index) * 2)
+        for row in range(self._size):
+            self._index[self._slot(self._string(self.KEY, row))] = row
+
+    def _compact(self):
+        strings = bytearray()
+        for field, column in self._columns.items():
+            if isinstance(column, tuple):
+                starts, lengths = column
+                for row in range(self._size):
+                    start = starts[row]
+                    starts[row] = len(strings)
+                    strings += self._strings[start:start + lengths[row]]
+        self._strings = strings
+        self._garbage = 0
+
+    def append(self, record):
+        key = getattr(record, self.KEY)
+        if not isinstance(key, str):
+            raise TypeError(f"{self.KEY} must be a str, not {type(key).__name__}")
+        if (self._size + 1) * 3 > len(self._index) * 2:
+            self._grow()
+        slot = self._slot(key)
+        if self._index[slot] >= 0:
+            raise ValueError(f"Duplicate {self.KEY} '{key}'")
+        values = [getattr(record, field) for field in self.FIELDS]
+        for field, value in zip(self.FIELDS, values):
+            if field not in self.CODED and field not in self.NUMERIC and not isinstance(value, str):
+                raise TypeError(f"{self.record_class.__name__}.{field} must be a str, not {type(value).__name__}")
+        for field, value in zip(self.FIELDS, values):
+            column = self._columns[field]
+            if field in self.CODED:
+                column.append(self._encode(field, value))
+            elif field in self.NUMERIC:
+                column.append(value)
+            else:
+                start, length = self._pack(field, value)
+                column[0].append(start)
+                column[1].append(length)
+        self._index[slot] = self._size
+        self._size += 1
+
+    def get_value(self, row, field):
+        if field not in self._columns:
+            raise AttributeError(f"{self.record_class.__name__} has no attribute '{field}'")
+        if field in self.CODED:
+            return self._values[field][self._columns[field][row]]
+        if field in self.NUMERIC:
+            return self._columns[field][row]
+        return self._string(field, row)
+
+    def set_value(self, row, field, value):
+        if field == self.KEY or field not in self._columns:
+            raise AttributeError(f"Cannot set attribute '{field}'")
+        if field in self.CODED:
+            self._columns[field][row] = self._encode(field, value)
+        elif field in self.NUMERIC:
+            self._columns[field][row] = value
+        else:
+            starts, lengths = self._columns[field]
+            self._garbage += lengths[row]
+            starts[row], lengths[row] = self._pack(field, value)
+            if self._garbage > len(self._strings) // 2:
+                self._compact()
+
+    def column(self, field):
+        if isinstance(self._columns[field], tuple):
+            return [self._string(field, row) for row in range(self._size)]
+        return self._columns[field]
+
+    def _row(self, key):
+        row = self._index[self._slot(key)] if isinstance(key, str) else -1
+        if row < 0:
+            raise KeyError(key)
+        return row
+
+    def __getitem__(self, key):
+        return TableRow(self, self._row(key))
+
+    def __iter__(self):
+        return (self._string(self.KEY, row) for row in range(self._size))
+
+    def __len__(self):
+        return self._size
+
+    def __contains__(self, key):
+        return isinstance(key, str) and self._index[self._slot(key)] >= 0
+
+class StudentTable(RecordTable):
+    record_class = Student
+    KEY = "student_id"
+    FIELDS = CompactStudent.__slots__
+    CODED = ("branch", "course")
+    NUMERIC = {"year": "b", "fees": "q"}
+
+class FacultyTable(RecordTable):
+    record_class = Faculty
+    KEY = "faculty_id"
+    FIELDS = CompactFaculty.__slots__
+    CODED = ("department",)
+
+class StudentStore(MutableMapping):
+    UNIQUE_INDEXES = ("roll_no", "email")
+    MULTI_INDEXES = ("branch", "year", "course")
+
+    def __init__(self, db=None):
+        self.db = db if db is not None else {}
+        self._unique = {field: {} for field in self.UNIQUE_INDEXES}
+        self._multi = {field: {} for field in self.MULTI_INDEXES}
+        self._observers = []
+        for student in self.db.values():
+            self._check_unique(student)
+            self._index(student)
+
+    def _check_unique(self, student, replacing=None):
+        for field in self.UNIQUE_INDEXES:
+            owner = self._unique[field].get(_index_key(getattr(student, field)))
+            if owner is not None and owner is not replacing:
+                raise ValueError(f"Duplicate {field} '{getattr(student, field)}' for student {student.student_id}")
+
+    def _index(self, student):
+        for field in self.UNIQUE_INDEXES:
+            self._unique[field][_index_key(getattr(student, field))] = student
+        for field in self.MULTI_INDEXES:
+            self._multi[field].setdefault(_index_key(getattr(student, field)), {})[student.student_id] = student
+
+    def _unindex(self, student):
+        for field in self.UNIQUE_INDEXES:
+            self._unique[field].pop(_index_key(getattr(student, field)), None)
+        for field in self.MULTI_INDEXES:
+            key = _index_key(getattr(student, field))
+            bucket = self._multi[field].get(key)
+            if bucket is not None:
+                bucket.pop(student.student_id, None)
+                if not bucket:
+                    del self._multi[field][key]
+
+    def __getitem__(self, student_id):
+        return self.db[student_id]
+
+    def __setitem__(self, student_id, student):
+        old = self.db.get(student_id)
+        self._check_unique(student, replacing=old)
+        if old is not None:
+            self._unindex(old)
+        self.db[student_id] = student
+        self._index(student)
+        CollegeEntity.cache.invalidate(("student", student_id))
+        for observer in self._observers:
+            if old is not None:
+                observer.record_removed("student", student_id, old)
+            observer.record_added("student", student_id, student)
+
+    def __delitem__(self, student_id):
+        student = self.db.pop(student_id)
+        self._unindex(student)
+        CollegeEntity.cache.invalidate(("student", student_id))
+        for observer in self._observers:
+            observer.record_removed("student", student_id, student)
+
+    def subscribe(self, observer):
+        # observer gets record_added(kind, key, record) and record_removed(kind, key, record)
+        self._observers.append(observer)
+
+    def __iter__(self):
+        return iter(self.db)
+
+    def __len__(self):
+        return len(self.db)
+
+    def __contains__(self, student_id):
+        return student_id in self.db
+
+    def add(self, student):
+        self[student.student_id] = student
+
+    def mark_dirty(self, student_id):
+        _mark_dirty(self.db, student_id)
+
+    def update_student(self, student_id, **changes):
+        student = self.db[student_id]
+        for field in changes:
+            if field == "student_id" or not hasattr(student, field):
+                raise ValueError(f"Cannot update field '{field}' of student {student_id}")
+        for field in self.UNIQUE_INDEXES:
+            if field in changes:
+                owner = self._unique[field].get(_index_key(changes[field]))
+                if owner is not None and owner is not student:
+                    raise ValueError(f"Duplicate {field} '{changes[field]}' for student {student_id}")
+        self._unindex(student)
+        for observer in self._observers:
+            observer.record_removed("student", student_id, student)
+        for field, value in changes.items():
+            setattr(student, field, value)
+        self._index(student)
+        _mark_dirty(self.db, student_id)
+        CollegeEntity.cache.invalidate(("student", student_id))
+        for observer in self._observers:
+            observer.record_added("student", student_id, student)
+        return student
+
+    def get_by(self, field, value):
+        if field not in self.UNIQUE_INDEXES:
+            raise ValueError(f"'{field}' is not a unique index")
+        return self._unique[field].get(_index_key(value))
+
+    def find_by(self, field, value):
+        if field not in self.MULTI_INDEXES:
+            raise ValueError(f"'{field}' is not a multi-valued index")
+        return list(self._multi[field].get(_index_key(value), {}).values())
+
+class FeeLedger:
+    # Append-only payment log, striped by student_id so payments to different
+    # students take different locks
+    def __init__(self, stripes=64):
+        self._seq = itertools.count(1)
+        self._stripes = [{"lock": threading.Lock(), "history": {}, "balances": {}} for _ in range(stripes)]
+
+    def _stripe(self, student_id):
+        return self._stripes[hash(student_id) % len(self._stripes)]
+
+    def post(self, student, amount, kind, db=None):
+        # db: the store owning student, re-logged if it is persistent
+        stripe = self._stripe(student.student_id)
+        with stripe["lock"]:
+            entry = {"seq": next(self._seq), "student_id": student.student_id, "amount": amount, "kind": kind, "time": time.time()}
+            stripe["history"].setdefault(student.student_id, []).append(entry)
+            balances = stripe["balances"].setdefault(student.student_id, {})
+            balances[kind] = balances.get(kind, 0) + amount
+            student.fees += amount
+        if db is not None:
+            _mark_dirty(db, student.student_id)
+        return entry
+
+    def balance(self, student_id, kind=None):
+        stripe = self._stripe(student_id)
+        with stripe["lock"]:
+            balances = stripe["balances"].get(student_id, {})
+            return balances.get(kind, 0) if kind is not None else sum(balances.values())
+
+    def history(self, student_id):
+        stripe = self._stripe(student_id)
+        with stripe["lock"]:
+            return list(stripe["history"].get(student_id, []))
+
+    def totals(self, kind=None):
+        totals = {}
+        for stripe in self._stripes:
+            with stripe["lock"]:
+                for student_id, balances in stripe["balances"].items():
+                    paid = balances.get(kind, 0) if kind is not None else sum(balances.values())
+                    if paid:
+                        totals[student_id] = paid
+        return totals
+
+    def entries(self):
+        entries = []
+        for stripe in self._stripes:
+            with stripe["lock"]:
+                for history in stripe["history"].values():
+                    entries.extend(history)
+        return sorted(entries, key=lambda entry: entry["seq"])
+
+fee_ledger = FeeLedger()
+
+class StorageEngine:
+    # Append-only write-ahead log plus periodic snapshots. Every table is a
+    # PersistentDict; writes are buffered and group-committed to the log.
+    def __init__(self, path, batch_size=1000, sync=True):
+        self.path = path
+        self.snapshot_path = path + ".snapshot"
+        self.batch_size = batch_size
+        self.sync = sync
+        self.tables = {}
+        self._pending = {}  # (table, key) -> ("set", value) or ("del", None)
+        self._lsn = 0
+        self._lock = threading.RLock()
+        self._load()
+        self._log = open(self.path, "ab")
+
+    def _load(self):
+        snapshot_lsn = 0
+        if os.path.exists(self.snapshot_path):
+            with open(self.snapshot_path, "rb") as f:
+                snapshot = pickle.load(f)
+            snapshot_lsn = self._lsn = snapshot["lsn"]
+            for name, data in snapshot["tables"].items():
+                self.tables[name] = PersistentDict(self, name, data)
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "r+b") as f:
+            end = 0
+            while True:
+                try:
+                    lsn, batch = pickle.load(f)
+                except Exception:
+                    break  # end of log, or a torn write from a crash mid-commit
+                end = f.tell()
+                if lsn <= snapshot_lsn:
+                    continue
+                for (name, key), (op, value) in batch:
+                    data = self.table(name).data
+                    if op == "del":
+                        data.pop(key, None)
+                    else:
+                        data[key] = value
+                self._lsn = lsn
+            f.truncate(end)
+
+    def table(self, name):
+        if name not in self.tables:
+            self.tables[name] = PersistentDict(self, name, {})
+        return self.tables[name]
+
+    def _write(self, name, key, op, value=None):
+        with self._lock:
+            self._pending[(name, key)] = (op, value)
+            if len(self._pending) >= self.batch_size:
+                self.commit()
+
+    def commit(self):
+        with self._lock:
+            if not self._pending:
+                return
+            # serialize first: an unpicklable value raises here with the log,
+            # the LSN and the pending batch untouched
+            record = pickle.dumps((self._lsn + 1, list(self._pending.items())), pickle.HIGHEST_PROTOCOL)
+            self._log.write(record)
+            self._log.flush()
+            if self.sync:
+                os.fsync(self._log.fileno())
+            self._lsn += 1
+            self._pending.clear()
+
+    def checkpoint(self):
+        with self._lock:
+            self.commit()
+            tmp = self.snapshot_path + ".tmp"
+            with open(tmp, "wb") as f:
+                pickle.dump({"lsn": self._lsn, "tables": {name: t.data for name, t in self.tables.items()}}, f, pickle.HIGHEST_PROTOCOL)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, self.snapshot_path)
+            self._log.close()
+            self._log = open(self.path, "wb")
+
+    def close(self):
+        with self._lock:
+            self.commit()
+            self._log.close()
+
+class PersistentDict(MutableMapping):
+    def __init__(self, engine, name, data):
+        self.engine = engine
+        self.name = name
+        self.data = data
+
+    def __getitem__(self, key):
+        return self.data[key]
+
+    def __setitem__(self, key, value):
+        self.data[key] = value
+        self.engine._write(self.name, key, "set", value)
+
+    def __delitem__(self, key):
+        del self.data[key]
+        self.engine._write(self.name, key, "del")
+
+    def __iter__(self):
+        return iter(self.data)
+
+    def __len__(self):
+        return len(self.data)
+
+    def __contains__(self, key):
+        return key in self.data
+
+    def mark_dirty(self, key):
+        # values mutated in place (e.g. student.fees += amount) are re-logged on the next commit
+        self.engine._write(self.name, key, "set", self.data[key])
+
+class FrozenMapping(Mapping):
+    # Read-only view of a dict that, unlike MappingProxyType, pickles (as a
+    # frozen copy), so snapshot entries can be stored in persistent dbs
+    __slots__ = ("_data",)
+
+    def __init__(self, data):
+        self._data = data
+
+    def __getitem__(self, key):
+        return self._data[key]
+
+    def __iter__(self):
+        return iter(self._data)
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def __repr__(self):
+        return repr(self._data)
+
+    def __reduce__(self):
+        return FrozenMapping, (dict(self._data),)
+
+class CatalogueSnapshot(Mapping):
+    # Immutable, versioned view of a CopyOnWriteDict. It shares the writer's
+    # dict until the writer next changes, so publishing one costs O(1).
+    __slots__ = ("_data", "version")
+
+    def __init__(self, data, version):
+        self._data = data
+        self.version = version
+
+    def __getitem__(self, key):
+        value = self._data[key]
+        return FrozenMapping(value) if isinstance(value, dict) else value
+
+    def __iter__(self):
+        return iter(self._data)
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def __repr__(self):
+        return repr(self._data)
+
+    def __reduce__(self):
+        return CatalogueSnapshot, (self._data, self.version)
+
+class CopyOnWriteDict(MutableMapping):
+    # Dict whose snapshot() is O(1): the snapshot keeps the current dict and
+    # the next write switches to a shallow copy. Values are replaced, never
+    # mutated in place, so entries are shared rather than copied.
+    def __init__(self, data=None, version=0):
+        self._data = dict(data or {})
+        self.version = version
+        self._published = None
+        self._lock = threading.Lock()
+
+    def _writable(self):
+        # caller holds self._lock
+        if self._published is not None and self._published._data is self._data:
+            self._data = dict(self._data)
+        self.version += 1
+        return self._data
+
+    def __getitem__(self, key):
+        return self._data[key]
+
+    def get(self, key, default=None):
+        return self._data.get(key, default)
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def __setitem__(self, key, value):
+        with self._lock:
+            self._writable()[key] = value
+
+    def __delitem__(self, key):
+        with self._lock:
+            del self._writable()[key]
+
+    def __iter__(self):
+        # iterate a snapshot so concurrent writers can't change the dict underneath
+        return iter(self.snapshot())
+
+    def __len__(self):
+        return len(self._data)
+
+    def items(self):
+        return self.snapshot().items()
+
+    def values(self):
+        return self.snapshot().values()
+
+    def __repr__(self):
+        return repr(self._data)
+
+    def __reduce__(self):
+        return type(self), (dict(self._data), self.version)
+
+    def update(self, other=(), **kwargs):
+        with self._lock:
+            self._writable().update(other, **kwargs)
+
+    def snapshot(self):
+        with self._lock:
+            if self._published is None or self._published.version != self.version:
+                self._published = CatalogueSnapshot(self._data, self.version)
+            return self._published
+
+class MappedSnapshot(Mapping):
+    # Read-only binary snapshot of a student/faculty/library db. The file is
+    # mmap-ed (so worker processes share its pages) and records are decoded
+    # into objects only when looked up.
+    MAGIC = b"CMSS"
+    HEADER = struct.Struct("<4sBI")
+    KINDS = ("student", "faculty", "library")
+    SCHEMAS = {
+        "student": (("student_id", "s"), ("roll_no", "s"), ("name", "s"), ("year", "i"), ("course_id", "s"),
+                    ("course_name", "s"), ("branch", "s"), ("phone", "s"), ("email", "s"), ("fees", "i")),
+        "faculty": (("faculty_id", "s"), ("name", "s"), ("department", "s"), ("phone", "s"), ("email", "s")),
+        "library": (("title", "s"), ("rentable", "i"), ("non_rentable", "i")),
+    }
+    _LENGTH = struct.Struct("<I")
+    _INT = struct.Struct("<q")
+
+    @classmethod
+    def _fields(cls, kind, key, value):
+        if kind == "student":
+            return (value.student_id, value.roll_no, value.name, value.year, value.course.course_id,
+                    value.course.course_name, value.branch, value.phone, value.email, value.fees)
+        if kind == "faculty":
+            return value.faculty_id, value.name, value.department, value.phone, value.email
+        return key, value["rentable"], value["non_rentable"]
+
+    @classmethod
+    def write(cls, path, kind, db):
+        schema = cls.SCHEMAS[kind]
+        keys = sorted(db)
+        records = []
+        for key in keys:
+            record = bytearray()
+            for (field, type_), value in zip(schema, cls._fields(kind, key, db[key])):
+                if type_ == "s":
+                    data = str(value).encode()
+                    record += cls._LENGTH.pack(len(data)) + data
+                else:
+                    record += cls._INT.pack(value)
+            records.append(record)
+        offset = cls.HEADER.size + 8 * len(keys)
+        offsets = array("Q")
+        for record in records:
+            offsets.append(offset)
+            offset += len(record)
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(cls.HEADER.pack(cls.MAGIC, cls.KINDS.index(kind), len(keys)))
+            f.write(offsets.tobytes())
+            for record in records:
+                f.write(record)
+        os.replace(tmp, path)
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, kind, self._count = self.HEADER.unpack_from(self._mm, 0)
+        if magic != self.MAGIC:
+            raise ValueError(f"{path} is not a snapshot file")
+        self.kind = self.KINDS[kind]
+        self._schema = self.SCHEMAS[self.kind]
+        self._offsets = memoryview(self._mm)[self.HEADER.size:self.HEADER.size + 8 * self._count].cast("Q")
+        self._cache = {}
+        self._courses = {}
+
+    def _key_at(self, i):
+        offset = self._offsets[i]
+        length, = self._LENGTH.unpack_from(self._mm, offset)
+        return self._mm[offset + 4:offset + 4 + length].decode()
+
+    def _decode(self, i):
+        offset = self._offsets[i]
+        values = []
+        for field, type_ in self._schema:
+            if type_ == "s":
+                length, = self._LENGTH.unpack_from(self._mm, offset)
+                values.append(self._mm[offset + 4:offset + 4 + length].decode())
+                offset += 4 + length
+            else:
+                values.append(self._INT.unpack_from(self._mm, offset)[0])
+                offset += 8
+        return values
+
+    def _materialize(self, values):
+        if self.kind == "student":
+            student_id, roll_no, name, year, course_id, course_name, branch, phone, email, fees = values
+            course = self._courses.get(course_id)
+            if course is None:
+                course = self._courses[course_id] = Course(course_id, course_name)
+            return Student(student_id, roll_no, name, year, course, branch, phone, email, fees)
+        if self.kind == "faculty":
+            return Faculty(*values)
+        return {"rentable": values[1], "non_rentable": values[2]}
+
+    def _find(self, key):
+        i = bisect.bisect_left(range(self._count), key, key=self._key_at)
+        if i < self._count and self._key_at(i) == key:
+            return i
+        return None
+
+    def __getitem__(self, key):
+        value = self._cache.get(key)
+        if value is None:
+            i = self._find(key) if isinstance(key, str) else None
+            if i is None:
+                raise KeyError(key)
+            value = self._cache[key] = self._materialize(self._decode(i))
+        return value
+
+    def __iter__(self):
+        return (self._key_at(i) for i in range(self._count))
+
+    def __len__(self):
+        return self._count
+
+    def __contains__(self, key):
+        return key in self._cache or (isinstance(key, str) and self._find(key) is not None)
+
+    def close(self):
+        self._offsets.release()
+        self._mm.close()
+
 class Club(CollegeEntity):
     CLUB_CATEGORIES = {
         "Cultural": {
@@ -79,6 +1205,9 @@ class Club(CollegeEntity):
         }
     }
 
+    CLUB_INDEX = {name: (category, tuple(instruments))
+                  for category, clubs in CLUB_CATEGORIES.items() for name, instruments in clubs.items()}
+
     def __init__(self, name, treasurer, secretary, members):
         super().__init__(name)
         self.category, self.instruments = self._get_category_and_instruments(name)
@@ -86,48 +1215,63 @@ class Club(CollegeEntity):
         self.secretary = secretary
         self.members = {}
         self.members.update(members)
+        for student_id in self.members:
+            self.registry.link(student_id, "club", self)
 
     def _get_category_and_instruments(self, name):
-        for category, clubs in Club.CLUB_CATEGORIES.items():
-            if name in clubs:
-                return category, clubs[name][:]
-        raise ValueError(f"Club '{name}' not found in predefined categories")
+        # instruments are a shared tuple until this club changes its own
+        try:
+            return Club.CLUB_INDEX[name]
+        except KeyError:
+            raise ValueError(f"Club '{name}' not found in predefined categories") from None
 
     def add_member(self, student_id):
         if student_id in self.members:
-            print(f"Student {student_id} is already a member of {self.name}")
+            self.emit("club.member_exists", f"Student {student_id} is already a member of {self.name}", student_id=student_id)
             return
         student = get_element_by_id(student_id, student_db)
         if student is not None:
             self.members[student_id] = student
-            print(f"Student {student_id} added to {self.name}")
+            self.registry.link(student_id, "club", self)
+            self.cache.invalidate(("club", self))
+            self.emit("club.member_added", f"Student {student_id} added to {self.name}", student_id=student_id)
         else:
-            print(f"Student {student_id} not found in database")
+            self.emit("club.student_not_found", f"Student {student_id} not found in database", student_id=student_id)
 
     def remove_member(self, student_id):
         if student_id in self.members:
             del self.members[student_id]
-            print(f"Member {student_id} removed from club")
+            self.registry.unlink(student_id, "club", self)
+            self.cache.invalidate(("club", self))
+            self.emit("club.member_removed", f"Member {student_id} removed from club", student_id=student_id)
         else:
-            print(f"Member {student_id} not found in club")
+            self.emit("club.member_not_found", f"Member {student_id} not found in club", student_id=student_id)
+
+    def offboard(self, student_id, detail):
+        self.remove_member(student_id)
+
+    @cached(lambda self: ("club", self), lambda self: [("student", student_id) for student_id in self.members])
+    def member_list(self):
+        return tuple((student_id, student.name, student.branch, student.roll_no)
+                     for student_id, student in self.members.items() if student is not None)
 
     def change_secretary(self, new_secretary):
         self.secretary = new_secretary
-        print(f"Secretary changed to {new_secretary.name} for {self.name}")
+        self.emit("club.secretary_changed", f"Secretary changed to {new_secretary.name} for {self.name}", student_id=new_secretary.student_id)
 
     def change_treasurer(self, new_treasurer):
         self.treasurer = new_treasurer
-        print(f"Treasurer changed to {new_treasurer.name} for {self.name}")
+        self.emit("club.treasurer_changed", f"Treasurer changed to {new_treasurer.name} for {self.name}", student_id=new_treasurer.student_id)
 
     def add_instrument(self, instrument):
         if instrument not in self.instruments:
-            self.instruments.append(instrument)
-            print(f"Instrument '{instrument}' added to {self.name}")
+            self.instruments = self.instruments + (instrument,)
+            self.emit("club.instrument_added", f"Instrument '{instrument}' added to {self.name}", instrument=instrument)
 
     def remove_instrument(self, instrument):
         if instrument in self.instruments:
-            self.instruments.remove(instrument)
-            print(f"Instrument '{instrument}' removed from {self.name}")
+            self.instruments = tuple(i for i in self.instruments if i != instrument)
+            self.emit("club.instrument_removed", f"Instrument '{instrument}' removed from {self.name}", instrument=instrument)
 
     def display_club_info(self):
         print(f"\nClub Name: {self.name}")
@@ -149,13 +1293,14 @@ class Society(CollegeEntity):
         "Non-Departmental": ["DSW", "E-Cell", "Training and Placement Cell"]
     }
 
-    def __init__(self, name, head, coordinator=None):
+    def __init__(self, name, head, coordinator=None, db=None):
         super().__init__(name)
         self.name = name
         self._head = head
         self._coordinator = coordinator
-        self.members = []
-        self.volunteers = []
+        self.db = db            # student db used to link entries to Student records
+        self.members = {}       # student_id -> Student (or a name/department dict if not in db)
+        self.volunteers = {}
         self.category = self._get_category(name)
 
     def _get_category(self, name):
@@ -171,7 +1316,7 @@ class Society(CollegeEntity):
     @head.setter
     def head(self, new_head):
         self._head = new_head
-        print(f"Society head updated to: {new_head}")
+        self.emit("society.head_changed", f"Society head updated to: {new_head}", head=new_head)
 
     @property
     def coordinator(self):
@@ -180,19 +1325,80 @@ class Society(CollegeEntity):
     @coordinator.setter
     def coordinator(self, new_coordinator):
         self._coordinator = new_coordinator
-        print(f"Coordinator updated to: {new_coordinator}")
+        self.emit("society.coordinator_changed", f"Coordinator updated to: {new_coordinator}", coordinator=new_coordinator)
+
+    def _entry(self, name, student_id, department):
+        student = get_element_by_id(student_id, self.db) if self.db is not None else None
+        return student if student is not None else {"name": name, "id": student_id, "department": department}
+
+    @staticmethod
+    def _describe(entry):
+        if isinstance(entry, dict):
+            return entry["name"], entry["id"], entry["department"]
+        return entry.name, entry.student_id, entry.branch
+
+    def has_member(self, student_id):
+        return student_id in self.members
 
     def add_member(self, name, student_id, department):
-        self.members.append({"name": name, "id": student_id, "department": department})
-        print(f"{name} added to society {self.name}")
+        if student_id in self.members:
+            self.emit("society.member_exists", f"{name} is already a member of {self.name}", student_id=student_id)
+            return False
+        self.members[student_id] = self._entry(name, student_id, department)
+        self.registry.link(student_id, "society", self, "member")
+        self.emit("society.member_added", f"{name} added to society {self.name}", student_id=student_id)
+        return True
 
     def remove_member(self, student_id):
-        self.members = [m for m in self.members if m["id"] != student_id]
-        print(f"Member with ID {student_id} removed from {self.name}")
+        if self.members.pop(student_id, None) is None:
+            self.emit("society.member_not_found", f"Member with ID {student_id} not found in {self.name}", student_id=student_id)
+            return False
+        self.registry.unlink(student_id, "society", self, "member")
+        self.emit("society.member_removed", f"Member with ID {student_id} removed from {self.name}", student_id=student_id)
+        return True
 
     def add_volunteer(self, name, student_id, department):
-        self.volunteers.append({"name": name, "id": student_id, "department": department})
-        print(f"Volunteer {name} from {department} added to {self.name}")
+        if student_id in self.volunteers:
+            self.emit("society.volunteer_exists", f"{name} is already a volunteer in {self.name}", student_id=student_id)
+            return False
+        self.volunteers[student_id] = self._entry(name, student_id, department)
+        self.registry.link(student_id, "society", self, "volunteer")
+        self.emit("society.volunteer_added", f"Volunteer {name} from {department} added to {self.name}", student_id=student_id)
+        return True
+
+    def remove_volunteer(self, student_id):
+        if self.volunteers.pop(student_id, None) is None:
+            self.emit("society.volunteer_not_found", f"Volunteer with ID {student_id} not found in {self.name}", student_id=student_id)
+            return False
+        self.registry.unlink(student_id, "society", self, "volunteer")
+        self.emit("society.volunteer_removed", f"Volunteer with ID {student_id} removed from {self.name}", student_id=student_id)
+        return True
+
+    def add_members(self, entries):
+        # entries: iterable of (name, student_id, department); duplicates are skipped
+        added = 0
+        for name, student_id, department in entries:
+            if student_id not in self.members:
+                self.members[student_id] = self._entry(name, student_id, department)
+                self.registry.link(student_id, "society", self, "member")
+                added += 1
+        self.emit("society.members_added", f"{added} members added to society {self.name}", count=added)
+        return added
+
+    def remove_members(self, student_ids):
+        removed = 0
+        for student_id in student_ids:
+            if self.members.pop(student_id, None) is not None:
+                self.registry.unlink(student_id, "society", self, "member")
+                removed += 1
+        self.emit("society.members_removed", f"{removed} members removed from {self.name}", count=removed)
+        return removed
+
+    def offboard(self, student_id, role):
+        if role == "volunteer":
+            self.remove_volunteer(student_id)
+        else:
+            self.remove_member(student_id)
 
     def show_society_info(self):
         print(f"\nSociety: {self.name} ({self.category})")
@@ -200,30 +1406,44 @@ class Society(CollegeEntity):
         if self._coordinator:
             print(f"Coordinator: {self._coordinator}")
         print(f"Members ({len(self.members)}):")
-        for m in self.members:
-            print(f"  - {m['name']} (ID: {m['id']}, Dept: {m['department']})")
+        for m in self.members.values():
+            name, student_id, department = self._describe(m)
+            print(f"  - {name} (ID: {student_id}, Dept: {department})")
         if self.volunteers:
             print(f"Volunteers ({len(self.volunteers)}):")
-            for v in self.volunteers:
-                print(f"  - {v['name']} (ID: {v['id']}, Dept: {v['department']})")
+            for v in self.volunteers.values():
+                name, student_id, department = self._describe(v)
+                print(f"  - {name} (ID: {student_id}, Dept: {department})")
 
 class Department(CollegeEntity):
     def __init__(self, id, name, courses, std, std_db, faculty, faculty_db):
         super().__init__(name)
         self.id = id
         self.courses = courses  # list of Course objects
-        self.students = std
+        self._students = std    # None -> derived from std_db when it is a StudentStore
         self.std_db = std_db
         self.faculty = faculty
         self.faculty_db = faculty_db
 
+    @property
+    def students(self):
+        # derived rosters are read-only tuples; enrol through add_student()
+        if self._students is None and isinstance(self.std_db, StudentStore):
+            return tuple(self.std_db.find_by("branch", self.name))
+        return self._students
+
+    def add_student(self, student):
+        self.std_db[student.student_id] = student
+        if self._students is not None:
+            self._students.append(student)
+
     def organise_fest(self, fest_name, fest_date, fest_location, fest_budget, fest_members):
         self.fest_name = fest_name
         self.fest_date = fest_date
         self.fest_location = fest_location
         self.fest_budget = fest_budget
         self.fest_members = fest_members
-        print(f"Organised {fest_name} on {fest_date} at {fest_location}")
+        self.emit("department.fest_organised", f"Organised {fest_name} on {fest_date} at {fest_location}", fest=fest_name)
 
 class NNF(CollegeEntity):
     def __init__(self, name="Navchar Navyug Foundation"):
@@ -241,7 +1461,7 @@ class NNF(CollegeEntity):
     def chief_director(self, name):
         action = "assigned" if self._chief_director is None else "changed"
         self._chief_director = name
-        print(f"Chief Director {action}: {name}")
+        self.emit("nnf.chief_director_changed", f"Chief Director {action}: {name}", director=name)
 
     @property
     def startups(self):
@@ -249,7 +1469,7 @@ class NNF(CollegeEntity):
 
     def add_startup(self, name):
         self._startups.append(name)
-        print(f"Startup '{name}' added to Incubation Hub")
+        self.emit("nnf.startup_added", f"Startup '{name}' added to Incubation Hub", startup=name)
 
     def list_startups(self):
         print("Incubated Startups:")
@@ -266,21 +1486,21 @@ class NNF(CollegeEntity):
 
     def add_past_event(self, event):
         self._past_events.append(event)
-        print(f"Past Event added: {event}")
+        self.emit("nnf.past_event_added", f"Past Event added: {event}", event_name=event)
 
     def schedule_event(self, event):
         self._upcoming_events.append(event)
-        print(f"Upcoming Event scheduled: {event}")
+        self.emit("nnf.event_scheduled", f"Upcoming Event scheduled: {event}", event_name=event)
 
     def remove_past_event(self, event):
         if event in self._past_events:
             self._past_events.remove(event)
-            print(f"Past Event removed: {event}")
+            self.emit("nnf.past_event_removed", f"Past Event removed: {event}", event_name=event)
 
     def remove_upcoming_event(self, event):
         if event in self._upcoming_events:
             self._upcoming_events.remove(event)
-            print(f"Upcoming Event removed: {event}")
+            self.emit("nnf.event_removed", f"Upcoming Event removed: {event}", event_name=event)
 
     def show_all_events(self):
         print("\nPast Events:")
@@ -291,100 +1511,471 @@ class NNF(CollegeEntity):
             print(" - " + e)
 
 class Hostel(CollegeEntity):
-    def __init__(self, name, rooms):
+    PAYMENT_DELAY = 1  # seconds spent talking to the payment gateway per student
+
+    def __init__(self, name, rooms, ledger=None, capacity=None):
         super().__init__(name)
         self.rooms = rooms  
+        self.ledger = ledger if ledger is not None else fee_ledger
+        self.capacities = {room_no: capacity for room_no in rooms} if capacity else {}
+        self.floors = {}
+        for room_no, students in self.rooms.items():
+            for student in students:
+                self.registry.link(student.student_id, "hostel", self, room_no)
 
     def vaccate_room(self, room_no):
         if room_no in self.rooms:
+            for student in self.rooms[room_no]:
+                self.registry.unlink(student.student_id, "hostel", self, room_no)
             del self.rooms[room_no]
+            self.cache.invalidate(("room", self, room_no))
+
+    def add_room(self, room_no, capacity, floor=None):
+        self.capacities[room_no] = capacity
+        if floor is not None:
+            self.floors[room_no] = floor
+
+    def floor_of(self, room_no):
+        if room_no in self.floors:
+            return self.floors[room_no]
+        return int(room_no) // 100 if str(room_no).isdigit() else 0
+
+    def free_beds(self, room_no):
+        return self.capacities[room_no] - len(self.rooms.get(room_no, ()))
+
+    def _place(self, room_no, student):
+        self.rooms[room_no] = tuple(self.rooms.get(room_no, ())) + (student,)
+        self.registry.link(student.student_id, "hostel", self, room_no)
+        self.cache.invalidate(("room", self, room_no))
 
     def add_room_members(self, room_no, *students):
+        if room_no in self.capacities and len(students) > self.capacities[room_no]:
+            self.emit("hostel.over_capacity", f"Room {room_no} in {self.name} only has {self.capacities[room_no]} beds", room_no=room_no)
+            return False
         self.vaccate_room(room_no)
         self.rooms[room_no] = students
-        print(f"Room {room_no} in {self.name} allocated to {[student.name for student in students]}")
+        for student in students:
+            self.registry.link(student.student_id, "hostel", self, room_no)
+        self.cache.invalidate(("room", self, room_no))
+        self.emit("hostel.room_allocated", f"Room {room_no} in {self.name} allocated to {[student.name for student in students]}", room_no=room_no, student_ids=[student.student_id for student in students])
+        return True
+
+    def _restore_room(self, room_no, students):
+        # put a room back exactly as it was (used to roll back transactions); no
+        # events. students is None if the room had no entry, so an empty room stays.
+        self.vaccate_room(room_no)
+        if students is not None:
+            self.rooms[room_no] = students
+            for student in students:
+                self.registry.link(student.student_id, "hostel", self, room_no)
+            self.cache.invalidate(("room", self, room_no))
+
+    def remove_room_member(self, room_no, student_id):
+        remaining = tuple(student for student in self.rooms.get(room_no, ()) if student.student_id != student_id)
+        if len(remaining) == len(self.rooms.get(room_no, ())):
+            self.emit("hostel.not_in_room", f"Student {student_id} is not in room {room_no} of {self.name}", room_no=room_no, student_id=student_id)
+            return False
+        self.registry.unlink(student_id, "hostel", self, room_no)
+        if remaining:
+            self.rooms[room_no] = remaining
+        else:
+            del self.rooms[room_no]
+        self.cache.invalidate(("room", self, room_no))
+        self.emit("hostel.moved_out", f"Student {student_id} moved out of room {room_no} in {self.name}", room_no=room_no, student_id=student_id)
+        return True
+
+    def offboard(self, student_id, room_no):
+        self.remove_room_member(room_no, student_id)
+
+    def _add_fees(self, db, student, amount, kind):
+        self.ledger.post(db[student.student_id], amount, "hostel_" + kind, db)
+
+    def _charge(self, room_no, student, amount, db):
+        self.emit("hostel.fee_started", "Paying Fees .....", room_no=room_no, student_id=student.student_id)
+        self._add_fees(db, student, amount, "fees")
+
+    def _confirm(self, room_no, student, amount):
+        # the payment gateway round trip; the fee is already on the ledger
+        time.sleep(self.PAYMENT_DELAY)
+        self.emit("hostel.fee_paid", f"Student {student.name} paid {amount} to {room_no} in {self.name}", room_no=room_no, student_id=student.student_id, amount=amount)
 
     def pay_fees(self, room_no, amount, db):
         if room_no in self.rooms:
             for student in self.rooms[room_no]:
-                print("Paying Fees .....")
-                db[student.student_id].fees += amount
-                time.sleep(1)
-                print(f"Student {student.name} paid {amount} to {room_no} in {self.name}")
+                self._charge(room_no, student, amount, db)
+                self._confirm(room_no, student, amount)
         else:
-            print(f"Room {room_no} in {self.name} is not allocated")
+            self.emit("hostel.room_not_allocated", f"Room {room_no} in {self.name} is not allocated", room_no=room_no)
+
+    @cached(lambda self, room_no: ("room", self, room_no))
+    def roommates(self, room_no):
+        return tuple(self.rooms.get(room_no, ()))
 
     def get_roommates(self, room_no):
-        ls = self.rooms[room_no] if room_no in self.rooms else []
+        ls = self.roommates(room_no)
         print([student.name for student in ls])
+        return list(ls)
+
+    def occupancy(self):
+        return {
+            room_no: {"floor": self.floor_of(room_no), "capacity": capacity,
+                      "occupants": [student.student_id for student in self.rooms.get(room_no, ())],
+                      "free": self.free_beds(room_no)}
+            for room_no, capacity in self.capacities.items()
+        }
 
     def penalty(self, room_no, amount, db):
         if room_no in self.rooms:
             for student in self.rooms[room_no]:
-                print("Penalty .....")
-                db[student.student_id].fees += amount
-                time.sleep(1)
-                print(f"Student {student.name} paid {amount} to {room_no} in {self.name} as penalty")
+                self.emit("hostel.penalty_started", "Penalty .....", room_no=room_no, student_id=student.student_id)
+                self._add_fees(db, student, amount, "penalty")
+                time.sleep(self.PAYMENT_DELAY)
+                self.emit("hostel.penalty_paid", f"Student {student.name} paid {amount} to {room_no} in {self.name} as penalty", room_no=room_no, student_id=student.student_id, amount=amount)
+
+    async def _charge_async(self, semaphore, room_no, student, amount, db, kind):
+        result = {"room_no": room_no, "student_id": student.student_id, "amount": amount, "kind": kind}
+        async with semaphore:
+            await asyncio.sleep(self.PAYMENT_DELAY)
+            try:
+                self._add_fees(db, student, amount, kind)
+            except Exception as e:
+                result.update(status="failed", error=str(e))
+            else:
+                result["status"] = "paid"
+        return result
+
+    async def pay_fees_batch(self, payments, db, concurrency=50, kind="fees"):
+        # payments: iterable of (room_no, amount); returns one result dict per student
+        semaphore = asyncio.Semaphore(concurrency)
+        tasks = []
+        report = []
+        for room_no, amount in payments:
+            if room_no not in self.rooms:
+                report.append({"room_no": room_no, "student_id": None, "amount": amount, "kind": kind, "status": "not allocated"})
+                continue
+            for student in self.rooms[room_no]:
+                tasks.append(self._charge_async(semaphore, room_no, student, amount, db, kind))
+        report.extend(await asyncio.gather(*tasks))
+        paid = sum(1 for r in report if r["status"] == "paid")
+        self.emit("hostel.batch_collected", f"{kind.capitalize()} collected from {paid}/{len(report)} students in {self.name}", kind=kind, paid=paid, total=len(report))
+        return report
+
+    async def pay_fees_async(self, room_no, amount, db, concurrency=50):
+        return await self.pay_fees_batch([(room_no, amount)], db, concurrency)
+
+    async def penalty_async(self, room_no, amount, db, concurrency=50):
+        return await self.pay_fees_batch([(room_no, amount)], db, concurrency, kind="penalty")
+
+class RoomAllocator:
+    # Bulk allotment over hostels whose rooms have capacities. Free beds are kept
+    # in per-hostel, per-floor heaps ordered by most free beds, so groups fill
+    # empty rooms before anyone is squeezed into a partly filled one. The index
+    # is built from the hostels' current state; call refresh() after manual changes.
+    # Every occupied room must have a capacity (Hostel.add_room), or refresh() raises.
+    def __init__(self, hostels):
+        self.hostels = {hostel.name: hostel for hostel in hostels}
+        self.refresh()
+
+    def refresh(self):
+        self._free = {}  # hostel name -> floor -> heap of (-free_beds, room_no)
+        for name, hostel in self.hostels.items():
+            unknown = sorted(str(room_no) for room_no in hostel.rooms if room_no not in hostel.capacities)
+            if unknown:
+                # an occupied room without a capacity can't be allotted around safely
+                raise ValueError(f"Rooms without a capacity in {name}: {', '.join(unknown)}; add them with add_room()")
+            floors = self._free[name] = {}
+            for room_no in hostel.capacities:
+                free = hostel.free_beds(room_no)
+                if free > 0:
+                    floors.setdefault(hostel.floor_of(room_no), []).append((-free, room_no))
+            for heap in floors.values():
+                heapq.heapify(heap)
+
+    def free_beds(self):
+        return {name: {floor: sum(-free for free, room_no in heap if self.hostels[name].free_beds(room_no) == -free)
+                       for floor, heap in sorted(floors.items())}
+                for name, floors in self._free.items()}
+
+    def _take_room(self, name):
+        hostel = self.hostels[name]
+        best = None
+        for floor, heap in self._free[name].items():
+            while heap and hostel.free_beds(heap[0][1]) != -heap[0][0]:
+                heapq.heappop(heap)  # stale entry
+            if heap and (best is None or (heap[0][0], floor) < (best[0][0], best[1])):
+                best = (heap[0], floor)
+        return best[0][1] if best else None
+
+    def _place(self, name, room_no, student):
+        hostel = self.hostels[name]
+        hostel._place(room_no, student)
+        free = hostel.free_beds(room_no)
+        if free > 0:
+            heapq.heappush(self._free[name][hostel.floor_of(room_no)], (-free, room_no))
+
+    def allot(self, preferences, group_by=("year", "branch")):
+        # preferences: iterable of (student, [hostel_name, ...]) in priority order;
+        # an empty list means any hostel. Students sharing group_by fields are
+        # kept together in the same rooms where possible.
+        requests = [(student, list(hostels) or list(self.hostels)) for student, hostels in preferences]
+        requests.sort(key=lambda request: tuple(str(getattr(request[0], field)) for field in group_by))
+        open_rooms = {}  # (group, hostel name) -> room currently being filled by that group
+        allotted, unallotted, housed = {}, [], []
+        for student, hostels in requests:
+            if any(entity is hostel for hostel in self.hostels.values()
+                   for entity, _ in hostel.registry.links(student.student_id, "hostel")):
+                housed.append(student.student_id)
+                continue
+            group = tuple(getattr(student, field) for field in group_by)
+            for name in hostels:
+                room_no = open_rooms.get((group, name))
+                if room_no is None or self.hostels[name].free_beds(room_no) == 0:
+                    room_no = self._take_room(name)
+                if room_no is not None:
+                    self._place(name, room_no, student)
+                    open_rooms[(group, name)] = room_no
+                    allotted[student.student_id] = (name, room_no)
+                    break
+            else:
+                unallotted.append(student.student_id)
+        CollegeEntity.sink.emit({"event": "allocator.allotted", "entity": "RoomAllocator",
+                                 "message": f"Allotted {len(allotted)} students, {len(unallotted)} without a bed, {len(housed)} already housed",
+                                 "allotted": len(allotted), "unallotted": len(unallotted), "already_housed": len(housed)})
+        return {"allotted": allotted, "unallotted": unallotted, "already_housed": housed}
 
 class Library(CollegeEntity):
+    LOAN_DAYS = 14
+    SHELF_DELAY = 1  # seconds to shelve a title the library didn't have
+
     def __init__(self, name, books=None):
         super().__init__(name)
-        self.books = books if books else {}
+        self.books = CopyOnWriteDict(books)
+        self.loans = {}      # (student_id, title) -> {"issued": date, "due": date}
+        self.waitlist = {}   # title -> {student_id: reserved_at}, in queue order
+        self._locks = {}
+        self._catalogue_lock = threading.Lock()
+        self._views = {"rentable": {}, "non_rentable": {}}
+        self._titles = sorted((title.casefold(), title) for title in self.books)  # for prefix search
+        self._subscribers = []
+        for title, counts in self.books.items():
+            for kind, view in self._views.items():
+                if counts[kind] > 0:
+                    view[title] = counts[kind]
+
+    def _lock(self, title):
+        lock = self._locks.get(title)
+        if lock is None:
+            with self._catalogue_lock:
+                lock = self._locks.setdefault(title, threading.Lock())
+        return lock
+
+    def _adjust(self, title, kind, delta):
+        # caller holds the title lock; keeps the availability views and title index in step
+        book = self.books.get(title)
+        if book is None:
+            book = {"rentable": 0, "non_rentable": 0}
+            with self._catalogue_lock:
+                bisect.insort(self._titles, (title.casefold(), title))
+        old = book[kind]
+        new = old + delta
+        self.books[title] = {**book, kind: new}  # replaced, not mutated: snapshots share entries
+        if kind == "rentable" and (old > 0) != (new > 0):
+            self.cache.invalidate(("book", self, title), ("rentable", self))
+        else:
+            self.cache.invalidate(("book", self, title))
+        if new > 0:
+            self._views[kind][title] = new
+        else:
+            self._views[kind].pop(title, None)
+        for callback in self._subscribers:
+            callback(title, kind, old, new)
+
+    def subscribe(self, callback):
+        # callback(title, kind, old_count, new_count) runs under the title lock,
+        # so it must not call back into the library
+        self._subscribers.append(callback)
+
+    def unsubscribe(self, callback):
+        self._subscribers.remove(callback)
+
+    def rentable_view(self):
+        return types.MappingProxyType(self._views["rentable"])
+
+    def non_rentable_view(self):
+        return types.MappingProxyType(self._views["non_rentable"])
+
+    @cached(lambda self, title: ("book", self, title))
+    def availability(self, title):
+        book = self.books.get(title)
+        return types.MappingProxyType(dict(book)) if book is not None else None
+
+    @cached(lambda self: ("rentable", self))
+    def rentable_books(self):
+        # titles with a copy on the shelf; only changes when a title runs out or comes back
+        return tuple(sorted(self._views["rentable"]))
+
+    def search_titles(self, prefix, limit=10):
+        prefix = prefix.casefold()
+        with self._catalogue_lock:
+            i = bisect.bisect_left(self._titles, (prefix,))
+            matches = []
+            while i < len(self._titles) and len(matches) < limit and self._titles[i][0].startswith(prefix):
+                matches.append(self._titles[i][1])
+                i += 1
+        return matches
 
     def add_rentable_book(self, book_title, count):
-        if book_title in self.books:
-            self.books[book_title]["rentable"] += count
-        else:
-            self.books[book_title] = {"rentable": count, "non_rentable": 0}
+        with self._lock(book_title):
+            self._adjust(book_title, "rentable", count)
 
     def add_non_rentable_book(self, book_title, count):
-        if book_title in self.books:
-            self.books[book_title]["non_rentable"] += count
-        else:
-            self.books[book_title] = {"rentable": 0, "non_rentable": count}
+        with self._lock(book_title):
+            self._adjust(book_title, "non_rentable", count)
 
     def remove_rentable_book(self, book_title, count):
-        if book_title in self.books:
-            if self.books[book_title]["rentable"] >= count:
-                self.books[book_title]["rentable"] -= count
+        with self._lock(book_title):
+            if book_title in self.books:
+                if self.books[book_title]["rentable"] >= count:
+                    self._adjust(book_title, "rentable", -count)
+                    return
+                message = f"Not enough rentable copies of {book_title} in {self.name}"
             else:
-                print(f"Not enough rentable copies of {book_title} in {self.name}")
-        else:
-            print(f"Book {book_title} is not available in {self.name}")
+                message = f"Book {book_title} is not available in {self.name}"
+        self.emit("library.remove_failed", message, title=book_title, kind="rentable")
 
     def remove_non_rentable_book(self, book_title, count):
-        if book_title in self.books:
-            if self.books[book_title]["non_rentable"] >= count:
-                self.books[book_title]["non_rentable"] -= count
+        with self._lock(book_title):
+            if book_title in self.books:
+                if self.books[book_title]["non_rentable"] >= count:
+                    self._adjust(book_title, "non_rentable", -count)
+                    return
+                message = f"Not enough non-rentable copies of {book_title} in {self.name}"
             else:
-                print(f"Not enough non-rentable copies of {book_title} in {self.name}")
-        else:
-            print(f"Book {book_title} is not available in {self.name}")
+                message = f"Book {book_title} is not available in {self.name}"
+        self.emit("library.remove_failed", message, title=book_title, kind="non_rentable")
+
+    def _issue(self, title, student, today):
+        # caller holds the title lock
+        if title not in self.books:
+            return "unknown"
+        key = (student.student_id, title)
+        if key in self.loans:
+            return "already issued"
+        # copies are held for students ahead in the waitlist
+        waitlist = list(self.waitlist.get(title, ()))
+        ahead = waitlist.index(student.student_id) if student.student_id in waitlist else len(waitlist)
+        if self.books[title]["rentable"] <= ahead:
+            return "unavailable"
+        self._adjust(title, "rentable", -1)
+        self.loans[key] = {"issued": today, "due": today + datetime.timedelta(days=self.LOAN_DAYS)}
+        self.registry.link(student.student_id, "library", self, title)
+        if student.student_id in waitlist:
+            del self.waitlist[title][student.student_id]
+        return "issued"
+
+    def _return(self, title, student):
+        # caller holds the title lock
+        if self.loans.pop((student.student_id, title), None) is None:
+            return "not issued" if title in self.books else "unknown"
+        self.registry.unlink(student.student_id, "library", self, title)
+        self._adjust(title, "rentable", 1)
+        return "returned"
 
     def issue_book(self, title, student):
-        if title in self.books:
-            if self.books[title]["rentable"] > 0:
-                self.books[title]["rentable"] -= 1
-                print(f"Book {title} issued to {student.name}")
-            else:
-                print(f"No rentable copies of {title} available in {self.name}")
+        with self._lock(title):
+            status = self._issue(title, student, datetime.date.today())
+        if status == "issued":
+            self.emit("library.issued", f"Book {title} issued to {student.name}", title=title, student_id=student.student_id)
+        elif status == "unknown":
+            self.emit("library.unknown_title", f"Book {title} is not available in {self.name}", title=title)
+        elif status == "already issued":
+            self.emit("library.already_issued", f"{student.name} already has {title}", title=title, student_id=student.student_id)
         else:
-            print(f"Book {title} is not available in {self.name}")
+            self.emit("library.unavailable", f"No rentable copies of {title} available in {self.name}", title=title, student_id=student.student_id)
+        return status == "issued"
 
     def return_book(self, title, student):
-        if title in self.books:
-            self.books[title]["rentable"] += 1
-            print(f"{title} returned by {student.name}")
+        with self._lock(title):
+            status = self._return(title, student)
+        if status == "returned":
+            self.emit("library.returned", f"{title} returned by {student.name}", title=title, student_id=student.student_id)
+        elif status == "not issued":
+            self.emit("library.not_issued", f"{title} was not issued to {student.name}", title=title, student_id=student.student_id)
         else:
-            print("Updating Shelf....")
-            time.sleep(1)
-            self.books.update({title:{"rentable":1, "non_rentable":0}})
-            print(f"{title} added to {self.name}. Shelf Updated")
+            self.emit("library.shelving", "Updating Shelf....", title=title)
+            time.sleep(self.SHELF_DELAY)
+            self.add_rentable_book(title, 1)
+            self.emit("library.shelved", f"{title} added to {self.name}. Shelf Updated", title=title)
+        return status == "returned"
+
+    def reserve_book(self, title, student):
+        with self._lock(title):
+            if title not in self.books:
+                status = "unknown"
+            else:
+                waitlist = self.waitlist.setdefault(title, {})
+                status = "queued" if student.student_id not in waitlist else "already queued"
+                waitlist.setdefault(student.student_id, time.time())
+                position = list(waitlist).index(student.student_id) + 1
+        if status == "unknown":
+            self.emit("library.unknown_title", f"Book {title} is not available in {self.name}", title=title)
+            return None
+        self.emit("library.reserved", f"{student.name} is #{position} in the waitlist for {title}", title=title, student_id=student.student_id, position=position)
+        return position
+
+    def cancel_reservation(self, title, student):
+        with self._lock(title):
+            return self.waitlist.get(title, {}).pop(student.student_id, None) is not None
+
+    def _restore_reservations(self, title, before, student_ids):
+        # put reservations dropped by rolled-back issues back in their old places;
+        # entries that came and went since are left as they are. No events.
+        with self._lock(title):
+            current = self.waitlist.get(title, {})
+            waitlist = {student_id: reserved_at for student_id, reserved_at in before.items()
+                        if student_id in current or student_id in student_ids}
+            waitlist.update(current)
+            if waitlist:
+                self.waitlist[title] = waitlist
+
+    def _bulk(self, action, requests):
+        by_title = {}
+        for i, (title, student) in enumerate(requests):
+            by_title.setdefault(title, []).append((i, student))
+        results = [None] * len(requests)
+        today = datetime.date.today()
+        for title, group in by_title.items():
+            with self._lock(title):
+                for i, student in group:
+                    results[i] = self._issue(title, student, today) if action == "issue" else self._return(title, student)
+        return results
+
+    def issue_books(self, requests):
+        # requests: iterable of (title, student); one status per request, in order
+        results = self._bulk("issue", list(requests))
+        self.emit("library.bulk_issued", f"{results.count('issued')}/{len(results)} books issued from {self.name}", issued=results.count("issued"), total=len(results))
+        return results
+
+    def return_books(self, requests):
+        results = self._bulk("return", list(requests))
+        self.emit("library.bulk_returned", f"{results.count('returned')}/{len(results)} books returned to {self.name}", returned=results.count("returned"), total=len(results))
+        return results
+
+    def loans_of(self, student):
+        return {title: loan for (student_id, title), loan in self.loans.items() if student_id == student.student_id}
+
+    def overdue_loans(self, today=None):
+        today = today or datetime.date.today()
+        return {key: loan for key, loan in self.loans.items() if loan["due"] < today}
+
+    def snapshot(self):
+        return self.books.snapshot()
 
     def update_db(self, db) :
-        for book in self.books:
-            db[book] = self.books[book]
-        print(f"Database updated for {self.name}")
+        # db stays keyed by title; entries are the snapshot's read-only views,
+        # so later catalogue changes don't leak into db
+        db.update(self.books.snapshot().items())
+        self.emit("library.db_updated", f"Database updated for {self.name}")
 
     @staticmethod
     def get_rentable_books(db) :
@@ -403,23 +1994,60 @@ class Library(CollegeEntity):
         return non_rentable_db
 
 class AccountsDepartment(CollegeEntity):
-    def __init__(self, name):
+    def __init__(self, name, ledger=None, db=None):
         super().__init__(name)
-        self.fees_paid = {}
+        self.ledger = ledger if ledger is not None else fee_ledger
+        self.db = db  # student store to re-log after payments, if persistent
+
+    @property
+    def fees_paid(self):
+        return self.ledger.totals("tuition")
 
     def pay_fees(self, student, amount):
-        self.fees_paid[student.student_id] = amount
-        student.fees += amount
-        print(f"{student.name} paid ₹{amount}")
+        self.ledger.post(student, amount, "tuition", self.db)
+        self.emit("accounts.fee_paid", f"{student.name} paid ₹{amount}", student_id=student.student_id, amount=amount)
+
+    def payment_history(self, student):
+        return self.ledger.history(student.student_id)
 
 class Academic(CollegeEntity):
     def __init__(self, name):
         super().__init__(name)
         self.records = {}
+        self._subject_index = {}  # subject -> {(student_id, year, semester): grade}
+        self._indexed = {}        # student_id -> {(year, semester, subject), ...} in _subject_index
+        self._observers = []
 
-    def assign_grade(self, faculty, student, year, semester, subject, grade):
-        student_id = student.student_id
+    def subscribe(self, observer):
+        # observer gets grade_assigned(student_id, year, semester, subject, grade)
+        # and grades_replaced(student_id, grades) after each change
+        self._observers.append(observer)
 
+    @staticmethod
+    def _copy_grades(grades):
+        return {year: {semester: dict(subjects) for semester, subjects in semesters.items()}
+                for year, semesters in grades.items()}
+
+    def _index_grades(self, student_id, grades):
+        keys = self._indexed.setdefault(student_id, set())
+        for year, semesters in grades.items():
+            for semester, subjects in semesters.items():
+                for subject, grade in subjects.items():
+                    self._subject_index.setdefault(subject, {})[(student_id, year, semester)] = grade
+                    keys.add((year, semester, subject))
+
+    def _unindex_grades(self, student_id):
+        # works from what was indexed, not from records, so it can't miss entries; returns their subjects
+        keys = self._indexed.pop(student_id, ())
+        for year, semester, subject in keys:
+            entries = self._subject_index.get(subject)
+            if entries is not None:
+                entries.pop((student_id, year, semester), None)
+                if not entries:
+                    del self._subject_index[subject]
+        return {subject for _, _, subject in keys}
+
+    def _set_grade(self, student_id, year, semester, subject, grade):
         if student_id not in self.records:
             self.records[student_id] = {}
 
@@ -430,71 +2058,1564 @@ class Academic(CollegeEntity):
             self.records[student_id][year][semester] = {}
 
         self.records[student_id][year][semester][subject] = grade
-        print(f"Grade assigned to {student.name} in {subject} ({year} year, Sem {semester})")
+        self._subject_index.setdefault(subject, {})[(student_id, year, semester)] = grade
+        self._indexed.setdefault(student_id, set()).add((year, semester, subject))
+        self.cache.invalidate(("grades", self, student_id), ("subject", self, subject))
+        for observer in self._observers:
+            observer.grade_assigned(student_id, year, semester, subject, grade)
+
+    def assign_grade(self, faculty, student, year, semester, subject, grade):
+        student_id = student.student_id
+        self._set_grade(student_id, year, semester, subject, grade)
+        self.emit("academic.grade_assigned", f"Grade assigned to {student.name} in {subject} ({year} year, Sem {semester})", student_id=student_id, year=year, semester=semester, subject=subject, grade=grade)
+
+    def assign_grades(self, grades):
+        # grades: iterable of (student_id, year, semester, subject, grade); one summary event
+        count = 0
+        for student_id, year, semester, subject, grade in grades:
+            self._set_grade(student_id, year, semester, subject, grade)
+            count += 1
+        self.emit("academic.grades_assigned", f"{count} grades assigned", count=count)
+        return count
+
+    @cached(lambda self, student_id: ("grades", self, student_id))
+    def transcript(self, student_id):
+        # ((year, semester, subject, grade), ...) or None if the student has no records
+        if student_id not in self.records:
+            return None
+        return tuple((year, semester, subject, grade)
+                     for year, semesters in self.records[student_id].items()
+                     for semester, subjects in semesters.items()
+                     for subject, grade in subjects.items())
 
     def view_grades(self, student):
         student_id = student.student_id
 
         print(f"\nGrades for {student.name} (ID: {student_id}, Roll No: {student.roll_no}):")
 
-        if student_id not in self.records:
+        transcript = self.transcript(student_id)
+        if transcript is None:
             print("No records found.")
             return
 
-        for year in self.records[student_id]:
-            print(f"Year {year}:")
-            for semester in self.records[student_id][year]:
+        term = None
+        for year, semester, subject, grade in transcript:
+            if term is None or term[0] != year:
+                print(f"Year {year}:")
+            if term != (year, semester):
                 print(f"  Semester {semester}:")
-                for subject in self.records[student_id][year][semester]:
-                    grade = self.records[student_id][year][semester][subject]
-                    print(f"    {subject}: {grade}")
+                term = (year, semester)
+            print(f"    {subject}: {grade}")
+
+    @cached(lambda self, subject_name: ("subject", self, subject_name))
+    def get_subject_grades(self, subject_name):
+        return tuple(
+            types.MappingProxyType({"student_id": student_id, "year": year, "semester": semester, "grade": grade})
+            for (student_id, year, semester), grade in self._subject_index.get(subject_name, {}).items()
+        )
 
     def view_subject_grades(self, subject_name):
         print(f"\nGrades for Subject: {subject_name}")
-        for student_id in self.records:
-            for year in self.records[student_id]:
-                for semester in self.records[student_id][year]:
-                    sem_data = self.records[student_id][year][semester]
-                    if subject_name in sem_data:
-                        grade = sem_data[subject_name]
-                        print(f"Student ID {student_id} - Year {year} Sem {semester}: {grade}")
+        results = self.get_subject_grades(subject_name)
+        for r in results:
+            print(f"Student ID {r['student_id']} - Year {r['year']} Sem {r['semester']}: {r['grade']}")
+        return results
+
+    def _replace_grades(self, student_id, grades):
+        # grades=None drops the student's records altogether. The tree is copied
+        # so later changes to the caller's dicts can't desync records and the index.
+        subjects = self._unindex_grades(student_id)
+        if grades is not None:
+            grades = self._copy_grades(grades)
+            self.records[student_id] = grades
+            self._index_grades(student_id, grades)
+            subjects.update(subject for semesters in grades.values() for subjects in semesters.values() for subject in subjects)
+        else:
+            self.records.pop(student_id, None)
+        self.cache.invalidate(("grades", self, student_id), *(("subject", self, subject) for subject in subjects))
+        for observer in self._observers:
+            observer.grades_replaced(student_id, grades or {})
 
     def update_grades(self, student, grades):
-        self.records[student.student_id] = grades
-        print(f"{student.name}'s grades updated")
+        self._replace_grades(student.student_id, grades)
+        self.emit("academic.grades_updated", f"{student.name}'s grades updated", student_id=student.student_id)
+
+class GradeAnalytics:
+    GRADE_POINTS = {"O": 10, "A+": 10, "A": 9, "B+": 8, "B": 7, "C+": 6, "C": 5, "D": 4, "E": 3, "F": 0}
+    COLUMNS = ("student", "term", "subject", "grade")
+
+    def __init__(self, academic, credits=None):
+        if np is None:
+            raise ImportError("GradeAnalytics requires numpy")
+        self.credits = credits or {}   # subject -> credit weight, default 1
+        self.grades = list(self.GRADE_POINTS)
+        self._grade_codes = {grade: i for i, grade in enumerate(self.grades)}
+        self._points = np.array([self.GRADE_POINTS[g] for g in self.grades], dtype=np.float64)
+        self.student_ids, self._student_codes = [], {}
+        self.terms, self._term_codes = [], {}
+        self.subjects, self._subject_codes = [], {}
+        self._rows = {}          # (student_id, year, semester, subject) -> row
+        self._student_keys = {}  # student_id -> [(student_id, year, semester, subject), ...]
+        self._size = 0
+        self._data = {column: np.empty(0, dtype=np.int32) for column in self.COLUMNS}
+        self._valid = np.empty(0, dtype=bool)
+        self._load(academic.records)
+        academic.subscribe(self)
+
+    @staticmethod
+    def _code(value, values, codes):
+        code = codes.get(value)
+        if code is None:
+            code = codes[value] = len(values)
+            values.append(value)
+        return code
+
+    def _encode(self, student_id, year, semester, subject, grade):
+        grade_code = self._grade_codes.get(grade)
+        if grade_code is None:
+            return None  # ungraded/unknown marks don't count towards GPA
+        return (self._code(student_id, self.student_ids, self._student_codes),
+                self._code((year, semester), self.terms, self._term_codes),
+                self._code(subject, self.subjects, self._subject_codes),
+                grade_code)
+
+    def _load(self, records):
+        students, terms, subjects, grades = [], [], [], []
+        rows, grade_codes, subject_codes = self._rows, self._grade_codes, self._subject_codes
+        for student_id, years in records.items():
+            student = self._code(student_id, self.student_ids, self._student_codes)
+            keys = self._student_keys.setdefault(student_id, [])
+            for year, semesters in years.items():
+                for semester, marks in semesters.items():
+                    term = self._code((year, semester), self.terms, self._term_codes)
+                    for subject, grade in marks.items():
+                        grade_code = grade_codes.get(grade)
+                        if grade_code is None:
+                            continue  # ungraded/unknown marks don't count towards GPA
+                        subject_code = subject_codes.get(subject)
+                        if subject_code is None:
+                            subject_code = self._code(subject, self.subjects, subject_codes)
+                        key = (student_id, year, semester, subject)
+                        rows[key] = len(grades)
+                        keys.append(key)
+                        students.append(student)
+                        terms.append(term)
+                        subjects.append(subject_code)
+                        grades.append(grade_code)
+        self._data = {column: np.array(values, dtype=np.int32)
+                      for column, values in zip(self.COLUMNS, (students, terms, subjects, grades))}
+        self._size = len(grades)
+        self._valid = np.ones(self._size, dtype=bool)
+
+    def _append(self, key, codes):
+        if self._size == len(self._valid):
+            capacity = max(1024, 2 * self._size)
+            for column in self.COLUMNS:
+                self._data[column] = np.resize(self._data[column], capacity)
+            self._valid = np.resize(self._valid, capacity)
+        row = self._size
+        for column, code in zip(self.COLUMNS, codes):
+            self._data[column][row] = code
+        self._valid[row] = True
+        self._size += 1
+        self._rows[key] = row
+        self._student_keys.setdefault(key[0], []).append(key)
+
+    def grade_assigned(self, student_id, year, semester, subject, grade):
+        key = (student_id, year, semester, subject)
+        codes = self._encode(student_id, year, semester, subject, grade)
+        row = self._rows.get(key)
+        if row is not None:
+            if codes is None:
+                self._valid[row] = False
+                del self._rows[key]
+            else:
+                self._data["grade"][row] = codes[3]
+        elif codes is not None:
+            self._append(key, codes)
+
+    def grades_replaced(self, student_id, grades):
+        for key in self._student_keys.pop(student_id, []):
+            row = self._rows.pop(key, None)
+            if row is not None:
+                self._valid[row] = False
+        for year, semesters in grades.items():
+            for semester, subjects in semesters.items():
+                for subject, grade in subjects.items():
+                    self.grade_assigned(student_id, year, semester, subject, grade)
+
+    def _columns(self):
+        valid = self._valid[:self._size]
+        columns = {column: self._data[column][:self._size][valid] for column in self.COLUMNS}
+        subject_credits = np.array([self.credits.get(subject, 1) for subject in self.subjects], dtype=np.float64)
+        weights = subject_credits[columns["subject"]] if len(self.subjects) else np.empty(0)
+        return columns, self._points[columns["grade"]], weights
+
+    @staticmethod
+    def _weighted_mean(groups, points, weights, size):
+        totals = np.bincount(groups, weights=points * weights, minlength=size)
+        credits = np.bincount(groups, weights=weights, minlength=size)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return totals / credits
+
+    def cgpa_array(self):
+        columns, points, weights = self._columns()
+        return self._weighted_mean(columns["student"], points, weights, len(self.student_ids))
+
+    def cgpa(self):
+        return {student_id: round(float(value), 2)
+                for student_id, value in zip(self.student_ids, self.cgpa_array()) if not np.isnan(value)}
+
+    def sgpa_array(self):
+        # students x terms matrix, NaN where a student has no grades in a term
+        columns, points, weights = self._columns()
+        n_students, n_terms = len(self.student_ids), len(self.terms)
+        groups = columns["student"].astype(np.int64) * n_terms + columns["term"]
+        return self._weighted_mean(groups, points, weights, n_students * n_terms).reshape(n_students, n_terms)
+
+    def sgpa(self):
+        values = self.sgpa_array().round(2)
+        graded = ~np.isnan(values)
+        return {
+            student_id: {self.terms[term]: float(values[student, term]) for term in np.flatnonzero(graded[student])}
+            for student, student_id in enumerate(self.student_ids) if graded[student].any()
+        }
+
+    def subject_stats(self):
+        columns, points, weights = self._columns()
+        n_subjects, n_grades = len(self.subjects), len(self.grades)
+        means = self._weighted_mean(columns["subject"], points, np.ones_like(points), n_subjects)
+        distribution = np.bincount(columns["subject"].astype(np.int64) * n_grades + columns["grade"],
+                                   minlength=n_subjects * n_grades).reshape(n_subjects, n_grades)
+        return {
+            subject: {"mean": round(float(means[i]), 2),
+                      "distribution": {grade: int(count) for grade, count in zip(self.grades, distribution[i]) if count}}
+            for i, subject in enumerate(self.subjects) if distribution[i].any()
+        }
+
+    def department_rankings(self, db):
+        cgpa = self.cgpa_array()
+        branches, branch_codes = [], {}
+        branch = np.array([self._code(getattr(get_element_by_id(student_id, db), "branch", None), branches, branch_codes)
+                           for student_id in self.student_ids], dtype=np.int64)
+        graded = np.flatnonzero(~np.isnan(cgpa))
+        order = graded[np.lexsort((-cgpa[graded], branch[graded]))]
+        rankings = {}
+        for student in order:
+            rankings.setdefault(branches[branch[student]], []).append((self.student_ids[student], round(float(cgpa[student]), 2)))
+        return rankings
+
+class Menu(CopyOnWriteDict):
+    # Single versioned price list for a Canteen. Orders are priced against a
+    # snapshot and record its version; canteen_db holds published snapshots.
+    pass
 
 class Canteen(CollegeEntity):
-    def __init__(self, name, menu):
-        super().__init__(name)
-        self.menu = menu
+    APPROVAL_DELAY = 2  # seconds for a menu request to be approved
 
-    def order_item(self, student, item):
-        if item in self.menu:
-            print(f"{student.name} ordered {item} for ₹{self.menu[item]}")
+    def __init__(self, name, menu, batch_size=64):
+        super().__init__(name)
+        self.menu = menu if isinstance(menu, Menu) else Menu(menu)
+        self.batch_size = batch_size
+        self.orders = {}            # order_id -> order record
+        self._order_ids = itertools.count(1)
+        self._queue = None
+        self._workers = []
+        self._approvals = []
+        self._observers = []
+        self._dbs = []              # dbs the menu has been published to
+
+    def subscribe(self, observer):
+        # observer gets order_completed(order) after each order is priced;
+        # with a worker pool this runs on the worker threads
+        self._observers.append(observer)
+
+    def start(self, workers=4):
+        # Orders placed after start() are queued and priced by a worker pool;
+        # before that they are processed inline as they arrive
+        if self._queue is None:
+            self._queue = queue.Queue()
+            self._workers = [threading.Thread(target=self._run, daemon=True) for _ in range(workers)]
+            for worker in self._workers:
+                worker.start()
+
+    def stop(self):
+        if self._queue is not None:
+            self._queue.join()
+            for _ in self._workers:
+                self._queue.put(None)
+            for worker in self._workers:
+                worker.join()
+            self._queue, self._workers = None, []
+
+    def drain(self):
+        if self._queue is not None:
+            self._queue.join()
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            while batch[-1] is not None and len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            orders = [order for order in batch if order is not None]
+            try:
+                if orders:
+                    self._process(orders)
+            finally:
+                # drain()/stop() wait on these, so they must run even if pricing blew up
+                for _ in batch:
+                    self._queue.task_done()
+            if len(orders) < len(batch):
+                break
+
+    def _price(self, order, prices):
+        price = prices.get(order["item"])
+        if price is None:
+            order["status"] = "rejected"
+            self.emit("canteen.item_unavailable", f"{order['item']} not available in canteen",
+                      order_id=order["order_id"], student_id=order["student_id"], item=order["item"])
+            return
+        order.update(price=price, total=price * order["quantity"], menu_version=prices.version, status="completed")
+        self.emit("canteen.ordered", f"{order['student_name']} ordered {order['item']} for ₹{price}",
+                  order_id=order["order_id"], student_id=order["student_id"], item=order["item"], price=price)
+        for observer in self._observers:
+            observer.order_completed(order)
+
+    def _process(self, orders):
+        prices = self.menu.snapshot()
+        for order in orders:
+            try:
+                self._price(order, prices)
+            except Exception as e:
+                # a failing order (or subscriber) must not take the rest of the batch with it
+                order.update(status="failed", error=f"{type(e).__name__}: {e}")
+                self.emit("canteen.order_failed", f"Order {order['order_id']} failed: {order['error']}",
+                          order_id=order["order_id"], student_id=order["student_id"], item=order["item"])
+
+    def order_item(self, student, item, quantity=1):
+        if isinstance(quantity, bool) or not isinstance(quantity, int) or quantity < 1:
+            raise ValueError(f"Quantity must be a positive whole number, got {quantity!r}")
+        order = {"order_id": next(self._order_ids), "student_id": student.student_id, "student_name": student.name,
+                 "item": item, "quantity": quantity, "price": None, "total": None, "menu_version": None,
+                 "status": "queued", "time": time.time()}
+        self.orders[order["order_id"]] = order
+        if self._queue is not None:
+            self._queue.put(order)
         else:
-            print(f"{item} not available in canteen")
+            self._process([order])
+        return order["order_id"]
+
+    def order_status(self, order_id):
+        order = self.orders.get(order_id)
+        return order["status"] if order is not None else None
+
+    def _publish(self):
+        snapshot = self.menu.snapshot()
+        for db in self._dbs:
+            db[self.name] = snapshot
 
     def update_db(self, db):
-        db[self.name] = self.menu
-        print(f"Canteen {db[self.name]} updated in database")
+        # publishes an immutable snapshot; later menu changes are republished
+        # to every db this canteen has been published to
+        if not any(known is db for known in self._dbs):
+            self._dbs.append(db)
+        db[self.name] = self.menu.snapshot()
+        self.emit("canteen.db_updated", f"Canteen {db[self.name]} updated in database")
 
     def update_menu(self, db, item, price):
         if self.name not in db:
-            print(f"{self.name} not found in DB. Adding first...")
+            self.emit("canteen.db_missing", f"{self.name} not found in DB. Adding first...")
             self.update_db(db)
-        db[self.name].update({item: price})
-        print(f"Menu updated in database")
+        self.menu[item] = price
+        self._publish()
+        self.emit("canteen.menu_updated", f"Menu updated in database", item=item, price=price)
 
-    def request_item(self, item, price):
-        print(f"Requested to add {item} add to canteen menu for ₹{price}...")
-        time.sleep(2)
+    def _approve(self, item, price):
         self.menu[item] = price
-        print("Request Approved")
+        self._publish()
+        self.emit("canteen.request_approved", "Request Approved", item=item, price=price)
+
+    def request_item(self, item, price):
+        # Approval runs on a timer thread instead of blocking the caller
+        self.emit("canteen.item_requested", f"Requested to add {item} add to canteen menu for ₹{price}...", item=item, price=price)
+        if not self.APPROVAL_DELAY:
+            self._approve(item, price)
+            return
+        timer = threading.Timer(self.APPROVAL_DELAY, self._approve, (item, price))
+        timer.daemon = True
+        self._approvals = [t for t in self._approvals if t.is_alive()] + [timer]
+        timer.start()
+
+    def await_approvals(self, timeout=None):
+        for timer in self._approvals:
+            timer.join(timeout)
+        self._approvals = [t for t in self._approvals if t.is_alive()]
+
+class HeavyHitters:
+    # Space-Saving top-k: keeps at most `capacity` counters, so memory stays
+    # fixed however many distinct keys are seen. Counts are over-estimates by
+    # at most the recorded error. The minimum counter is found through a heap
+    # of (count, key) with lazy invalidation, rebuilt when stale entries pile up.
+    def __init__(self, capacity=64):
+        self.capacity = capacity
+        self.counts = {}   # key -> [count, error]
+        self._heap = []
+
+    def add(self, key, weight=1):
+        counter = self.counts.get(key)
+        if counter is not None:
+            counter[0] += weight
+        elif len(self.counts) < self.capacity:
+            counter = self.counts[key] = [weight, 0]
+        else:
+            while True:
+                floor, victim = heapq.heappop(self._heap)
+                if self.counts.get(victim, (None,))[0] == floor:
+                    break
+            del self.counts[victim]
+            counter = self.counts[key] = [floor + weight, floor]
+        if len(self._heap) > 4 * self.capacity:
+            self._heap = [(count, k) for k, (count, _) in self.counts.items()]
+            heapq.heapify(self._heap)
+        else:
+            heapq.heappush(self._heap, (counter[0], key))
+
+    def top(self, k=10):
+        return [(key, count) for key, (count, _) in heapq.nlargest(k, self.counts.items(), key=lambda kv: kv[1][0])]
+
+class SalesAggregator:
+    # Streaming revenue figures for a Canteen, updated from order_completed()
+    # instead of rescanning Canteen.orders on every refresh
+    def __init__(self, canteen, window=3600, buckets=60, hours=24, top_k=10):
+        self.window = window
+        self.bucket_width = window / buckets
+        self._buckets = [[None, 0, 0] for _ in range(buckets)]   # [bucket_no, orders, revenue]
+        self._window_orders = self._window_revenue = 0
+        self._hours = [[None, 0, 0] for _ in range(hours)]       # [hour_no, orders, revenue]
+        self.item_revenue = {}     # item -> revenue, bounded by the menu
+        self.item_orders = {}
+        self.student_spend = {}    # student_id -> total spend, bounded by the student body
+        self.top_items = HeavyHitters(4 * top_k)
+        self.top_spenders = HeavyHitters(4 * top_k)
+        self.orders = self.revenue = 0
+        self._lock = threading.Lock()
+        for order in list(canteen.orders.values()):
+            if order["status"] == "completed":
+                self.order_completed(order)
+        canteen.subscribe(self)
+
+    def _slot(self, ring, number, expire=None):
+        slot = ring[number % len(ring)]
+        if slot[0] != number:
+            if expire is not None and slot[0] is not None:
+                expire(slot)
+            slot[:] = [number, 0, 0]
+        return slot
+
+    def _expire(self, slot):
+        self._window_orders -= slot[1]
+        self._window_revenue -= slot[2]
+
+    def _advance(self, now):
+        # drop sliding-window buckets that have fallen out of the window
+        current = int(now // self.bucket_width)
+        for slot in self._buckets:
+            if slot[0] is not None and slot[0] <= current - len(self._buckets):
+                self._expire(slot)
+                slot[:] = [None, 0, 0]
+
+    def order_completed(self, order):
+        total, when = order["total"], order["time"]
+        with self._lock:
+            self.orders += 1
+            self.revenue += total
+            self.item_revenue[order["item"]] = self.item_revenue.get(order["item"], 0) + total
+            self.item_orders[order["item"]] = self.item_orders.get(order["item"], 0) + order["quantity"]
+            self.student_spend[order["student_id"]] = self.student_spend.get(order["student_id"], 0) + total
+            self.top_items.add(order["item"], order["quantity"])
+            self.top_spenders.add(order["student_id"], total)
+            hour = self._slot(self._hours, int(when // 3600))
+            hour[1] += 1
+            hour[2] += total
+            bucket_no = int(when // self.bucket_width)
+            if bucket_no > int(time.time() // self.bucket_width) - len(self._buckets):
+                bucket = self._slot(self._buckets, bucket_no, self._expire)
+                bucket[1] += 1
+                bucket[2] += total
+                self._window_orders += 1
+                self._window_revenue += total
+
+    def spend(self, student_id):
+        return self.student_spend.get(student_id, 0)
+
+    def window_totals(self, now=None):
+        # (orders, revenue) over the last `window` seconds
+        with self._lock:
+            self._advance(time.time() if now is None else now)
+            return self._window_orders, self._window_revenue
+
+    def hourly(self, now=None):
+        # {hour_start: (orders, revenue)} for the retained tumbling hours
+        current = int((time.time() if now is None else now) // 3600)
+        with self._lock:
+            return {slot[0] * 3600: (slot[1], slot[2]) for slot in sorted(self._hours, key=lambda s: s[0] or 0)
+                    if slot[0] is not None and slot[0] > current - len(self._hours)}
+
+    def best_sellers(self, k=10):
+        with self._lock:
+            return self.top_items.top(k)
+
+    def biggest_spenders(self, k=10):
+        with self._lock:
+            return self.top_spenders.top(k)
+
+class BulkIO:
+    # Streaming CSV/JSONL import and export. Rows are read lazily, validated,
+    # inserted in batches and failures are reported per line without aborting.
+    STUDENT_FIELDS = ("student_id", "roll_no", "name", "year", "course", "branch", "phone", "email", "fees")
+    FACULTY_FIELDS = ("faculty_id", "name", "department", "phone", "email")
+    GRADE_FIELDS = ("student_id", "year", "semester", "subject", "grade")
+    BOOK_FIELDS = ("title", "rentable", "non_rentable")
+
+    def __init__(self, courses=(), departments=(), batch_size=1000, max_errors=1000):
+        self.courses = {}
+        for course in courses:
+            self.courses[course.course_id] = self.courses[course.course_name] = course
+        self.departments = {}
+        for department in departments:
+            self.departments[department.id] = self.departments[department.name] = department
+        self.batch_size = batch_size
+        self.max_errors = max_errors
+
+    @staticmethod
+    def read_rows(path):
+        with open(path, newline="", encoding="utf-8") as f:
+            if path.endswith(".csv"):
+                yield from enumerate(csv.DictReader(f), start=2)
+            else:
+                for line_no, line in enumerate(f, start=1):
+                    if line.strip():
+                        yield line_no, line
+
+    @staticmethod
+    def write_rows(path, fieldnames, rows):
+        count = 0
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            if path.endswith(".csv"):
+                writer = csv.DictWriter(f, fieldnames)
+                writer.writeheader()
+                for row in rows:
+                    writer.writerow(row)
+                    count += 1
+            else:
+                for row in rows:
+                    f.write(json.dumps(row, ensure_ascii=False) + "\n")
+                    count += 1
+        return count
+
+    @staticmethod
+    def _field(row, name):
+        value = row.get(name)
+        if value is None or (isinstance(value, str) and not value.strip()):
+            raise ValueError(f"missing field '{name}'")
+        if not isinstance(value, (str, int, float)):
+            raise ValueError(f"field '{name}' must be a string or number, got {type(value).__name__}")
+        return value.strip() if isinstance(value, str) else value
+
+    def _int(self, row, name, default=None):
+        if default is not None and row.get(name) in (None, ""):
+            return default
+        value = self._field(row, name)
+        try:
+            return int(value)
+        except (TypeError, ValueError):
+            raise ValueError(f"field '{name}' must be an integer, got {value!r}")
+
+    def _department(self, row, name):
+        key = self._field(row, name)
+        if key not in self.departments:
+            raise ValueError(f"unknown department '{key}'")
+        return self.departments[key]
+
+    def _run(self, label, path, parse, insert):
+        report = {"imported": 0, "failed": 0, "errors": []}
+
+        def fail(line_no, error):
+            report["failed"] += 1
+            if len(report["errors"]) < self.max_errors:
+                report["errors"].append((line_no, str(error)))
+
+        batch = []
+        for line_no, raw in self.read_rows(path):
+            try:
+                row = json.loads(raw) if isinstance(raw, str) else raw
+                if not isinstance(row, dict):
+                    raise ValueError("row is not an object")
+                batch.append((line_no, parse(row)))
+            except (ValueError, TypeError) as e:
+                fail(line_no, e)
+            if len(batch) >= self.batch_size:
+                report["imported"] += len(batch) - self._flush(batch, insert, fail)
+                batch = []
+        report["imported"] += len(batch) - self._flush(batch, insert, fail)
+        CollegeEntity.sink.emit({"event": f"import.{label}", "entity": "BulkIO",
+                                 "message": f"Imported {report['imported']} {label} from {path}, {report['failed']} rows failed",
+                                 "imported": report["imported"], "failed": report["failed"]})
+        return report
+
+    @staticmethod
+    def _flush(batch, insert, fail):
+        if not batch:
+            return 0
+        failures = insert(batch)
+        for line_no, error in failures:
+            fail(line_no, error)
+        return len(failures)
+
+    def import_students(self, path, db):
+        def parse(row):
+            course = self._field(row, "course")
+            if course not in self.courses:
+                raise ValueError(f"unknown course '{course}'")
+            department = self._department(row, "branch")
+            student = Student(self._field(row, "student_id"), self._field(row, "roll_no"), self._field(row, "name"),
+                              self._int(row, "year"), self.courses[course], department.name, self._field(row, "phone"),
+                              self._field(row, "email"), self._int(row, "fees", default=0))
+            return student, department
+
+        def insert(batch):
+            failures = []
+            for line_no, (student, department) in batch:
+                try:
+                    if student.student_id in db:
+                        raise ValueError(f"duplicate student_id '{student.student_id}'")
+                    if department.std_db is db:
+                        department.add_student(student)
+                    else:
+                        db[student.student_id] = student
+                except (ValueError, TypeError) as e:
+                    failures.append((line_no, e))
+            return failures
+
+        return self._run("students", path, parse, insert)
+
+    def import_faculty(self, path, db):
+        def parse(row):
+            department = self._department(row, "department")
+            faculty = Faculty(self._field(row, "faculty_id"), self._field(row, "name"), department.name,
+                              self._field(row, "phone"), self._field(row, "email"))
+            return faculty, department
+
+        def insert(batch):
+            failures = []
+            for line_no, (faculty, department) in batch:
+                if faculty.faculty_id in db:
+                    failures.append((line_no, ValueError(f"duplicate faculty_id '{faculty.faculty_id}'")))
+                    continue
+                db[faculty.faculty_id] = faculty
+                if department.faculty is not None:
+                    department.faculty.append(faculty)
+            return failures
+
+        return self._run("faculty", path, parse, insert)
+
+    def import_grades(self, path, academic, student_db):
+        def parse(row):
+            student_id = self._field(row, "student_id")
+            if student_id not in student_db:
+                raise ValueError(f"unknown student '{student_id}'")
+            return (student_id, self._int(row, "year"), self._int(row, "semester"),
+                    self._field(row, "subject"), self._field(row, "grade"))
+
+        def insert(batch):
+            academic.assign_grades(grade for line_no, grade in batch)
+            return []
+
+        return self._run("grades", path, parse, insert)
+
+    def import_books(self, path, library):
+        def parse(row):
+            counts = (self._int(row, "rentable", default=0), self._int(row, "non_rentable", default=0))
+            if min(counts) < 0:
+                raise ValueError("book counts can't be negative")
+            return (self._field(row, "title"),) + counts
+
+        def insert(batch):
+            for line_no, (title, rentable, non_rentable) in batch:
+                library.add_rentable_book(title, rentable)
+                if non_rentable:
+                    library.add_non_rentable_book(title, non_rentable)
+            return []
+
+        return self._run("books", path, parse, insert)
+
+    def export_students(self, db, path):
+        return self.write_rows(path, self.STUDENT_FIELDS,
+                               ({field: _index_key(getattr(s, field)) for field in self.STUDENT_FIELDS} for s in db.values()))
+
+    def export_faculty(self, db, path):
+        return self.write_rows(path, self.FACULTY_FIELDS,
+                               ({field: getattr(f, field) for field in self.FACULTY_FIELDS} for f in db.values()))
+
+    def export_grades(self, academic, path):
+        rows = ({"student_id": student_id, "year": year, "semester": semester, "subject": subject, "grade": grade}
+                for student_id, years in academic.records.items()
+                for year, semesters in years.items()
+                for semester, subjects in semesters.items()
+                for subject, grade in subjects.items())
+        return self.write_rows(path, self.GRADE_FIELDS, rows)
+
+    def export_books(self, library, path):
+        return self.write_rows(path, self.BOOK_FIELDS,
+                               ({"title": title, **counts} for title, counts in library.books.items()))
+
+class SearchIndex:
+    # In-memory fuzzy search over students, faculty and library titles. Text
+    # is split into lowercase tokens with an inverted index token -> docs;
+    # a trigram index over the vocabulary finds misspelt tokens and a sorted
+    # vocabulary answers prefixes. Every query token must match a document
+    # (exactly, by prefix or fuzzily); documents are ranked by match quality.
+    FIELDS = {
+        "student": ("name", "student_id", "roll_no", "email", "branch"),
+        "faculty": ("name", "faculty_id", "email", "department"),
+    }
+    TOKEN = re.compile(r"[^\W_]+")
+    PREFIX_WEIGHT = 0.9
+    FUZZY_WEIGHT = 0.8
+
+    def __init__(self, min_similarity=0.4, max_expansions=32, trigram_budget=5_000):
+        self.min_similarity = min_similarity
+        self.max_expansions = max_expansions   # vocabulary tokens tried per query token
+        self.trigram_budget = trigram_budget   # postings scanned to find fuzzy candidates
+        self._docs = []          # doc id -> (kind, key, label) or None once removed
+        self._doc_ids = {}       # (kind, key) -> doc id
+        self._free = []          # ids of removed docs, reused before the list grows
+        self._doc_tokens = {}    # doc id -> tokens, for removal
+        self._postings = {}      # token -> {doc id, ...}
+        self._trigrams = {}      # trigram -> [token, ...]
+        self._vocabulary = []    # sorted tokens, for prefix lookups
+        self._unsorted = None    # new tokens collected during a bulk load
+        self._lock = threading.Lock()
+
+    @classmethod
+    def tokens(cls, text):
+        return cls.TOKEN.findall(str(text).casefold())
+
+    @staticmethod
+    def _trigrams_of(token):
+        padded = f"${token}$"
+        return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+    def _add(self, kind, key, label, text):
+        # caller holds self._lock; re-indexing a key keeps its doc id
+        doc = self._doc_ids.get((kind, key))
+        if doc is not None:
+            for token in self._doc_tokens.pop(doc):
+                self._postings[token].discard(doc)
+            self._docs[doc] = (kind, key, label)
+        elif self._free:
+            doc = self._free.pop()
+            self._docs[doc] = (kind, key, label)
+        else:
+            doc = len(self._docs)
+            self._docs.append((kind, key, label))
+        self._doc_ids[kind, key] = doc
+        tokens = self._doc_tokens[doc] = set(self.tokens(text))
+        for token in tokens:
+            postings = self._postings.get(token)
+            if postings is None:
+                postings = self._postings[token] = set()
+                for trigram in self._trigrams_of(token):
+                    self._trigrams.setdefault(trigram, []).append(token)
+                if self._unsorted is not None:
+                    self._unsorted.append(token)
+                else:
+                    bisect.insort(self._vocabulary, token)
+            postings.add(doc)
+
+    def _remove(self, kind, key):
+        # caller holds self._lock; emptied tokens stay in the vocabulary and are skipped
+        doc = self._doc_ids.pop((kind, key), None)
+        if doc is None:
+            return
+        self._docs[doc] = None
+        self._free.append(doc)
+        for token in self._doc_tokens.pop(doc):
+            self._postings[token].discard(doc)
+
+    def add_student(self, student):
+        text = " ".join(str(getattr(student, field)) for field in self.FIELDS["student"])
+        with self._lock:
+            self._add("student", student.student_id, student.name, text)
+
+    def add_faculty(self, faculty):
+        text = " ".join(str(getattr(faculty, field)) for field in self.FIELDS["faculty"])
+        with self._lock:
+            self._add("faculty", faculty.faculty_id, faculty.name, text)
+
+    def add_title(self, title):
+        with self._lock:
+            if ("title", title) not in self._doc_ids:
+                self._add("title", title, title, title)
+
+    def remove(self, kind, key):
+        with self._lock:
+            self._remove(kind, key)
+
+    def record_added(self, kind, key, record):
+        if kind == "faculty":
+            self.add_faculty(record)
+        else:
+            self.add_student(record)
+
+    def record_removed(self, kind, key, record):
+        self.remove(kind, key)
+
+    def _title_changed(self, title, kind, old, new):
+        if new > 0 and ("title", title) not in self._doc_ids:
+            self.add_title(title)
+
+    def watch(self, student_db=None, faculty_db=None, library=None):
+        # indexes what is there now and follows later additions: students through
+        # StudentStore.subscribe, titles through Library.subscribe. A plain faculty
+        # dict has no hook, so new faculty need add_faculty().
+        self._unsorted = []
+        try:
+            for student in (student_db or {}).values():
+                self.add_student(student)
+            for faculty in (faculty_db or {}).values():
+                self.add_faculty(faculty)
+            for title in (library.books if library is not None else ()):
+                self.add_title(title)
+        finally:
+            with self._lock:
+                self._vocabulary = sorted(self._vocabulary + self._unsorted)
+                self._unsorted = None
+        if isinstance(student_db, StudentStore):
+            student_db.subscribe(self)
+        if library is not None:
+            library.subscribe(self._title_changed)
+        return self
+
+    @staticmethod
+    def _edit_distance(a, b, limit):
+        # Damerau-Levenshtein (adjacent transpositions), giving up past limit
+        if abs(len(a) - len(b)) > limit:
+            return limit + 1
+        previous, current = None, list(range(len(b) + 1))
+        for i in range(1, len(a) + 1):
+            before, previous, current = previous, current, [i] + [0] * len(b)
+            for j in range(1, len(b) + 1):
+                cost = a[i - 1] != b[j - 1]
+                current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+                if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                    current[j] = min(current[j], before[j - 2] + 1)
+            if min(current) > limit:
+                return limit + 1
+        return current[-1]
+
+    def _expand(self, token):
+        # {vocabulary token: weight} for one query token
+        matches = {}
+        if self._postings.get(token):
+            matches[token] = 1.0
+        i = bisect.bisect_left(self._vocabulary, token)
+        while len(matches) < self.max_expansions and i < len(self._vocabulary) and self._vocabulary[i].startswith(token):
+            candidate = self._vocabulary[i]
+            if candidate != token and self._postings[candidate]:
+                matches[candidate] = self.PREFIX_WEIGHT
+            i += 1
+        if not matches and len(token) >= 3:
+            # probably misspelt: gather candidates from the rarest trigrams within
+            # the budget, then score them by Dice similarity over all trigrams
+            trigrams = self._trigrams_of(token)
+            shared, scanned = Counter(), 0
+            for tokens in sorted((self._trigrams.get(t, ()) for t in trigrams), key=len):
+                if scanned and scanned + len(tokens) > self.trigram_budget:
+                    break
+                shared.update(tokens)
+                scanned += len(tokens)
+            scored = []
+            for candidate, _ in shared.most_common(4 * self.max_expansions):
+                similarity = 2 * len(trigrams & self._trigrams_of(candidate)) / (len(trigrams) + len(candidate))
+                if similarity < self.min_similarity:
+                    # short words lose most of their trigrams to a single typo
+                    longest = max(len(token), len(candidate))
+                    distance = self._edit_distance(token, candidate, 1 if longest <= 5 else 2)
+                    similarity = 1 - distance / longest
+                if similarity >= self.min_similarity and self._postings[candidate]:
+                    scored.append((similarity, candidate))
+            for similarity, candidate in heapq.nlargest(self.max_expansions, scored):
+                matches[candidate] = self.FUZZY_WEIGHT * similarity
+        return matches
+
+    @staticmethod
+    def _within(docs, postings):
+        # docs that appear in any of the posting sets; & walks the smaller side
+        return set().union(*(docs & p for p in postings)) if docs is not None else set().union(*postings)
+
+    def search(self, query, limit=10, kinds=None):
+        tokens = list(dict.fromkeys(self.tokens(query)))
+        if not tokens:
+            return []
+        with self._lock:
+            # per query token: [(weight, [posting sets]), ...] best first
+            levels = []
+            for token in tokens:
+                by_weight = {}
+                for candidate, weight in self._expand(token).items():
+                    by_weight.setdefault(weight, []).append(self._postings[candidate])
+                if not by_weight:
+                    return []
+                levels.append(sorted(by_weight.items(), reverse=True))
+            # narrow from the most selective token so set work stays proportional to the answer
+            levels.sort(key=lambda token_levels: sum(len(p) for _, postings in token_levels for p in postings))
+            wanted = (lambda doc: True) if kinds is None else (lambda doc: self._docs[doc][0] in kinds)
+            # if enough documents match every token at its best weight, they are the answer
+            best = None
+            for token_levels in levels:
+                best = self._within(best, token_levels[0][1])
+            ranked = [(doc, sum(token_levels[0][0] for token_levels in levels))
+                      for doc in itertools.islice(filter(wanted, best), limit)]
+            if len(ranked) < limit:
+                candidates = None
+                for token_levels in levels:
+                    candidates = self._within(candidates, [p for _, postings in token_levels for p in postings])
+                scores = {doc: 0.0 for doc in candidates if wanted(doc)}
+                for token_levels in levels:
+                    remaining = set(scores)
+                    for weight, postings in token_levels:
+                        hits = self._within(remaining, postings)
+                        remaining -= hits
+                        for doc in hits:
+                            scores[doc] += weight
+                ranked = heapq.nlargest(limit, scores.items(), key=lambda item: item[1])
+            return [{"kind": self._docs[doc][0], "key": self._docs[doc][1], "label": self._docs[doc][2],
+                     "score": round(score / len(tokens), 3)} for doc, score in ranked]
+
+    def __len__(self):
+        return len(self._doc_ids)
+
+_report_students = None  # worker-side MappedSnapshot, opened once per process
+
+def _open_report_snapshot(path):
+    global _report_students
+    _report_students = MappedSnapshot(path)
+
+def _report_slug(name):
+    return "".join(c if c.isalnum() or c in "-_" else "_" for c in str(name))
+
+def _render_report(fmt, title, header, columns, rows):
+    if fmt == "csv":
+        out = io.StringIO()
+        writer = csv.writer(out)
+        writer.writerow(columns)
+        writer.writerows(rows)
+        return out.getvalue()
+    if fmt == "html":
+        cells = lambda tag, values: "".join(f"<{tag}>{html.escape(str(v))}</{tag}>" for v in values)
+        return (f"<!DOCTYPE html>\n<html><head><meta charset=\"utf-8\"><title>{html.escape(title)}</title></head><body>\n"
+                f"<h1>{html.escape(title)}</h1>\n" + "".join(f"<p>{html.escape(line)}</p>\n" for line in header)
+                + f"<table>\n<tr>{cells('th', columns)}</tr>\n" + "".join(f"<tr>{cells('td', row)}</tr>\n" for row in rows)
+                + "</table>\n</body></html>\n")
+    lines = [title, *header, *("  ".join(f"{c}: {v}" for c, v in zip(columns, row)) for row in rows)]
+    return "\n".join(lines) + "\n"
+
+def _report_shard(out_dir, kind, formats, jobs):
+    # Runs in a worker: renders one shard of documents, looking students up in
+    # the shared snapshot, and returns the paths written
+    paths = []
+    for name, title, header, payload in jobs:
+        if kind == "transcript":
+            student = _report_students.get(name)
+            if student is not None:
+                title = f"Grades for {student.name} (ID: {student.student_id}, Roll No: {student.roll_no})"
+            rows = [(year, semester, subject, grade) for year, semesters in payload.items()
+                    for semester, subjects in semesters.items() for subject, grade in subjects.items()]
+        else:
+            rows = []
+            for member in payload:
+                if isinstance(member, tuple):   # member with no student record
+                    rows.append(member)
+                    continue
+                student = _report_students.get(member)
+                if student is not None:
+                    rows.append((student.student_id, student.roll_no, student.name, student.branch, student.year))
+        for fmt in formats:
+            path = os.path.join(out_dir, kind, f"{_report_slug(name)}.{fmt}")
+            with open(path, "w", encoding="utf-8", newline="") as f:
+                f.write(_render_report(fmt, title, header, ReportGenerator.COLUMNS[kind], rows))
+            paths.append(path)
+    return kind, len(jobs), paths
+
+class ReportGenerator:
+    # Renders department/club/society rosters and student transcripts across a
+    # process pool. The student db is written once to a MappedSnapshot that
+    # every worker maps read-only, so tasks carry only ids and grades.
+    FORMATS = ("txt", "csv", "html")
+    COLUMNS = {
+        "department": ("student_id", "roll_no", "name", "branch", "year"),
+        "club": ("student_id", "roll_no", "name", "branch", "year"),
+        "society": ("student_id", "roll_no", "name", "branch", "year"),
+        "transcript": ("year", "semester", "subject", "grade"),
+    }
+
+    def __init__(self, out_dir, formats=("txt",), workers=None, shard_size=250):
+        unknown = set(formats) - set(self.FORMATS)
+        if unknown:
+            raise ValueError(f"Unknown report formats: {', '.join(sorted(unknown))}")
+        self.out_dir = out_dir
+        self.formats = tuple(formats)
+        self.workers = workers or os.cpu_count()
+        self.shard_size = shard_size
+
+    @staticmethod
+    def _jobs(departments, clubs, societies, academic):
+        for department in departments:
+            header = [f"Department: {department.name} ({department.id})",
+                      f"Courses: {', '.join(c.course_name for c in department.courses)}"]
+            yield "department", (department.name, f"Department Roster: {department.name}", header,
+                                 [s.student_id for s in department.students or ()])
+        for club in clubs:
+            header = [f"Category: {club.category}", f"Treasurer: {getattr(club.treasurer, 'name', club.treasurer)}",
+                      f"Secretary: {getattr(club.secretary, 'name', club.secretary)}",
+                      f"Instruments/Resources: {', '.join(club.instruments)}", f"Members Count: {len(club.members)}"]
+            yield "club", (club.name, f"Club Name: {club.name}", header, list(club.members))
+        for society in societies:
+            header = [f"Head: {society.head}", f"Members ({len(society.members)}):"]
+            if society.coordinator:
+                header.insert(1, f"Coordinator: {society.coordinator}")
+            members = [m["id"] if isinstance(m, dict) else m.student_id for m in society.members.values()]
+            missing = {m["id"]: (m["id"], "", m["name"], m["department"], "")
+                       for m in society.members.values() if isinstance(m, dict)}
+            yield "society", (society.name, f"Society: {society.name} ({society.category})", header,
+                              [missing.get(m, m) for m in members])
+        if academic is not None:
+            for student_id, grades in academic.records.items():
+                yield "transcript", (student_id, f"Grades for {student_id}", [], grades)
+
+    def generate(self, student_db, departments=(), clubs=(), societies=(), academic=None):
+        # Yields (kind, documents, paths) per shard as soon as it finishes,
+        # i.e. in completion order rather than submission order
+        owned = not isinstance(student_db, MappedSnapshot)
+        snapshot = os.path.join(self.out_dir, ".students.snap") if owned else student_db.path
+        os.makedirs(self.out_dir, exist_ok=True)
+        if owned:
+            MappedSnapshot.write(snapshot, "student", student_db)
+        try:
+            shards = {}
+            for kind, job in self._jobs(departments, clubs, societies, academic):
+                shards.setdefault(kind, [[]])
+                if len(shards[kind][-1]) >= self.shard_size:
+                    shards[kind].append([])
+                shards[kind][-1].append(job)
+            for kind in shards:
+                os.makedirs(os.path.join(self.out_dir, kind), exist_ok=True)
+            context = multiprocessing.get_context("spawn")
+            with concurrent.futures.ProcessPoolExecutor(self.workers, mp_context=context, initializer=_open_report_snapshot,
+                                                        initargs=(snapshot,)) as pool:
+                futures = [pool.submit(_report_shard, self.out_dir, kind, self.formats, jobs)
+                           for kind, kind_shards in shards.items() for jobs in kind_shards]
+                for future in concurrent.futures.as_completed(futures):
+                    yield future.result()
+        finally:
+            # the workers are done with it once the pool has shut down
+            if owned:
+                os.remove(snapshot)
+
+class TransactionConflict(RuntimeError):
+    # another transaction committed to an entity this one read; safe to retry
+    pass
+
+class TransactionAborted(RuntimeError):
+    # an operation failed during commit; everything before it was undone.
+    # undo_errors holds any undo steps that failed in turn (the rest still ran).
+    def __init__(self, message, undo_errors=()):
+        super().__init__(message)
+        self.undo_errors = list(undo_errors)
+
+def _tx_room_members(hostel, calls, undo, after):
+    for room_no, *students in calls:
+        before = hostel.rooms.get(room_no)
+        if not hostel.add_room_members(room_no, *students):
+            raise TransactionAborted(f"Room {room_no} in {hostel.name} cannot take {len(students)} students")
+        undo.append(functools.partial(hostel._restore_room, room_no, before))
+    return [True] * len(calls)
+
+def _tx_hostel_fees(hostel, calls, undo, after):
+    for room_no, amount, db in calls:
+        if not hostel.rooms.get(room_no):
+            raise TransactionAborted(f"Room {room_no} in {hostel.name} is not allocated")
+        # one refund per charge as it lands, so a failure mid-room undoes exactly
+        # what was posted; the ledger is append-only, so a refund is a compensating entry.
+        # The slow gateway round trips wait until the commit has released its locks.
+        for student in hostel.rooms[room_no]:
+            hostel._charge(room_no, student, amount, db)
+            undo.append(functools.partial(hostel._add_fees, db, student, -amount, "fees"))
+            after.append(functools.partial(hostel._confirm, room_no, student, amount))
+    return [True] * len(calls)
+
+def _tx_tuition(accounts, calls, undo, after):
+    for student, amount in calls:
+        accounts.pay_fees(student, amount)
+        undo.append(functools.partial(accounts.ledger.post, student, -amount, "tuition", accounts.db))
+    return [True] * len(calls)
+
+def _tx_club_members(club, calls, undo, after):
+    results = []
+    for (student_id,) in calls:
+        if student_id in club.members:
+            results.append(False)
+            continue
+        club.add_member(student_id)
+        if student_id not in club.members:
+            raise TransactionAborted(f"Student {student_id} not found in database")
+        undo.append(functools.partial(club.remove_member, student_id))
+        results.append(True)
+    return results
+
+def _tx_issue_books(library, calls, undo, after):
+    # a run of issues goes through the bulk path: one title lock per title.
+    # Issuing drops the student's reservation, so rollback puts it back.
+    reserved = {title: dict(library.waitlist[title]) for title in {title for title, _ in calls} if library.waitlist.get(title)}
+    statuses = library.issue_books(calls)
+    issued = [call for call, status in zip(calls, statuses) if status == "issued"]
+    dropped = {}
+    for title, student in issued:
+        if student.student_id in reserved.get(title, ()):
+            dropped.setdefault(title, set()).add(student.student_id)
+    for title, student_ids in dropped.items():
+        undo.append(functools.partial(library._restore_reservations, title, reserved[title], student_ids))
+    if issued:
+        undo.append(functools.partial(library.return_books, issued))
+    for (title, student), status in zip(calls, statuses):
+        if status != "issued":
+            raise TransactionAborted(f"{title} could not be issued to {student.name}: {status}")
+    return [True] * len(calls)
+
+def _tx_assign_grades(academic, calls, undo, after):
+    before = {}
+    for _, student, *_ in calls:
+        if student.student_id not in before:
+            grades = academic.records.get(student.student_id)
+            before[student.student_id] = None if grades is None else academic._copy_grades(grades)
+    for student_id, grades in before.items():
+        undo.append(functools.partial(academic._replace_grades, student_id, grades))
+    academic.assign_grades((student.student_id, year, semester, subject, grade)
+                           for _, student, year, semester, subject, grade in calls)
+    return [True] * len(calls)
+
+def _tx_restore_db(db, contents):
+    db.clear()
+    db.update(contents)
+
+def _tx_publish(entity, calls, undo, after):
+    # update_db may write one key (Canteen) or one per title (Library)
+    for (db,) in calls:
+        undo.append(functools.partial(_tx_restore_db, db, dict(db)))
+        entity.update_db(db)
+    return [True] * len(calls)
+
+class Transaction:
+    # Operations are queued by call() and only run at commit(), in order,
+    # under the manager's lock. Each one leaves an undo step; if any fails the
+    # steps run in reverse and the commit raises TransactionAborted. Slow
+    # follow-ups a handler defers (payment confirmations) run after the lock
+    # is released, and only if the commit went through.
+    def __init__(self, manager):
+        self.manager = manager
+        self.results = None
+        self._ops = []    # (entity, method, args, undo)
+        self._seen = {}   # entity -> version when first read
+
+    def read(self, entity):
+        # pin the entity's version: commit fails if another transaction changes it first
+        self._seen.setdefault(entity, self.manager.version(entity))
+        return entity
+
+    def call(self, entity, method, *args, undo=None):
+        # undo, if given, is called with the operation's result on rollback;
+        # it is required for methods the manager has no handler for
+        if undo is None and self.manager.handler(entity, method) is None:
+            raise ValueError(f"{type(entity).__name__}.{method} cannot be undone; pass undo=")
+        self.read(entity)
+        self._ops.append((entity, method, args, undo))
+        return self
+
+    def __len__(self):
+        return len(self._ops)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.commit()
+
+    def _apply(self, undo, after):
+        results = []
+        # consecutive calls of the same method on the same entity form one batch
+        for (entity, method, undo_fn), ops in itertools.groupby(self._ops, key=lambda op: (op[0], op[1], op[3])):
+            calls = [args for _, _, args, _ in ops]
+            if undo_fn is None:
+                results.extend(self.manager.handler(entity, method)(entity, calls, undo, after))
+                continue
+            for args in calls:
+                result = getattr(entity, method)(*args)
+                undo.append(functools.partial(undo_fn, result))
+                results.append(result)
+        return results
+
+    def commit(self):
+        if self.results is not None:
+            raise RuntimeError("Transaction already committed")
+        manager = self.manager
+        with manager._lock:
+            stale = [entity for entity, version in self._seen.items() if manager._versions.get(entity, 0) != version]
+            if stale:
+                manager.conflicts += 1
+                raise TransactionConflict(f"{', '.join(entity.name for entity in stale)} changed since read")
+            undo, after = [], []
+            try:
+                results = self._apply(undo, after)
+            except Exception as e:
+                # every undo step runs even if an earlier one fails
+                undo_errors = []
+                for step in reversed(undo):
+                    try:
+                        step()
+                    except Exception as undo_error:
+                        undo_errors.append(undo_error)
+                manager.aborts += 1
+                if isinstance(e, TransactionAborted) and not undo_errors:
+                    raise
+                message = str(e) if isinstance(e, TransactionAborted) else f"{type(e).__name__}: {e}"
+                if undo_errors:
+                    message += f"; {len(undo_errors)} undo step(s) also failed: " + "; ".join(
+                        f"{type(error).__name__}: {error}" for error in undo_errors)
+                raise TransactionAborted(message, undo_errors) from e
+            for entity in {op[0] for op in self._ops}:
+                manager._versions[entity] = manager._versions.get(entity, 0) + 1
+            manager.commits += 1
+            manager.operations += len(self._ops)
+        self.results = results
+        for step in after:
+            step()
+        return results
+
+class TransactionManager:
+    # Optimistic multi-entity transactions: entities carry a version bumped by
+    # every commit that writes them, and a commit whose reads went stale is
+    # refused before anything runs. Versions only see changes made through
+    # transactions, not direct method calls. Handlers are
+    # handler(entity, calls, undo, after) and return one result per call.
+    HANDLERS = {
+        (Hostel, "add_room_members"): _tx_room_members,
+        (Hostel, "pay_fees"): _tx_hostel_fees,
+        (AccountsDepartment, "pay_fees"): _tx_tuition,
+        (Club, "add_member"): _tx_club_members,
+        (Library, "issue_book"): _tx_issue_books,
+        (Library, "update_db"): _tx_publish,
+        (Canteen, "update_db"): _tx_publish,
+        (Academic, "assign_grade"): _tx_assign_grades,
+    }
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._versions = {}
+        self.commits = self.aborts = self.conflicts = self.operations = 0
+
+    def handler(self, entity, method):
+        for cls in type(entity).__mro__:
+            handler = self.HANDLERS.get((cls, method))
+            if handler is not None:
+                return handler
+        return None
+
+    def version(self, entity):
+        with self._lock:
+            return self._versions.get(entity, 0)
+
+    def transaction(self):
+        return Transaction(self)
+
+    def run(self, build, retries=3):
+        # build(tx) queues the operations; rebuilt from scratch after a conflict
+        for attempt in range(retries + 1):
+            tx = self.transaction()
+            build(tx)
+            try:
+                return tx.commit()
+            except TransactionConflict:
+                if attempt == retries:
+                    raise
+
+    def stats(self):
+        with self._lock:
+            return {"commits": self.commits, "aborts": self.aborts, "conflicts": self.conflicts, "operations": self.operations}
+
+transactions = TransactionManager()
+
+def _jsonable(value):
+    # JSON fallback for what the server hands back: read-only mappings,
+    # records, courses and dates
+    if isinstance(value, Mapping):
+        return dict(value)
+    if isinstance(value, (set, frozenset)):
+        return sorted(value)
+    if isinstance(value, Course):
+        return value.course_name
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        return value.isoformat()
+    if hasattr(value, "student_id") and hasattr(value, "roll_no"):
+        return {field: getattr(value, field) for field in BulkIO.STUDENT_FIELDS}
+    if hasattr(value, "faculty_id"):
+        return {field: getattr(value, field) for field in BulkIO.FACULTY_FIELDS}
+    return str(value)
+
+class CampusServer:
+    # asyncio JSON-lines front end over one shared set of entities. Each line is
+    # {"id", "op", "args"}; each reply is {"id", "ok", "result" | "error"}, sent
+    # when the request finishes, so a client may pipeline many requests. Writes
+    # to the same entity (title, room, student...) run one at a time in arrival
+    # order; blocking calls run on a thread pool instead of the event loop.
+    # Arguments are type-checked against each op's declared types before its
+    # handler runs, so bad input comes back as an error reply.
+    def __init__(self, student_db, faculty_db=None, library=None, hostels=(), canteen=None, academic=None,
+                 accounts=None, workers=8, max_in_flight=256):
+        self.student_db = student_db
+        self.faculty_db = faculty_db
+        self.hostels = {hostel.name: hostel for hostel in hostels}
+        self.max_in_flight = max_in_flight
+        self.ops = {}               # op -> (handler, mode, key)
+        self.requests = self.errors = self.connections = 0
+        self._locks = {}            # entity key -> [asyncio.Lock, users]
+        self._executor = concurrent.futures.ThreadPoolExecutor(workers, thread_name_prefix="campus")
+        self._encoder = json.JSONEncoder(default=_jsonable, ensure_ascii=False)
+        self._server = None
+        self.address = None
+
+        student = self._student
+        self._register("student.get", lambda a: student(a["student_id"]), student_id=str)
+        if isinstance(student_db, StudentStore):
+            self._register("student.find", lambda a: student_db.find_by(a["field"], a["value"]), field=str, value=(str, int))
+        if faculty_db is not None:
+            self._register("faculty.get", lambda a: self._lookup(faculty_db, a["faculty_id"], "faculty"), faculty_id=str)
+        if library is not None:
+            title_key = lambda a: ("library", a["title"])
+            loan = dict(title=str, student_id=str)
+            self._register("library.availability", lambda a: library.availability(a["title"]), title=str)
+            self._register("library.rentable_books", lambda a: library.rentable_books())
+            self._register("library.search", lambda a: library.search_titles(a["prefix"], a.get("limit", 10)), prefix=str, limit=int)
+            self._register("library.loans", lambda a: library.loans_of(student(a["student_id"])), student_id=str)
+            self._register("library.issue_book", lambda a: library.issue_book(a["title"], student(a["student_id"])), "write", title_key, **loan)
+            self._register("library.reserve_book", lambda a: library.reserve_book(a["title"], student(a["student_id"])), "write", title_key, **loan)
+            # returning an unknown title shelves it, which sleeps
+            self._register("library.return_book", lambda a: library.return_book(a["title"], student(a["student_id"])), "offload", title_key, **loan)
+        if self.hostels:
+            hostel = lambda a: self._lookup(self.hostels, a["hostel"], "hostel")
+            room_key = lambda a: ("hostel", a["hostel"], a["room_no"])
+            room = dict(hostel=str, room_no=(str, int))
+            charge = dict(room, amount=(int, float))
+            self._register("hostel.roommates", lambda a: hostel(a).roommates(a["room_no"]), **room)
+            self._register("hostel.occupancy", lambda a: hostel(a).occupancy(), hostel=str)
+            self._register("hostel.pay_fees", lambda a: hostel(a).pay_fees_async(a["room_no"], a["amount"], student_db), "async", room_key, **charge)
+            self._register("hostel.penalty", lambda a: hostel(a).penalty_async(a["room_no"], a["amount"], student_db), "async", room_key, **charge)
+        if canteen is not None:
+            self._register("canteen.menu", lambda a: canteen.menu.snapshot())
+            self._register("canteen.order_status", lambda a: canteen.order_status(a["order_id"]), order_id=int)
+            self._register("canteen.order", lambda a: canteen.order_item(student(a["student_id"]), a["item"], a.get("quantity", 1)),
+                           "write", lambda a: ("canteen", a["student_id"]), student_id=str, item=str, quantity=int)
+            self._register("canteen.request_item", lambda a: canteen.request_item(a["item"], a["price"]),
+                           "offload", lambda a: ("canteen.menu", a["item"]), item=str, price=(int, float))
+        if academic is not None:
+            self._register("academic.transcript", lambda a: academic.transcript(a["student_id"]), student_id=str)
+            self._register("academic.subject_grades", lambda a: academic.get_subject_grades(a["subject"]), subject=str)
+            self._register("academic.assign_grade", lambda a: academic.assign_grade(
+                a.get("faculty"), student(a["student_id"]), a["year"], a["semester"], a["subject"], a["grade"]),
+                "write", lambda a: ("academic", a["student_id"]),
+                student_id=str, year=int, semester=int, subject=str, grade=str)
+        if accounts is not None:
+            self._register("accounts.history", lambda a: accounts.payment_history(student(a["student_id"])), student_id=str)
+            self._register("accounts.pay_fees", lambda a: accounts.pay_fees(student(a["student_id"]), a["amount"]),
+                           "write", lambda a: ("accounts", a["student_id"]), student_id=str, amount=(int, float))
+        self._register("server.stats", lambda a: {"requests": self.requests, "errors": self.errors,
+                                                  "connections": self.connections, "cache": result_cache.stats()})
+        self._register("server.metrics", lambda a: metrics.snapshot())
+
+    def _register(self, op, handler, mode="read", key=None, **types):
+        # mode: "read" runs inline; "write" runs inline under the entity lock;
+        # "offload" runs on the thread pool and "async" awaits a coroutine, both under the lock.
+        # types: argument name -> accepted type(s), checked when the argument is given
+        self.ops[op] = (handler, mode, key, types)
+
+    @staticmethod
+    def _check_args(op, args, types):
+        if not isinstance(args, dict):
+            raise TypeError(f"Arguments for '{op}' must be an object, got {type(args).__name__}")
+        for name, expected in types.items():
+            if name not in args:
+                continue
+            value = args[name]
+            # JSON true/false would otherwise pass as the ints 1/0
+            if isinstance(value, bool) or not isinstance(value, expected):
+                accepted = " or ".join(t.__name__ for t in (expected if isinstance(expected, tuple) else (expected,)))
+                raise TypeError(f"Argument '{name}' for '{op}' must be {accepted}, got {type(value).__name__}")
+
+    @staticmethod
+    def _lookup(db, key, kind):
+        value = get_element_by_id(key, db)
+        if value is None:
+            raise KeyError(f"Unknown {kind} '{key}'")
+        return value
+
+    def _student(self, student_id):
+        return self._lookup(self.student_db, student_id, "student")
+
+    async def _locked(self, key, call):
+        entry = self._locks.get(key)
+        if entry is None:
+            entry = self._locks[key] = [asyncio.Lock(), 0]
+        entry[1] += 1
+        try:
+            async with entry[0]:
+                return await call()
+        finally:
+            entry[1] -= 1
+            if not entry[1]:
+                del self._locks[key]
+
+    async def dispatch(self, op, args):
+        spec = self.ops.get(op)
+        if spec is None:
+            raise ValueError(f"Unknown operation '{op}'")
+        handler, mode, key, types = spec
+        self._check_args(op, args, types)
+        if mode == "read":
+            return handler(args)
+
+        async def call():
+            if mode == "offload":
+                return await asyncio.get_running_loop().run_in_executor(self._executor, handler, args)
+            if mode == "async":
+                return await handler(args)
+            return handler(args)
+        return await self._locked(key(args), call)
+
+    async def _respond(self, line, writer, in_flight):
+        start = time.perf_counter()
+        request_id, op = None, "invalid"
+        try:
+            request = json.loads(line)
+            request_id, op = request.get("id"), request.get("op", "invalid")
+            response = {"id": request_id, "ok": True, "result": await self.dispatch(op, request.get("args") or {})}
+        except Exception as e:
+            self.errors += 1
+            message = e.args[0] if isinstance(e, KeyError) and e.args else str(e)
+            response = {"id": request_id, "ok": False, "error": f"{type(e).__name__}: {message}"}
+        finally:
+            in_flight.release()
+        try:
+            data = self._encoder.encode(response)
+        except Exception as e:
+            # the result can't be sent as JSON; the client still gets a reply
+            self.errors += 1
+            response = {"id": request_id, "ok": False, "error": f"{type(e).__name__}: result could not be encoded: {e}"}
+            data = self._encoder.encode(response)
+        self.requests += 1
+        metrics.observe(f"server.{op}" if op in self.ops else "server.invalid", time.perf_counter() - start, not response["ok"])
+        writer.write((data + "\n").encode())
+        await writer.drain()
+
+    async def _serve(self, reader, writer):
+        self.connections += 1
+        in_flight = asyncio.Semaphore(self.max_in_flight)
+        tasks = set()
+        try:
+            while line := await reader.readline():
+                await in_flight.acquire()
+                task = asyncio.create_task(self._respond(line, writer, in_flight))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            await asyncio.gather(*tasks, return_exceptions=True)
+        except ConnectionError:
+            pass
+        finally:
+            self.connections -= 1
+            writer.close()
+
+    async def start(self, host="127.0.0.1", port=0, path=None):
+        # TCP by default; pass path for a Unix socket
+        if path is not None:
+            self._server = await asyncio.start_unix_server(self._serve, path, limit=2 ** 20)
+            self.address = path
+        else:
+            self._server = await asyncio.start_server(self._serve, host, port, limit=2 ** 20)
+            self.address = self._server.sockets[0].getsockname()[:2]
+        return self.address
+
+    async def serve_forever(self):
+        await self._server.serve_forever()
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        self._executor.shutdown(wait=False)
+
+class CampusClient:
+    # Pipelined JSON-lines client for CampusServer: any number of call()s may
+    # be outstanding; replies are matched back to callers by request id.
+    def __init__(self, reader, writer):
+        self._reader = reader
+        self._writer = writer
+        self._ids = itertools.count(1)
+        self._pending = {}
+        self._listener = asyncio.create_task(self._listen())
+
+    @classmethod
+    async def connect(cls, host="127.0.0.1", port=None, path=None):
+        if path is not None:
+            reader, writer = await asyncio.open_unix_connection(path, limit=2 ** 20)
+        else:
+            reader, writer = await asyncio.open_connection(host, port, limit=2 ** 20)
+        return cls(reader, writer)
+
+    async def _listen(self):
+        try:
+            while line := await self._reader.readline():
+                response = json.loads(line)
+                future = self._pending.pop(response["id"], None)
+                if future is not None and not future.done():
+                    future.set_result(response)
+        finally:
+            for future in self._pending.values():
+                if not future.done():
+                    future.set_exception(ConnectionError("server closed the connection"))
+            self._pending.clear()
+
+    async def call(self, op, **args):
+        request_id = next(self._ids)
+        future = self._pending[request_id] = asyncio.get_running_loop().create_future()
+        self._writer.write((json.dumps({"id": request_id, "op": op, "args": args}, default=_jsonable) + "\n").encode())
+        await self._writer.drain()
+        response = await future
+        if not response["ok"]:
+            raise RuntimeError(response["error"])
+        return response.get("result")
+
+    async def close(self):
+        self._writer.close()
+        await self._listener
 
 if __name__ == "__main__":
     # Creating Databases
     faculty_db = {}
-    student_db = {}
+    student_db = StudentStore()
     hostel_db = {}
     canteen_db = {}
     department_db = {}
@@ -512,12 +3633,12 @@ if __name__ == "__main__":
     # 3. Define Departments (with their courses)
     dept_courses = [btech, mtech, phd]
     departments = {
-        "Computer Science and Engineering": Department("D01", "Computer Science and Engineering", dept_courses, [], student_db, [], faculty_db),
-        "Electrical Engineering Department": Department("D02", "Electrical Engineering Department", dept_courses, [], student_db, [], faculty_db),
-        "Electronics": Department("D03", "Electronics", dept_courses, [], student_db, [], faculty_db),
-        "Mechanical": Department("D04", "Mechanical", dept_courses, [], student_db, [], faculty_db),
-        "Civil": Department("D05", "Civil", dept_courses, [], student_db, [], faculty_db),
-        "Chemical": Department("D06", "Chemical", dept_courses, [], student_db, [], faculty_db),
+        "Computer Science and Engineering": Department("D01", "Computer Science and Engineering", dept_courses, None, student_db, [], faculty_db),
+        "Electrical Engineering Department": Department("D02", "Electrical Engineering Department", dept_courses, None, student_db, [], faculty_db),
+        "Electronics": Department("D03", "Electronics", dept_courses, None, student_db, [], faculty_db),
+        "Mechanical": Department("D04", "Mechanical", dept_courses, None, student_db, [], faculty_db),
+        "Civil": Department("D05", "Civil", dept_courses, None, student_db, [], faculty_db),
+        "Chemical": Department("D06", "Chemical", dept_courses, None, student_db, [], faculty_db),
     }
 
     # 4. Creating Students
@@ -530,10 +3651,9 @@ if __name__ == "__main__":
     student_db[s2.student_id] = s2
     student_db[s3.student_id] = s3
 
-    # 6. Add students to departments (by branch)
-    departments["Computer Science and Engineering"].students.append(s1)
-    departments["Electronics"].students.append(s2)
-    departments["Mechanical"].students.append(s3)
+    # 6. Departments list their students straight from the indexed store (by branch)
+    print([student.name for student in departments["Computer Science and Engineering"].students])
+    print(student_db.get_by("roll_no", "2020EC102").name)
 
     # 7. Display Student Profiles
     s1.display_profile()
@@ -569,8 +3689,11 @@ if __name__ == "__main__":
     dance_club.display_club_info()
 
     # 13. Creating and Managing Society
-    society = Society("SAE", "Dr. Rakesh Kumar", "Neha Agarwal")
+    society = Society("SAE", "Dr. Rakesh Kumar", "Neha Agarwal", student_db)
     society.add_member("Amit Sharma", "S101", "Computer Science and Engineering")
+    society.add_member("Amit Sharma", "S101", "Computer Science and Engineering")  # duplicate
+    society.add_members([("Riya Verma", "S102", "Electronics"), ("Guest", "G001", "Visiting")])
+    society.remove_members(["G001"])
     society.add_volunteer("Riya Verma", "S102", "Electronics")
     society.show_society_info()
 
@@ -579,13 +3702,26 @@ if __name__ == "__main__":
         "101": [],
         "102": []
     }
-    hostel = Hostel("Aryabhatt Hostel", rooms)
+    hostel = Hostel("Aryabhatt Hostel", rooms, capacity=2)
     hostel.add_room_members("101", s1, s3)
     hostel.get_roommates("101")
     hostel.pay_fees("101", 15000, student_db)
     hostel.penalty("101", 500, student_db)
+    hostel.add_room_members("102", s2)
+    for result in asyncio.run(hostel.pay_fees_batch([("101", 15000), ("102", 15000), ("103", 15000)], student_db)):
+        print(result)
     hostel.vaccate_room("101")
     hostel.get_roommates("101")
+    print(hostel.occupancy())
+
+    # Annual allotment across hostels
+    raman = Hostel("Raman Hostel", {})
+    for floor in (1, 2):
+        for room in range(1, 3):
+            raman.add_room(f"{floor}0{room}", 3)
+    allocator = RoomAllocator([hostel, raman])
+    print(allocator.allot([(s1, ["Raman Hostel"]), (s3, []), (s2, ["Raman Hostel", "Aryabhatt Hostel"])]))
+    print(allocator.free_beds())
 
     # 15. Library Management
     library = Library("Central Library", {
@@ -596,21 +3732,38 @@ if __name__ == "__main__":
     library.add_rentable_book('Quantum Physics', 3)
     library.add_non_rentable_book('Artificial Intelligence', 2)
     library.update_db(library_db)
+    print(library.search_titles("p"))
 
-    rentable_books = Library.get_rentable_books(library.books)
-    non_rentable_books = Library.get_non_rentable_books(library.books)
+    rentable_books = library.rentable_view()
+    non_rentable_books = library.non_rentable_view()
+    library.subscribe(lambda title, kind, old, new: print(f"[OPAC] {title}: {kind} {old} -> {new}"))
     print("\nAvailable Rentable Books:")
     display_db(rentable_books)
     print("\nAvailable Non-Rentable Books:")
     display_db(non_rentable_books)
 
     library.issue_book("Python Programming", s1)
+    library.issue_book("Digital Logic", s2)
+    library.reserve_book("Digital Logic", s3)
+    library.issue_book("Digital Logic", s1)  # copy is held for Manish
+    library.return_book("Digital Logic", s2)
+    library.issue_books([("Digital Logic", s3), ("Quantum Physics", s2), ("Quantum Physics", s3)])
+    print(library.loans_of(s3))
     library.return_book("Python Programming", s1)
 
+    # Everything S103 belongs to, then offboard them
+    for affiliation in CollegeEntity.registry.affiliations("S103"):
+        print(affiliation)
+    print(CollegeEntity.registry.offboard(["S103"]))
+    print(CollegeEntity.registry.affiliations("S103"))
+
     # 16. Accounts Department
     accounts = AccountsDepartment("Accounts")
     accounts.pay_fees(s1, 10000)
     accounts.pay_fees(s2, 12000)
+    accounts.pay_fees(s1, 5000)
+    print(accounts.fees_paid)
+    print(f"{s1.name} total fees: ₹{accounts.ledger.balance(s1.student_id)}")
 
     # 17. Academic Records
     academic = Academic("Academic Block")
@@ -619,16 +3772,24 @@ if __name__ == "__main__":
     academic.assign_grade(f2, s1, 2, 1, "Signals", "A")  # Department mismatch
     academic.view_grades(s1)
     academic.view_subject_grades("Data Structures")
+    academic.update_grades(s1, {2: {1: {"Data Structures": "A+", "OOP": "B+"}}})
+    academic.view_subject_grades("Signals")
 
     # 18. Canteen Management
     canteen = Canteen("IET Cafeteria", {"Chowmein": 40, "Coffee": 20})
     canteen.order_item(s2, "Coffee")
     canteen.order_item(s3, "Pizza")  # Not available
     canteen.request_item("Pizza", 80)
+    canteen.await_approvals()
     canteen.order_item(s3, "Pizza")
     canteen.update_db(canteen_db)
     canteen.update_menu(canteen_db, "Sandwich", 30)
     canteen.update_db(canteen_db)
+    sales = SalesAggregator(canteen)
+    canteen.order_item(s2, "Sandwich", quantity=2)
+    canteen.order_item(s1, "Coffee")
+    print(f"Canteen revenue: ₹{sales.revenue} from {sales.orders} orders, last hour: {sales.window_totals()}")
+    print(f"Best sellers: {sales.best_sellers(3)}, {s2.name} spent ₹{sales.spend(s2.student_id)}")
 
     # 19. NNF Functionality
     nnf = NNF()
@@ -640,3 +3801,60 @@ if __name__ == "__main__":
     nnf.remove_past_event("Hackathon 2023")
     nnf.remove_upcoming_event("Startup Meet 2025")
     nnf.show_all_events()
+
+    # 20. End-of-term reports
+    with tempfile.TemporaryDirectory() as report_dir:
+        reports = ReportGenerator(report_dir, formats=("txt", "csv", "html"), workers=2)
+        for kind, count, paths in reports.generate(student_db, departments.values(), [dance_club], [society], academic):
+            print(f"Rendered {count} {kind} report(s): {', '.join(os.path.basename(p) for p in paths)}")
+
+    # 21. Serving the shared state over a socket
+    async def serve_demo():
+        server = CampusServer(student_db, faculty_db, library, [hostel], canteen, academic, accounts)
+        host, port = await server.start()
+        client = await CampusClient.connect(host, port)
+        transcript, ordered, availability = await asyncio.gather(
+            client.call("academic.transcript", student_id=s1.student_id),
+            client.call("canteen.order", student_id=s2.student_id, item="Coffee"),
+            client.call("library.availability", title="Python Programming"))
+        print(f"Server -> transcript rows: {len(transcript)}, order #{ordered}, availability: {availability}")
+        try:
+            await client.call("student.get", student_id="S999")
+        except RuntimeError as e:
+            print(f"Server error: {e}")
+        await client.close()
+        await server.close()
+    asyncio.run(serve_demo())
+
+    # 22. Front-desk search
+    search = SearchIndex().watch(student_db, faculty_db, library)
+    for query in ("amit sh", "riya@colege.edu", "pyth prog"):
+        print(f"Search {query!r}: {[(hit['kind'], hit['label']) for hit in search.search(query, 3)]}")
+    student_db.add(Student("S104", "2023CE104", "Neha Agarwal", 1, btech, "Civil", "9000000004", "neha@college.edu"))
+    library.add_rentable_book("Organic Chemistry", 2)
+    print(f"Search 'neha agrawal': {[hit['label'] for hit in search.search('neha agrawal', 3)]}")
+    print(f"Search 'orgnic chem': {[hit['label'] for hit in search.search('orgnic chem', 3)]}")
+
+    # 23. Transactional enrollment
+    raman.add_room("301", 2)
+    with transactions.transaction() as tx:
+        tx.call(raman, "add_room_members", "301", s1, s2)
+        tx.call(accounts, "pay_fees", s2, 8000)
+        tx.call(dance_club, "add_member", "S104")
+        tx.call(library, "issue_book", "Organic Chemistry", s2)
+        tx.call(library, "update_db", library_db)
+    print(f"Committed {len(tx.results)} operations, {s2.name} has paid ₹{accounts.ledger.balance(s2.student_id)} in total")
+    tx = transactions.transaction()
+    tx.call(accounts, "pay_fees", s1, 4000)
+    tx.call(library, "issue_book", "Organic Chemistry", s1)
+    tx.call(library, "issue_book", "Thermodynamics", s1)  # not in the catalogue
+    try:
+        tx.commit()
+    except TransactionAborted as e:
+        print(f"Rolled back: {e}; {s1.name} has {list(library.loans_of(s1))}, paid ₹{accounts.ledger.balance(s1.student_id)}")
+    print(f"Transactions: {transactions.stats()}")
+
+    # 24. Operation metrics
+    print()
+    print(metrics.render_text())
+    print(f"Result cache: {result_cache.stats()}")
@@ -0,0 +1,822 @@
+import argparse
+import asyncio
+import contextlib
+import heapq
+import io
+import json
+import multiprocessing
+import os
+import pickle
+import platform
+import random
+import tempfile
+import threading
+import time
+import tracemalloc
+
+import ABC
+from ABC import (Academic, AccountsDepartment, CampusClient, CampusServer, Canteen, Club, CollegeEntity, CompactFaculty,
+                 CompactStudent, Course, Department, Faculty, FacultyTable, FeeLedger, GradeAnalytics, Hostel,
+                 JsonLinesSink, Library, MappedSnapshot, MembershipRegistry, NullSink, PrintSink, ReportGenerator,
+                 ResultCache, RoomAllocator, SalesAggregator, SearchIndex, Society, StorageEngine, Student, StudentStore,
+                 StudentTable, TransactionAborted, TransactionConflict, TransactionManager, get_element_by_id, set_sink)
+
+BRANCHES = ["Computer Science and Engineering", "Electronics", "Mechanical", "Civil", "Chemical", "Electrical Engineering Department"]
+COURSES = [Course("C01", "B.Tech"), Course("C02", "M.Tech"), Course("C03", "PhD")]
+
+def make_students(n, cls=Student):
+    for i in range(n):
+        yield cls(f"S{i}", f"R{i:07d}", f"Student {i}", i % 4 + 1, COURSES[i % 3], BRANCHES[i % 6], f"9{i:09d}", f"s{i}@college.edu")
+
+def make_faculty(n, cls=Faculty):
+    for i in range(n):
+        yield cls(f"F{i}", f"Faculty {i}", BRANCHES[i % 6], f"8{i:09d}", f"f{i}@college.edu")
+
+def measure(build):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = build()
+    elapsed = time.perf_counter() - start
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del result
+    return size, elapsed
+
+def bench_memory(sizes=(10_000, 100_000, 1_000_000)):
+    layouts = {
+        "Student dict": lambda n: {s.student_id: s for s in make_students(n)},
+        "CompactStudent dict": lambda n: {s.student_id: s for s in make_students(n, CompactStudent)},
+        "StudentTable": lambda n: StudentTable(make_students(n)),
+        "Faculty dict": lambda n: {f.faculty_id: f for f in make_faculty(n)},
+        "CompactFaculty dict": lambda n: {f.faculty_id: f for f in make_faculty(n, CompactFaculty)},
+        "FacultyTable": lambda n: FacultyTable(make_faculty(n)),
+    }
+    print(f"{'layout':<22}{'records':>10}{'MB':>10}{'bytes/rec':>12}{'vs dict':>9}{'build s':>10}")
+    for n in sizes:
+        baseline = {}
+        for label, build in layouts.items():
+            size, elapsed = measure(lambda: build(n))
+            plain = baseline.setdefault("Faculty" in label, size)  # first layout of each kind is the plain dict
+            print(f"{label:<22}{n:>10}{size / 1e6:>10.1f}{size / n:>12.0f}{size / plain:>9.0%}{elapsed:>10.2f}")
+
+def bench_ledger_contention(threads=(1, 2, 4, 8), students=1000, payments_per_thread=20_000):
+    print(f"{'stripes':>8}{'threads':>9}{'payments/s':>14}{'scaling':>9}")
+    for stripes in (1, 64):
+        baseline = None
+        for n in threads:
+            ledger = FeeLedger(stripes)
+            records = list(make_students(students))
+            barrier = threading.Barrier(n + 1)
+
+            def worker(offset):
+                barrier.wait()
+                for i in range(payments_per_thread):
+                    ledger.post(records[(offset + i) % students], 100, "tuition")
+
+            workers = [threading.Thread(target=worker, args=(t * 7919,)) for t in range(n)]
+            for w in workers:
+                w.start()
+            barrier.wait()
+            start = time.perf_counter()
+            for w in workers:
+                w.join()
+            rate = n * payments_per_thread / (time.perf_counter() - start)
+            baseline = baseline or rate
+            assert sum(ledger.totals().values()) == n * payments_per_thread * 100
+            print(f"{stripes:>8}{n:>9}{rate:>14.0f}{rate / baseline:>9.2f}")
+
+def make_records(students, subjects=40, years=4, semesters=2):
+    grades = list(GradeAnalytics.GRADE_POINTS)
+    per_term = max(1, subjects // (years * semesters))
+    records = {}
+    for i in range(students):
+        records[f"S{i}"] = {
+            year: {
+                semester: {f"SUB{((year - 1) * semesters + semester - 1) * per_term + k}": grades[(i + k + year) % len(grades)]
+                           for k in range(per_term)}
+                for semester in range(1, semesters + 1)
+            }
+            for year in range(1, years + 1)
+        }
+    return records
+
+def bench_analytics(students=50_000, subjects=40):
+    academic = Academic("Academic Block")
+    academic.records = make_records(students, subjects)
+    db = {s.student_id: s for s in make_students(students)}
+    start = time.perf_counter()
+    analytics = GradeAnalytics(academic)
+    print(f"load {students} x {subjects} grades: {time.perf_counter() - start:.3f}s")
+    for label, run in [("cgpa", analytics.cgpa), ("sgpa", analytics.sgpa),
+                       ("subject_stats", analytics.subject_stats),
+                       ("department_rankings", lambda: analytics.department_rankings(db))]:
+        start = time.perf_counter()
+        run()
+        print(f"{label}: {time.perf_counter() - start:.3f}s")
+    start = time.perf_counter()
+    for i in range(10_000):
+        analytics.grade_assigned(f"S{i}", 5, 1, "Elective", "A")
+    print(f"10k incremental grades: {time.perf_counter() - start:.3f}s")
+
+def bench_storage(records=100_000, tail=10_000, batch_sizes=(1, 100, 1000)):
+    with tempfile.TemporaryDirectory() as tmp:
+        students = list(make_students(records))
+        for batch_size in batch_sizes:
+            path = os.path.join(tmp, f"wal-{batch_size}.log")
+            engine = StorageEngine(path, batch_size=batch_size)
+            table = engine.table("student_db")
+            n = min(records, 20 * batch_size)
+            start = time.perf_counter()
+            for student in students[:n]:
+                table[student.student_id] = student
+            engine.commit()
+            elapsed = time.perf_counter() - start
+            engine.close()
+            print(f"batch_size={batch_size:<6} {n / elapsed:>10.0f} writes/s (fsync per commit)")
+
+        path = os.path.join(tmp, "cold.log")
+        engine = StorageEngine(path, batch_size=1000, sync=False)
+        table = engine.table("student_db")
+        for student in students:
+            table[student.student_id] = student
+        engine.checkpoint()
+        for student in students[:tail]:
+            student.fees += 100
+            table.mark_dirty(student.student_id)
+        engine.close()
+        start = time.perf_counter()
+        engine = StorageEngine(path)
+        print(f"cold start: {records} records from snapshot + {tail}-write log tail in {time.perf_counter() - start:.2f}s")
+        engine.close()
+
+def _rss_kb():
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1])
+
+def _startup_probe(mode, path, lookups):
+    rss = _rss_kb()
+    start = time.perf_counter()
+    if mode == "eager":
+        with open(path, "rb") as f:
+            db = pickle.load(f)
+    else:
+        db = MappedSnapshot(path)
+    boot = time.perf_counter() - start
+    for key in lookups:
+        get_element_by_id(key, db).name
+    return boot, time.perf_counter() - start - boot, _rss_kb() - rss
+
+def bench_snapshot(records=200_000, lookups=1000):
+    ctx = multiprocessing.get_context("spawn")
+    with tempfile.TemporaryDirectory() as tmp:
+        db = {s.student_id: s for s in make_students(records)}
+        paths = {"eager": os.path.join(tmp, "students.pickle"), "mmap": os.path.join(tmp, "students.snap")}
+        with open(paths["eager"], "wb") as f:
+            pickle.dump(db, f, pickle.HIGHEST_PROTOCOL)
+        MappedSnapshot.write(paths["mmap"], "student", db)
+        keys = random.sample(list(db), lookups)
+        print(f"{'mode':<8}{'startup s':>11}{f'{lookups} gets s':>14}{'RSS +MB':>10}")
+        with ctx.Pool(1, maxtasksperchild=1) as pool:
+            for mode, path in paths.items():
+                boot, reads, rss = pool.apply(_startup_probe, (mode, path, keys))
+                print(f"{mode:<8}{boot:>11.3f}{reads:>14.4f}{rss / 1024:>10.1f}")
+
+def bench_circulation(threads=8, titles=50, copies=20, students=2000, attempts=200):
+    library = Library("Stress Library", {f"Title {t}": {"rentable": copies, "non_rentable": 0} for t in range(titles)})
+    records = list(make_students(students))
+    issued = [0] * threads
+    barrier = threading.Barrier(threads + 1)
+
+    def worker(t):
+        rng = random.Random(t)
+        barrier.wait()
+        for _ in range(attempts):
+            batch = [(f"Title {rng.randrange(titles)}", rng.choice(records)) for _ in range(10)]
+            issued[t] += library.issue_books(batch).count("issued")
+            for title, student in rng.sample(batch, 3):
+                library.return_book(title, student)
+
+    workers = [threading.Thread(target=worker, args=(t,)) for t in range(threads)]
+    for w in workers:
+        w.start()
+    with contextlib.redirect_stdout(io.StringIO()):
+        barrier.wait()
+        start = time.perf_counter()
+        for w in workers:
+            w.join()
+        elapsed = time.perf_counter() - start
+    on_shelf = sum(book["rentable"] for book in library.books.values())
+    assert all(book["rentable"] >= 0 for book in library.books.values()), "oversold"
+    assert on_shelf + len(library.loans) == titles * copies, "copies lost or duplicated"
+    print(f"{threads} threads, {threads * attempts * 10} issue requests: {sum(issued)} issued, "
+          f"{len(library.loans)} on loan, {on_shelf} on shelf, {elapsed:.2f}s")
+
+def bench_society(sizes=(1_000, 10_000, 100_000)):
+    print(f"{'members':>9}{'add us/op':>11}{'contains us/op':>16}{'remove us/op':>14}")
+    for n in sizes:
+        db = {s.student_id: s for s in make_students(n)}
+        society = Society("IEEE", "Head", db=db)
+        entries = [(s.name, s.student_id, s.branch) for s in db.values()]
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            society.add_members(entries)
+            add = time.perf_counter() - start
+            start = time.perf_counter()
+            for student_id in db:
+                society.has_member(student_id)
+            contains = time.perf_counter() - start
+            start = time.perf_counter()
+            society.remove_members(list(db)[::2])
+            remove = time.perf_counter() - start
+        print(f"{n:>9}{add / n * 1e6:>11.2f}{contains / n * 1e6:>16.2f}{remove / (n // 2) * 1e6:>14.2f}")
+
+def bench_allotment(students=10_000, hostels=4, floors=5, rooms_per_floor=200, beds=3):
+    halls = []
+    for h in range(hostels):
+        hall = Hostel(f"Hostel {h}", {})
+        for floor in range(1, floors + 1):
+            for room in range(rooms_per_floor):
+                hall.add_room(f"{floor}{room:03d}", beds, floor)
+        halls.append(hall)
+    rng = random.Random(0)
+    names = [hall.name for hall in halls]
+    preferences = [(student, rng.sample(names, 2)) for student in make_students(students)]
+    start = time.perf_counter()
+    allocator = RoomAllocator(halls)
+    result = allocator.allot(preferences)
+    elapsed = time.perf_counter() - start
+    mixed = sum(1 for hall in halls for occupants in hall.rooms.values()
+                if len({(s.year, s.branch) for s in occupants}) > 1)
+    print(f"{students} students, {hostels * floors * rooms_per_floor * beds} beds: "
+          f"{len(result['allotted'])} allotted in {elapsed:.3f}s, {mixed} mixed-group rooms")
+
+def bench_sinks(students=20_000):
+    records = list(make_students(students))
+    sinks = {
+        "print": lambda: PrintSink(),
+        "jsonl": lambda: JsonLinesSink(io.StringIO()),
+        "jsonl-bg": lambda: JsonLinesSink(io.StringIO(), background=True),
+        "null": lambda: NullSink(),
+    }
+    previous = CollegeEntity.sink, CollegeEntity.registry
+    try:
+        for label, make_sink in sinks.items():
+            sink = make_sink()
+            set_sink(sink)
+            CollegeEntity.registry = MembershipRegistry()
+            society = Society("IEEE", "Head")
+            academic = Academic("Academic Block")
+            library = Library("Central Library", {"Python Programming": {"rentable": students, "non_rentable": 0}})
+            # line-buffered file stands in for a terminal
+            with tempfile.TemporaryFile("w", buffering=1) as out, contextlib.redirect_stdout(out):
+                start = time.perf_counter()
+                for s in records:
+                    society.add_member(s.name, s.student_id, s.branch)
+                    academic.assign_grade(None, s, s.year, 1, "Data Structures", "A")
+                    library.issue_book("Python Programming", s)
+                sink.close()
+                elapsed = time.perf_counter() - start
+            print(f"{label:<9} {3 * students} operations in {elapsed:.3f}s")
+    finally:
+        CollegeEntity.sink, CollegeEntity.registry = previous
+
+def bench_canteen(orders=200_000, producers=4):
+    students = list(make_students(1000))
+    items = [f"Item {i}" for i in range(50)]
+    previous = CollegeEntity.sink
+    set_sink(NullSink())
+    try:
+        for workers in (0, 1, 2, 4, 8):
+            canteen = Canteen("IET Cafeteria", {item: 20 + i for i, item in enumerate(items)})
+            if workers:
+                canteen.start(workers)
+            per_producer = orders // producers
+            def produce(offset):
+                for i in range(per_producer):
+                    canteen.order_item(students[(offset + i) % len(students)], items[i % len(items)])
+            threads = [threading.Thread(target=produce, args=(p * per_producer,)) for p in range(producers)]
+            start = time.perf_counter()
+            for t in threads:
+                t.start()
+            for i in range(100):  # menu churn during the rush
+                canteen.menu[items[i % len(items)]] = 20 + i
+            for t in threads:
+                t.join()
+            canteen.drain()
+            elapsed = time.perf_counter() - start
+            canteen.stop()
+            completed = sum(order["status"] == "completed" for order in canteen.orders.values())
+            assert completed == per_producer * producers
+            label = f"{workers} workers" if workers else "inline"
+            print(f"{label:<10} {completed} orders in {elapsed:.3f}s ({completed / elapsed:,.0f} orders/s)")
+    finally:
+        set_sink(previous)
+
+def bench_sales(orders=500_000, refreshes=1000):
+    rng = random.Random(0)
+    items = [f"Item {i}" for i in range(200)]
+    weights = [1 / (i + 1) for i in range(len(items))]
+    canteen = Canteen("IET Cafeteria", {item: 10 + i % 90 for i, item in enumerate(items)})
+    sales = SalesAggregator(canteen)
+    now = time.time()
+    stream = [{"order_id": i, "student_id": f"S{rng.randrange(20_000)}", "item": item, "quantity": 1,
+               "total": canteen.menu[item], "time": now - rng.random() * 86_400, "status": "completed"}
+              for i, item in enumerate(rng.choices(items, weights, k=orders))]
+    start = time.perf_counter()
+    for order in stream:
+        sales.order_completed(order)
+    ingest = time.perf_counter() - start
+    start = time.perf_counter()
+    for _ in range(refreshes):
+        sales.window_totals(), sales.best_sellers(10), sales.hourly(), sales.spend("S1")
+    query = time.perf_counter() - start
+    start = time.perf_counter()
+    for _ in range(3):
+        cutoff = now - 3600
+        recent = [o["total"] for o in stream if o["time"] >= cutoff]
+        counts = {}
+        for o in stream:
+            counts[o["item"]] = counts.get(o["item"], 0) + 1
+        heapq.nlargest(10, counts.items(), key=lambda kv: kv[1])
+    rescan = (time.perf_counter() - start) / 3
+    exact = sorted(counts, key=counts.get, reverse=True)[:10]
+    found = [item for item, _ in sales.best_sellers(10)]
+    print(f"ingest   {orders} orders in {ingest:.3f}s ({orders / ingest:,.0f} orders/s)")
+    print(f"refresh  {query / refreshes * 1e6:.1f}us per dashboard refresh (rescan: {rescan * 1e3:.1f}ms)")
+    print(f"top-10   {len(set(exact) & set(found))}/10 heavy hitters match the exact ranking")
+    print(f"window   {sales.window_totals()[0]} orders in the last hour (exact: {len(recent)})")
+
+def bench_catalogue(titles=100_000, publishes=1000):
+    previous = CollegeEntity.sink
+    set_sink(NullSink())
+    try:
+        library = Library("Central Library", {f"Book {i}": {"rentable": 3, "non_rentable": 1} for i in range(titles)})
+        start = time.perf_counter()
+        for i in range(publishes):
+            library.add_rentable_book(f"Book {i}", 1)
+            snapshot = library.snapshot()
+        published = time.perf_counter() - start
+        db = {}
+        start = time.perf_counter()
+        for i in range(publishes // 100):
+            library.add_rentable_book(f"Book {i}", 1)
+            library.update_db(db)  # title-keyed library_db layout
+        title_keyed = (time.perf_counter() - start) / (publishes // 100)
+        snapshot = library.snapshot()
+        library.add_rentable_book("Book 0", 1)
+        assert snapshot["Book 0"]["rentable"] == 5 and db["Book 0"]["rentable"] == 5, "torn snapshot"
+        assert library.books["Book 0"]["rentable"] == 6 and Library.get_rentable_books(db)["Book 0"] == 5
+        print(f"library  {publishes} write+snapshot cycles on {titles} titles: {published / publishes * 1e6:.1f}us each "
+              f"(title-keyed update_db: {title_keyed * 1e6:.1f}us)")
+        start = time.perf_counter()
+        for _ in range(publishes):
+            library.snapshot()
+        print(f"library  snapshot with no writes in between: {(time.perf_counter() - start) / publishes * 1e6:.2f}us")
+        names = list(Club.CLUB_INDEX)
+        start = time.perf_counter()
+        for i in range(100_000):
+            Club(names[i % len(names)], None, None, {})
+        print(f"club     100000 clubs created in {time.perf_counter() - start:.3f}s")
+    finally:
+        set_sink(previous)
+
+def bench_reports(students=20_000, formats=("txt", "csv")):
+    previous = CollegeEntity.sink, CollegeEntity.registry
+    set_sink(NullSink())
+    CollegeEntity.registry = MembershipRegistry()
+    try:
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            campus = generate_campus(students, subjects=4)
+        counts = [workers for workers in (1, 2, 4, 8) if workers <= (os.cpu_count() or 1)]
+        baseline = None
+        for workers in counts:
+            with tempfile.TemporaryDirectory() as out:
+                generator = ReportGenerator(out, formats, workers=workers)
+                start = time.perf_counter()
+                documents = sum(count for _, count, _ in generator.generate(
+                    campus["student_db"], campus["departments"], campus["clubs"], campus["societies"], campus["academic"]))
+                elapsed = time.perf_counter() - start
+            baseline = baseline or elapsed
+            print(f"{workers} workers  {documents} documents x {len(formats)} formats in {elapsed:.2f}s "
+                  f"({documents / elapsed:,.0f} docs/s, speedup {baseline / elapsed:.2f}x)")
+    finally:
+        CollegeEntity.sink, CollegeEntity.registry = previous
+
+def bench_cache(students=5_000, requests=200_000, write_ratio=0.02):
+    rng = random.Random(0)
+    previous = CollegeEntity.sink, CollegeEntity.registry, CollegeEntity.cache
+    set_sink(NullSink())
+    CollegeEntity.registry = MembershipRegistry()
+    try:
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            campus = generate_campus(students)
+        db, academic, library, hostel = campus["student_db"], campus["academic"], campus["library"], campus["hostels"][0]
+        club = campus["clubs"][0]
+        ids, titles, rooms = list(db), list(library.books), list(hostel.rooms)
+        # portal traffic is skewed towards a few popular students, titles and rooms
+        hot = lambda values: values[min(len(values) - 1, int(rng.paretovariate(1.2)) - 1)]
+        reads = [
+            lambda: academic.transcript(hot(ids)),
+            lambda: academic.get_subject_grades(f"SUB{rng.randrange(40)}"),
+            lambda: library.availability(hot(titles)),
+            lambda: library.rentable_books(),
+            lambda: club.member_list(),
+            lambda: hostel.roommates(hot(rooms)),
+        ]
+        writes = [
+            lambda: academic.assign_grade(None, db[hot(ids)], 1, 1, f"SUB{rng.randrange(40)}", rng.choice("ABCDF")),
+            lambda: library.issue_book(hot(titles), db[rng.choice(ids)]),
+            lambda: library.add_rentable_book(hot(titles), 1),
+        ]
+        for label, cache in (("uncached", ResultCache()), ("cached", ResultCache())):
+            cache.enabled = label == "cached"
+            CollegeEntity.cache = cache
+            rng.seed(1)
+            start = time.perf_counter()
+            for _ in range(requests):
+                (rng.choice(writes) if rng.random() < write_ratio else rng.choice(reads))()
+            elapsed = time.perf_counter() - start
+            stats = cache.stats()
+            print(f"{label:<9} {requests} requests in {elapsed:.3f}s ({requests / elapsed:,.0f}/s), "
+                  f"hit rate {stats['hit_rate']:.1%}, {stats['invalidations']} invalidations, {stats['evictions']} evictions")
+        # every cached answer must match a fresh computation after all those writes
+        queries = ([lambda i=i: academic.transcript(i) for i in ids[:500]]
+                   + [lambda t=t: library.availability(t) for t in titles[:500]]
+                   + [lambda r=r: hostel.roommates(r) for r in rooms[:100]]
+                   + [library.rentable_books, club.member_list])
+        served = [query() for query in queries]
+        CollegeEntity.cache = ResultCache()
+        CollegeEntity.cache.enabled = False
+        assert served == [query() for query in queries], "cache served stale data"
+    finally:
+        CollegeEntity.sink, CollegeEntity.registry, CollegeEntity.cache = previous
+
+async def _load_generator(address, campus, clients, requests, pipeline):
+    # each client keeps `pipeline` requests in flight on one connection
+    ids, titles = list(campus["student_db"]), list(campus["library"].books)
+    rooms = list(campus["hostels"][0].rooms)
+    rng = random.Random(0)
+    mix = [
+        (30, lambda: ("academic.transcript", {"student_id": rng.choice(ids)})),
+        (20, lambda: ("library.availability", {"title": rng.choice(titles)})),
+        (10, lambda: ("student.get", {"student_id": rng.choice(ids)})),
+        (15, lambda: ("canteen.order", {"student_id": rng.choice(ids), "item": "Coffee"})),
+        (10, lambda: ("library.issue_book", {"title": rng.choice(titles), "student_id": rng.choice(ids)})),
+        (10, lambda: ("academic.assign_grade", {"student_id": rng.choice(ids), "year": 1, "semester": 2,
+                                                "subject": "Load", "grade": "A"})),
+        (5, lambda: ("hostel.pay_fees", {"hostel": "Hostel 0", "room_no": rng.choice(rooms), "amount": 100})),
+    ]
+    weights = [weight for weight, _ in mix]
+    latencies = {"payments": [], "other": []}
+    errors = 0
+    remaining = requests
+
+    async def worker(client):
+        nonlocal remaining, errors
+        while remaining > 0:
+            remaining -= 1
+            op, args = rng.choices(mix, weights)[0][1]()
+            start = time.perf_counter()
+            try:
+                await client.call(op, **args)
+            except RuntimeError:
+                errors += 1
+            latencies["payments" if op == "hostel.pay_fees" else "other"].append(time.perf_counter() - start)
+
+    host, port, path = (None, None, address) if isinstance(address, str) else (*address, None)
+    connections = [await CampusClient.connect(host, port, path) for _ in range(clients)]
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(client) for client in connections for _ in range(pipeline)))
+    elapsed = time.perf_counter() - start
+    for client in connections:
+        await client.close()
+    return elapsed, errors, latencies
+
+def bench_server(students=5_000, requests=20_000, clients=8, pipeline=16, payment_delay=0.05):
+    previous = CollegeEntity.sink, CollegeEntity.registry, Hostel.PAYMENT_DELAY
+    set_sink(NullSink())
+    CollegeEntity.registry = MembershipRegistry()
+    try:
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            campus = generate_campus(students, subjects=4)
+        canteen = Canteen("IET Cafeteria", {"Coffee": 20, "Chowmein": 40})
+        # payments wait on the gateway for payment_delay; if that stalled the
+        # event loop, every other request's tail latency would show it
+        Hostel.PAYMENT_DELAY = payment_delay
+
+        async def run(path=None):
+            server = CampusServer(campus["student_db"], campus["faculty_db"], campus["library"], campus["hostels"],
+                                  canteen, campus["academic"], AccountsDepartment("Accounts", FeeLedger()))
+            address = await server.start(path=path)
+            try:
+                return await _load_generator(address, campus, clients, requests, pipeline)
+            finally:
+                await server.close()
+
+        print(f"{clients} clients x {pipeline} pipelined requests, {payment_delay * 1e3:.0f}ms payment gateway")
+        print(f"{'transport':<10}{'requests':<10}{'req/s':>9}{'errors':>8}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'p99.9 ms':>10}{'max ms':>9}")
+        with tempfile.TemporaryDirectory() as tmp:
+            for transport, path in (("tcp", None), ("unix", os.path.join(tmp, "campus.sock"))):
+                elapsed, errors, latencies = asyncio.run(run(path))
+                for label, values in latencies.items():
+                    values.sort()
+                    pct = lambda q: values[min(len(values) - 1, int(q * len(values)))] * 1e3
+                    rate = f"{requests / elapsed:,.0f}" if label == "other" else ""
+                    print(f"{transport:<10}{label:<10}{rate:>9}{errors if label == 'other' else '':>8}{pct(0.5):>9.2f}"
+                          f"{pct(0.95):>9.2f}{pct(0.99):>9.2f}{pct(0.999):>10.2f}{values[-1] * 1e3:>9.2f}")
+    finally:
+        CollegeEntity.sink, CollegeEntity.registry, Hostel.PAYMENT_DELAY = previous
+
+FIRST_NAMES = ["Amit", "Riya", "Manish", "Neha", "Rahul", "Priya", "Arjun", "Sneha", "Vikram", "Anjali", "Rohan", "Kavya"]
+LAST_NAMES = ["Sharma", "Verma", "Kumar", "Agarwal", "Gupta", "Singh", "Patel", "Reddy", "Nair", "Iyer", "Joshi", "Mehta"]
+SUBJECTS = ["Python", "Data", "Linear", "Organic", "Modern", "Digital"]
+TOPICS = ["Programming", "Structures", "Algebra", "Chemistry", "Physics", "Circuits"]
+
+def bench_search(students=100_000, faculty=2_000, titles=20_000, queries=2_000):
+    rng = random.Random(0)
+    db = StudentStore()
+    for i, s in enumerate(make_students(students)):
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        s.name, s.email = f"{first} {last}", f"{first.lower()}.{last.lower()}{i}@college.edu"
+        db.add(s)
+    faculty_db = {f.faculty_id: f for f in make_faculty(faculty)}
+    library = Library("Central Library", {f"{rng.choice(SUBJECTS)} {rng.choice(TOPICS)} Vol {i}": {"rentable": 1, "non_rentable": 0}
+                                          for i in range(titles)})
+    start = time.perf_counter()
+    index = SearchIndex().watch(db, faculty_db, library)
+    print(f"build    {len(index)} documents in {time.perf_counter() - start:.2f}s")
+
+    def typo(word):
+        i = rng.randrange(1, len(word) - 1)
+        return word[:i] + word[i + 1:]
+    ids, catalogue = list(db), list(library.books)
+    makers = [
+        lambda: f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)[:2]}",                      # partial name
+        lambda: f"{typo(rng.choice(FIRST_NAMES))} {rng.choice(LAST_NAMES)}",                   # misspelt name
+        lambda: db[rng.choice(ids)].email.replace("college", "colege"),                        # misspelt email
+        lambda: f"{rng.choice(SUBJECTS)[:4]} {rng.choice(TOPICS)[:4]}",                          # title fragment
+        lambda: " ".join(typo(word) if word.isalpha() and len(word) > 4 else word for word in rng.choice(catalogue).split()),
+        lambda: rng.choice(ids),
+    ]
+    mix = [rng.choice(makers)() for _ in range(queries)]
+    latencies, empty = [], 0
+    for query in mix:
+        start = time.perf_counter()
+        empty += not index.search(query, 10)
+        latencies.append(time.perf_counter() - start)
+    latencies.sort()
+    pct = lambda q: latencies[min(len(latencies) - 1, int(q * len(latencies)))] * 1e3
+    print(f"query    {queries} mixed queries: p50 {pct(0.5):.3f}ms, p95 {pct(0.95):.3f}ms, p99 {pct(0.99):.3f}ms, "
+          f"{empty} with no results")
+    start = time.perf_counter()
+    for query in mix[:20]:
+        needle = query.casefold()
+        [s for s in db.values() if needle in s.name.casefold() or needle in s.email.casefold()]
+        [t for t in library.books if needle in t.casefold()]
+    print(f"scan     substring scan baseline: {(time.perf_counter() - start) / 20 * 1e3:.1f}ms per query")
+    start = time.perf_counter()
+    for i in range(1000):
+        db.add(Student(f"N{i}", f"N{i:07d}", f"{rng.choice(FIRST_NAMES)} Newcomer", 1, COURSES[0], BRANCHES[0], "9", f"n{i}@college.edu"))
+    library.add_rentable_book("Quantum Computing Primer", 1)
+    added = time.perf_counter() - start
+    assert index.search("newcomer", 1) and index.search("quantm computing", 1), "incremental update missing"
+    print(f"update   1000 students + 1 title indexed incrementally in {added * 1e3:.1f}ms")
+
+def bench_transactions(students=5_000, batch_sizes=(1, 10, 100, 1000)):
+    previous = CollegeEntity.sink, CollegeEntity.registry, CollegeEntity.cache
+    set_sink(NullSink())
+    CollegeEntity.registry = MembershipRegistry()
+    CollegeEntity.cache = ResultCache()
+    try:
+        db = StudentStore()
+        for s in make_students(students):
+            db.add(s)
+        ABC.student_db = db
+        ids = list(db)
+        position = {i: n for n, i in enumerate(ids)}
+
+        def campus():
+            return (AccountsDepartment("Accounts", FeeLedger()),
+                    Library("Central Library", {f"Book {i}": {"rentable": 5, "non_rentable": 0} for i in range(students // 5)}),
+                    Academic("Academic Block"), Club("Dance Club", db[ids[0]], db[ids[1]], {}))
+
+        # enrolment: tuition, a textbook, a provisional grade and a club for every student
+        def operations(accounts, library, academic, club, cohort):
+            return ([(accounts, "pay_fees", (db[i], 50_000)) for i in cohort]
+                    + [(library, "issue_book", (f"Book {position[i] % (students // 5)}", db[i])) for i in cohort]
+                    + [(academic, "assign_grade", (None, db[i], 1, 1, "Orientation", "P")) for i in cohort]
+                    + [(club, "add_member", (i,)) for i in cohort])
+
+        def state(accounts, library, academic, club):
+            return (accounts.ledger.totals(), dict(library.books), dict(library.loans),
+                    {i: academic.transcript(i) for i in ids}, tuple(club.members))
+
+        print(f"{'mode':<16}{'ops':>8}{'seconds':>10}{'us/op':>9}{'commits':>9}")
+        entities = campus()
+        ops = [op for chunk in range(0, students, 1000) for op in operations(*entities, ids[chunk:chunk + 1000])]
+        start = time.perf_counter()
+        for entity, method, args in ops:
+            getattr(entity, method)(*args)
+        elapsed = time.perf_counter() - start
+        print(f"{'direct calls':<16}{len(ops):>8}{elapsed:>10.3f}{elapsed / len(ops) * 1e6:>9.2f}{'-':>9}")
+        expected = state(*entities)
+        for size in batch_sizes:
+            entities, manager = campus(), TransactionManager()
+            start = time.perf_counter()
+            step = max(1, size // 4)
+            for chunk in range(0, students, step):
+                batch = operations(*entities, ids[chunk:chunk + step])
+                for begin in range(0, len(batch), size):
+                    tx = manager.transaction()
+                    for entity, method, args in batch[begin:begin + size]:
+                        tx.call(entity, method, *args)
+                    tx.commit()
+            elapsed = time.perf_counter() - start
+            label = "one at a time" if size == 1 else f"batch of {size}"
+            print(f"{label:<16}{len(ops):>8}{elapsed:>10.3f}{elapsed / len(ops) * 1e6:>9.2f}{manager.commits:>9}")
+            assert state(*entities) == expected, f"{label} diverged from direct calls"
+
+        # a failing operation at the end of a batch leaves no trace
+        accounts, library, academic, club = entities
+        before = state(*entities)
+        tx = manager.transaction()
+        for entity, method, args in operations(accounts, library, academic, club, ids[:200]):
+            tx.call(entity, method, *args)
+        tx.call(library, "issue_book", "No Such Book", db[ids[0]])
+        try:
+            tx.commit()
+        except TransactionAborted:
+            pass
+        assert state(*entities) == before, "rollback left changes behind"
+        print(f"rollback of {len(tx)} operations restored every balance, loan, grade and membership")
+
+        # optimistic check: a commit racing a stale read is refused, then retried
+        stale = manager.transaction()
+        stale.read(library)
+        manager.run(lambda tx: tx.call(library, "update_db", {}))
+        try:
+            stale.commit()
+            raise AssertionError("stale transaction committed")
+        except TransactionConflict:
+            pass
+        manager.run(lambda tx: tx.call(library, "update_db", {}))
+        print(f"manager: {manager.stats()}")
+    finally:
+        CollegeEntity.sink, CollegeEntity.registry, CollegeEntity.cache = previous
+
+def generate_campus(students=1000, subjects=8, seed=0):
+    rng = random.Random(seed)
+    student_db = StudentStore()
+    for student in make_students(students):
+        student_db.add(student)
+    ids = list(student_db)
+    faculty_db = {f.faculty_id: f for f in make_faculty(max(10, students // 20))}
+    departments = [Department(f"D{i + 1:02d}", branch, COURSES, None, student_db, [], faculty_db)
+                   for i, branch in enumerate(BRANCHES)]
+    academic = Academic("Academic Block")
+    academic.assign_grades((student_id, year, 1, f"SUB{(year * subjects + k) % 40}", rng.choice("ABCDF"))
+                           for student_id, year in ((s.student_id, s.year) for s in student_db.values())
+                           for k in range(subjects))
+    library = Library("Central Library", {f"Book {i}": {"rentable": rng.randint(0, 5), "non_rentable": rng.randint(0, 2)}
+                                          for i in range(max(100, students // 10))})
+    ABC.student_db = student_db  # Club.add_member resolves ids through the module-level db
+    clubs = []
+    for category in Club.CLUB_CATEGORIES.values():
+        for name in category:
+            leads = rng.sample(ids, 2)
+            club = Club(name, student_db[leads[0]], student_db[leads[1]], {})
+            for student_id in rng.sample(ids, min(len(ids), max(10, students // 50))):
+                club.add_member(student_id)
+            clubs.append(club)
+    societies = []
+    for names in Society.SOCIETY_CATEGORIES.values():
+        for name in names:
+            society = Society(name, "Head", db=student_db)
+            society.add_members((s.name, s.student_id, s.branch)
+                                for s in (student_db[i] for i in rng.sample(ids, min(len(ids), max(10, students // 20)))))
+            societies.append(society)
+    hostels = []
+    for h in range(max(1, students // 3000)):
+        hostel = Hostel(f"Hostel {h}", {})
+        for floor in range(1, 6):
+            for room in range(100):
+                hostel.add_room(f"{floor}{room:02d}", 3, floor)
+        hostels.append(hostel)
+    RoomAllocator(hostels).allot((s, []) for s in student_db.values())
+    return {"student_db": student_db, "faculty_db": faculty_db, "departments": departments, "academic": academic,
+            "library": library, "clubs": clubs, "societies": societies, "hostels": hostels}
+
+@contextlib.contextmanager
+def no_sleeps():
+    delays = Hostel.PAYMENT_DELAY, Library.SHELF_DELAY, Canteen.APPROVAL_DELAY
+    Hostel.PAYMENT_DELAY = Library.SHELF_DELAY = Canteen.APPROVAL_DELAY = 0
+    try:
+        yield
+    finally:
+        Hostel.PAYMENT_DELAY, Library.SHELF_DELAY, Canteen.APPROVAL_DELAY = delays
+
+def _time(results, label, calls):
+    calls = list(calls)
+    start = time.perf_counter()
+    for call in calls:
+        call()
+    elapsed = time.perf_counter() - start
+    results[label] = {"ops": len(calls), "seconds": elapsed, "us_per_op": elapsed / max(1, len(calls)) * 1e6}
+
+def bench_suite(scale=10_000, ops=5_000, sleeps=False, output=None, compare=None):
+    rng = random.Random(1)
+    previous = CollegeEntity.sink, CollegeEntity.registry, CollegeEntity.cache
+    set_sink(NullSink())
+    CollegeEntity.registry = MembershipRegistry()
+    CollegeEntity.cache = ResultCache()
+    results = {}
+    sleep_guard = contextlib.nullcontext() if sleeps else no_sleeps()
+    try:
+        with sleep_guard, open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            start = time.perf_counter()
+            campus = generate_campus(scale)
+            generate = time.perf_counter() - start
+            db, academic, library = campus["student_db"], campus["academic"], campus["library"]
+            ids = list(db)
+            titles = list(library.books)
+            club, society, hostel = campus["clubs"][0], campus["societies"][0], campus["hostels"][0]
+            n = min(ops, scale)
+            _time(results, "get_element_by_id", (lambda i=i: get_element_by_id(i, db) for i in rng.choices(ids, k=n)))
+            candidates = [i for i in ids if i not in club.members][:n]
+            _time(results, "Club.add_member", (lambda i=i: club.add_member(i) for i in candidates))
+            _time(results, "Society.remove_member", (lambda i=i: society.remove_member(i) for i in list(society.members)[:n]))
+            _time(results, "Library.issue_book", (lambda t=t, s=s: library.issue_book(t, db[s])
+                                                  for t, s in zip(rng.choices(titles, k=n), rng.choices(ids, k=n))))
+            _time(results, "Library.get_rentable_books", (lambda: Library.get_rentable_books(library.books) for _ in range(100)))
+            _time(results, "Library.rentable_view", (lambda: library.rentable_view() for _ in range(100)))
+            _time(results, "Academic.assign_grade", (lambda s=s: academic.assign_grade(None, db[s], 5, 1, "Benchmark", "A")
+                                                     for s in rng.choices(ids, k=n)))
+            _time(results, "Academic.view_subject_grades", (lambda k=k: academic.view_subject_grades(f"SUB{k}") for k in range(40)))
+            _time(results, "Academic.view_grades", (lambda s=s: academic.view_grades(db[s]) for s in rng.choices(ids, k=min(n, 1000))))
+            rooms = [room for room in hostel.rooms if hostel.rooms[room]][:(n if not sleeps else 2)]
+            _time(results, "Hostel.pay_fees", (lambda r=r: hostel.pay_fees(r, 15000, db) for r in rooms))
+            _time(results, "Hostel.pay_fees_batch", [lambda: asyncio.run(hostel.pay_fees_batch([(r, 15000) for r in rooms], db))])
+    finally:
+        CollegeEntity.sink, CollegeEntity.registry, CollegeEntity.cache = previous
+    report = {"meta": {"scale": scale, "ops": ops, "sleeps": sleeps, "generate_seconds": generate,
+                       "python": platform.python_version(), "timestamp": time.time()},
+              "results": results}
+    print(f"campus of {scale} students generated in {generate:.2f}s")
+    print(f"{'operation':<32}{'ops':>8}{'us/op':>12}")
+    for label, r in results.items():
+        print(f"{label:<32}{r['ops']:>8}{r['us_per_op']:>12.2f}")
+    if output:
+        with open(output, "w") as f:
+            json.dump(report, f, indent=2)
+    if compare:
+        with open(compare) as f:
+            compare_reports(json.load(f), report)
+    return report
+
+def compare_reports(old, new, threshold=0.10):
+    print(f"\n{'operation':<32}{'old us/op':>12}{'new us/op':>12}{'change':>9}")
+    for label, r in new["results"].items():
+        before = old["results"].get(label)
+        if before is None:
+            continue
+        change = r["us_per_op"] / before["us_per_op"] - 1 if before["us_per_op"] else 0.0
+        flag = "  REGRESSION" if change > threshold else ""
+        print(f"{label:<32}{before['us_per_op']:>12.2f}{r['us_per_op']:>12.2f}{change:>+9.0%}{flag}")
+
+BENCHMARKS = {
+    "memory": bench_memory,
+    "ledger": bench_ledger_contention,
+    "analytics": bench_analytics,
+    "storage": bench_storage,
+    "snapshot": bench_snapshot,
+    "circulation": bench_circulation,
+    "society": bench_society,
+    "allotment": bench_allotment,
+    "sinks": bench_sinks,
+    "canteen": bench_canteen,
+    "sales": bench_sales,
+    "catalogue": bench_catalogue,
+    "reports": bench_reports,
+    "cache": bench_cache,
+    "server": bench_server,
+    "search": bench_search,
+    "transactions": bench_transactions,
+}
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="College management system benchmarks")
+    parser.add_argument("names", nargs="*", help=f"benchmarks to run: suite, {', '.join(BENCHMARKS)} (default: all)")
+    parser.add_argument("--scale", type=int, default=10_000, help="students in the suite's synthetic campus")
+    parser.add_argument("--ops", type=int, default=5_000, help="operations timed per suite entry")
+    parser.add_argument("--sleeps", action="store_true", help="keep the artificial time.sleep delays in the suite")
+    parser.add_argument("--output", help="write suite results as JSON")
+    parser.add_argument("--compare", help="compare suite results against an earlier JSON run")
+    args = parser.parse_args()
+    for name in args.names or ["suite", *BENCHMARKS]:
+        print(f"\n== {name} ==")
+        if name == "suite":
+            bench_suite(args.scale, args.ops, args.sleeps, args.output, args.compare)
+        else:
+            BENCHMARKS[name]()
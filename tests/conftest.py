@@ -0,0 +1,34 @@
+import pytest
+
+import ABC
+from ABC import Canteen, CollegeEntity, Course, Hostel, Library, MembershipRegistry, NullSink, ResultCache, Student, StudentStore
+
+
+@pytest.fixture(autouse=True)
+def campus_defaults(monkeypatch):
+    # every test gets a silent sink, its own registry and cache, and no artificial delays
+    monkeypatch.setattr(CollegeEntity, "sink", NullSink())
+    monkeypatch.setattr(CollegeEntity, "registry", MembershipRegistry())
+    monkeypatch.setattr(CollegeEntity, "cache", ResultCache())
+    monkeypatch.setattr(Hostel, "PAYMENT_DELAY", 0)
+    monkeypatch.setattr(Library, "SHELF_DELAY", 0)
+    monkeypatch.setattr(Canteen, "APPROVAL_DELAY", 0)
+
+
+@pytest.fixture
+def btech():
+    return Course("C01", "B.Tech")
+
+
+@pytest.fixture
+def make_student(btech):
+    def make(i, name=None, year=1, branch="Civil"):
+        return Student(f"S{i}", f"R{i}", name or f"Student {i}", year, btech, branch, f"9{i:09d}", f"s{i}@college.edu")
+    return make
+
+
+@pytest.fixture
+def student_db(monkeypatch):
+    db = StudentStore()
+    monkeypatch.setattr(ABC, "student_db", db, raising=False)  # Club.add_member looks students up here
+    return db
@@ -0,0 +1,51 @@
+from ABC import Academic
+
+
+def students_in(academic, subject):
+    return sorted((row["student_id"], row["grade"]) for row in academic.get_subject_grades(subject))
+
+
+def test_subject_index_follows_assignments(make_student):
+    academic = Academic("Academic Block")
+    s1, s2 = make_student(1), make_student(2)
+    academic.assign_grade(None, s1, 2, 1, "OOP", "A")
+    academic.assign_grade(None, s2, 2, 1, "OOP", "B")
+    academic.assign_grades([("S1", 2, 2, "DBMS", "A+"), ("S2", 2, 1, "OOP", "C")])
+
+    assert students_in(academic, "OOP") == [("S1", "A"), ("S2", "C")]
+    assert students_in(academic, "DBMS") == [("S1", "A+")]
+    assert students_in(academic, "Signals") == []
+
+
+def test_update_grades_replaces_and_removes_subjects(make_student):
+    academic = Academic("Academic Block")
+    s1 = make_student(1)
+    academic.assign_grade(None, s1, 2, 1, "OOP", "A")
+    academic.assign_grade(None, s1, 2, 1, "Signals", "B")
+
+    academic.update_grades(s1, {2: {1: {"OOP": "A+", "DBMS": "B"}}})
+    assert students_in(academic, "OOP") == [("S1", "A+")]
+    assert students_in(academic, "DBMS") == [("S1", "B")]
+    assert students_in(academic, "Signals") == []
+
+    academic.update_grades(s1, {})
+    assert students_in(academic, "OOP") == students_in(academic, "DBMS") == []
+    assert academic.transcript("S1") == ()
+
+
+def test_caller_mutations_cannot_desync_the_index(make_student):
+    academic = Academic("Academic Block")
+    s1 = make_student(1)
+    grades = {2: {1: {"OOP": "A", "DBMS": "B"}}}
+    academic.update_grades(s1, grades)
+    assert students_in(academic, "OOP") == [("S1", "A")]
+
+    del grades[2][1]["OOP"]  # the caller keeps editing its own tree...
+    grades[2][1]["DBMS"] = "F"
+    assert academic.records["S1"] == {2: {1: {"OOP": "A", "DBMS": "B"}}}
+    assert students_in(academic, "DBMS") == [("S1", "B")]
+
+    academic.update_grades(s1, grades)  # ...and hands it back
+    assert students_in(academic, "OOP") == []
+    assert students_in(academic, "DBMS") == [("S1", "F")]
+    assert academic.transcript("S1") == ((2, 1, "DBMS", "F"),)
@@ -0,0 +1,25 @@
+import pytest
+
+from ABC import Hostel, RoomAllocator
+
+
+def test_same_named_hostel_does_not_count_as_housed(make_student):
+    student = make_student(1)
+    elsewhere = Hostel("Raman Hostel", {}, capacity=2)
+    elsewhere.add_room_members("101", student)
+    hostel = Hostel("Raman Hostel", {})
+    hostel.add_room("101", 2)
+
+    allocator = RoomAllocator([hostel])
+    assert allocator.allot([(student, [])])["allotted"] == {"S1": ("Raman Hostel", "101")}
+    assert allocator.allot([(student, [])])["already_housed"] == ["S1"]
+
+
+def test_rooms_without_a_capacity_are_rejected(make_student):
+    hostel = Hostel("Raman Hostel", {"101": (make_student(1),)})
+    hostel.add_room("102", 2)
+    with pytest.raises(ValueError, match="101"):
+        RoomAllocator([hostel])
+
+    hostel.add_room("101", 2)
+    assert RoomAllocator([hostel]).free_beds() == {"Raman Hostel": {1: 3}}
@@ -0,0 +1,26 @@
+import json
+
+from ABC import BulkIO, Course, Department, StudentStore
+
+
+def test_non_scalar_fields_fail_only_their_row(tmp_path):
+    btech = Course("C01", "B.Tech")
+    db = StudentStore()
+    civil = Department("D01", "Civil", [btech], None, db, [], {})
+    rows = [
+        {"student_id": "S1", "roll_no": "R1", "name": "Amit", "year": 1, "course": "C01", "branch": "Civil",
+         "phone": "9000000001", "email": "amit@college.edu"},
+        {"student_id": "S2", "roll_no": "R2", "name": "Riya", "year": 1, "course": ["C01"], "branch": "Civil",
+         "phone": "9000000002", "email": "riya@college.edu"},
+        {"student_id": "S3", "roll_no": "R3", "name": "Neha", "year": 1, "course": "C01", "branch": {"id": "D01"},
+         "phone": "9000000003", "email": "neha@college.edu"},
+        {"student_id": "S4", "roll_no": "R4", "name": "Ravi", "year": 1, "course": "C01", "branch": "Civil",
+         "phone": "9000000004", "email": "ravi@college.edu"},
+    ]
+    path = tmp_path / "students.jsonl"
+    path.write_text("".join(json.dumps(row) + "\n" for row in rows))
+
+    report = BulkIO([btech], [civil]).import_students(str(path), db)
+    assert (report["imported"], report["failed"]) == (2, 2)
+    assert [line_no for line_no, _ in report["errors"]] == [2, 3]
+    assert sorted(db) == ["S1", "S4"]
@@ -0,0 +1,53 @@
+import pytest
+
+from ABC import Academic, Club, CollegeEntity, Hostel, Library
+
+
+def test_member_list_follows_student_updates(student_db, make_student):
+    db = student_db
+    db.add(make_student(1, "Old Name"))
+    club = Club("Dance Club", None, None, {})
+    club.add_member("S1")
+    assert club.member_list()[0][1] == "Old Name"
+
+    db.update_student("S1", name="New Name")
+    assert club.member_list()[0][1] == "New Name"
+    db["S1"] = make_student(1, "Replaced")
+    club.members["S1"] = db["S1"]
+    assert club.member_list()[0][1] == "Replaced"
+
+
+def test_subject_grade_rows_are_read_only(make_student):
+    academic = Academic("Academic Block")
+    academic.assign_grade(None, make_student(1), 1, 1, "OOP", "A")
+    rows = academic.get_subject_grades("OOP")
+    with pytest.raises(TypeError):
+        rows[0]["grade"] = "F"
+    assert academic.get_subject_grades("OOP")[0]["grade"] == "A"
+
+
+def test_mutators_invalidate_cached_reads(make_student):
+    student = make_student(1)
+    academic = Academic("Academic Block")
+    academic.assign_grade(None, student, 1, 1, "OOP", "A")
+    assert academic.transcript("S1") == ((1, 1, "OOP", "A"),)
+    academic.assign_grade(None, student, 1, 1, "OOP", "B")
+    assert academic.transcript("S1") == ((1, 1, "OOP", "B"),)
+    academic.update_grades(student, {2: {1: {"DBMS": "A"}}})
+    assert academic.get_subject_grades("OOP") == ()
+
+    library = Library("Central Library", {"Digital Logic": {"rentable": 1, "non_rentable": 0}})
+    assert library.rentable_books() == ("Digital Logic",)
+    library.issue_book("Digital Logic", student)
+    assert library.availability("Digital Logic")["rentable"] == 0
+    assert library.rentable_books() == ()
+    library.return_book("Digital Logic", student)
+    assert library.rentable_books() == ("Digital Logic",)
+
+    hostel = Hostel("Raman Hostel", {})
+    assert hostel.roommates("101") == ()
+    hostel.add_room_members("101", student)
+    assert hostel.roommates("101") == (student,)
+    hostel.vaccate_room("101")
+    assert hostel.roommates("101") == ()
+    assert CollegeEntity.cache.stats()["invalidations"] > 0
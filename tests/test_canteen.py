@@ -0,0 +1,41 @@
+import pytest
+
+from ABC import Canteen
+
+
+class FlakySubscriber:
+    def __init__(self):
+        self.seen = []
+
+    def order_completed(self, order):
+        if order["order_id"] == 2:
+            raise RuntimeError("subscriber bug")
+        self.seen.append(order["order_id"])
+
+
+def test_failing_subscriber_does_not_stall_workers(make_student):
+    student = make_student(1)
+    canteen = Canteen("IET Cafeteria", {"Coffee": 20}, batch_size=2)
+    subscriber = FlakySubscriber()
+    canteen.subscribe(subscriber)
+    canteen.start(workers=2)
+    ids = [canteen.order_item(student, "Coffee") for _ in range(6)]
+    canteen.stop()  # used to hang once a worker died
+
+    assert [canteen.order_status(i) for i in ids] == ["completed", "failed", "completed", "completed", "completed", "completed"]
+    assert "subscriber bug" in canteen.orders[2]["error"]
+    assert sorted(subscriber.seen) == [1, 3, 4, 5, 6]
+
+
+@pytest.mark.parametrize("quantity", [0, -2, 1.5, "3", True, None])
+def test_bad_quantities_are_rejected_before_queuing(make_student, quantity):
+    canteen = Canteen("IET Cafeteria", {"Coffee": 20})
+    with pytest.raises(ValueError, match="Quantity"):
+        canteen.order_item(make_student(1), "Coffee", quantity)
+    assert canteen.orders == {}
+
+
+def test_valid_quantity_is_priced(make_student):
+    canteen = Canteen("IET Cafeteria", {"Coffee": 20})
+    order_id = canteen.order_item(make_student(1), "Coffee", 3)
+    assert canteen.order_status(order_id) == "completed" and canteen.orders[order_id]["total"] == 60
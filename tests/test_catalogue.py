@@ -0,0 +1,42 @@
+import os
+
+import pytest
+
+from ABC import Canteen, Library, MappedSnapshot, StorageEngine
+
+
+def test_library_db_stays_keyed_by_title(tmp_path):
+    library = Library("Central Library", {"Digital Logic": {"rentable": 1, "non_rentable": 2}})
+    library_db = {}
+    library.update_db(library_db)
+    library.add_rentable_book("Digital Logic", 3)
+
+    assert Library.get_rentable_books(library_db) == {"Digital Logic": 1}
+    assert Library.get_non_rentable_books(library_db) == {"Digital Logic": 2}
+    path = os.path.join(tmp_path, "library.snap")
+    MappedSnapshot.write(path, "library", library_db)
+    assert MappedSnapshot(path)["Digital Logic"] == {"rentable": 1, "non_rentable": 2}
+
+
+def test_library_db_round_trips_through_a_persistent_dict(tmp_path):
+    path = str(tmp_path / "campus.log")
+    library = Library("Central Library", {"Digital Logic": {"rentable": 1, "non_rentable": 2}})
+    engine = StorageEngine(path)
+    library_db = engine.table("library")
+    library.update_db(library_db)
+    engine.commit()
+    with pytest.raises(TypeError):
+        library_db["Digital Logic"]["rentable"] = 5
+    engine.close()
+
+    reopened = StorageEngine(path).table("library")
+    assert reopened["Digital Logic"] == {"rentable": 1, "non_rentable": 2}
+    assert Library.get_rentable_books(reopened) == {"Digital Logic": 1}
+
+
+def test_approved_items_are_republished():
+    canteen = Canteen("IET Cafeteria", {"Coffee": 20})
+    canteen_db = {}
+    canteen.update_db(canteen_db)
+    canteen.request_item("Pizza", 80)
+    assert canteen_db["IET Cafeteria"]["Pizza"] == 80
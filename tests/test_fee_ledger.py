@@ -0,0 +1,53 @@
+import threading
+
+from ABC import AccountsDepartment, FeeLedger, Hostel
+
+
+def test_post_updates_balances_history_and_student(make_student):
+    ledger = FeeLedger(stripes=4)
+    student = make_student(1)
+    ledger.post(student, 15000, "hostel_fees")
+    ledger.post(student, 500, "hostel_penalty")
+    ledger.post(student, -500, "hostel_penalty")
+
+    assert student.fees == 15000
+    assert ledger.balance("S1") == 15000 and ledger.balance("S1", "hostel_penalty") == 0
+    assert [entry["amount"] for entry in ledger.history("S1")] == [15000, 500, -500]
+    assert ledger.totals("hostel_penalty") == {} and ledger.totals() == {"S1": 15000}
+
+
+def test_entries_are_in_posting_order_across_stripes(make_student):
+    ledger = FeeLedger(stripes=8)
+    students = [make_student(i) for i in range(20)]
+    for i, student in enumerate(students * 2):
+        ledger.post(student, i, "tuition")
+    assert [entry["amount"] for entry in ledger.entries()] == list(range(40))
+
+
+def test_concurrent_payments_are_not_lost(make_student):
+    ledger = FeeLedger(stripes=4)
+    students = [make_student(i) for i in range(10)]
+    accounts = AccountsDepartment("Accounts", ledger)
+
+    def pay():
+        for _ in range(500):
+            for student in students:
+                accounts.pay_fees(student, 1)
+
+    threads = [threading.Thread(target=pay) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert accounts.fees_paid == {f"S{i}": 2000 for i in range(10)}
+    assert all(student.fees == 2000 for student in students)
+
+
+def test_hostel_and_accounts_share_the_ledger(make_student, student_db):
+    ledger = FeeLedger()
+    student_db.add(make_student(1))
+    hostel = Hostel("Raman Hostel", {}, ledger=ledger, capacity=2)
+    hostel.add_room_members("101", student_db["S1"])
+    hostel.pay_fees("101", 15000, student_db)
+    AccountsDepartment("Accounts", ledger).pay_fees(student_db["S1"], 50000)
+    assert ledger.balance("S1") == 65000 and ledger.balance("S1", "tuition") == 50000
@@ -0,0 +1,41 @@
+import os
+
+import pytest
+
+from ABC import Faculty, MappedSnapshot
+
+
+def test_student_snapshot_round_trip(tmp_path, make_student, btech):
+    db = {s.student_id: s for s in (make_student(i, f"Stüdent {i}") for i in (3, 1, 2))}
+    db["S2"].fees = 45000
+    path = os.path.join(tmp_path, "students.snap")
+    MappedSnapshot.write(path, "student", db)
+    snapshot = MappedSnapshot(path)
+
+    assert snapshot.kind == "student" and len(snapshot) == 3
+    assert list(snapshot) == ["S1", "S2", "S3"]
+    student = snapshot["S2"]
+    assert (student.name, student.fees, student.roll_no, student.email) == ("Stüdent 2", 45000, "R2", "s2@college.edu")
+    assert student.course.course_id == btech.course_id and snapshot["S3"].course is student.course
+    assert snapshot["S2"] is student  # materialized once
+    assert "S1" in snapshot and "S9" not in snapshot and 5 not in snapshot
+    with pytest.raises(KeyError):
+        snapshot["S9"]
+    snapshot.close()
+
+
+def test_faculty_and_library_snapshots(tmp_path):
+    faculty_path, library_path = os.path.join(tmp_path, "faculty.snap"), os.path.join(tmp_path, "library.snap")
+    MappedSnapshot.write(faculty_path, "faculty", {"F1": Faculty("F1", "Dr. Rao", "Civil", "8000000001", "rao@college.edu")})
+    MappedSnapshot.write(library_path, "library", {"Digital Logic": {"rentable": 2, "non_rentable": 1}})
+
+    assert MappedSnapshot(faculty_path)["F1"].department == "Civil"
+    assert MappedSnapshot(library_path)["Digital Logic"] == {"rentable": 2, "non_rentable": 1}
+
+
+def test_rejects_files_that_are_not_snapshots(tmp_path):
+    path = os.path.join(tmp_path, "junk.snap")
+    with open(path, "wb") as f:
+        f.write(b"JUNK" + bytes(16))
+    with pytest.raises(ValueError, match="not a snapshot"):
+        MappedSnapshot(path)
@@ -0,0 +1,35 @@
+from ABC import Club, CollegeEntity, Hostel, Library, Society
+
+
+def test_offboard_removes_memberships_and_reports_loans(student_db, make_student):
+    for i in (1, 2):
+        student_db.add(make_student(i))
+    s1, s2 = student_db["S1"], student_db["S2"]
+    club = Club("Dance Club", None, None, {})
+    club.add_member("S1")
+    club.add_member("S2")
+    society = Society("NSS", "Dr. Rao")
+    society.add_member(s1.name, "S1", s1.branch)
+    society.add_volunteer(s1.name, "S1", s1.branch)
+    hostel = Hostel("Raman Hostel", {})
+    hostel.add_room("101", 2)
+    hostel.add_room_members("101", s1, s2)
+    library = Library("Central Library", {"Digital Logic": {"rentable": 2, "non_rentable": 0}})
+    library.issue_book("Digital Logic", s1)
+
+    registry = CollegeEntity.registry
+    assert len(registry.affiliations("S1")) == 5
+    outstanding = registry.offboard(["S1"])
+
+    assert outstanding == {"S1": [{"library": "Central Library", "title": "Digital Logic"}]}
+    assert "S1" not in club.members and "S1" not in society.members and "S1" not in society.volunteers
+    assert hostel.rooms["101"] == (s2,)
+    assert registry.affiliations("S1") == [{"kind": "library", "entity": "Central Library", "detail": "Digital Logic"}]
+    library.return_book("Digital Logic", s1)
+    assert registry.affiliations("S1") == []
+    # roommates and other members are untouched
+    assert "S2" in club.members and len(registry.affiliations("S2")) == 2
+
+
+def test_offboard_unknown_student_is_a_no_op():
+    assert CollegeEntity.registry.offboard(["S404"]) == {}
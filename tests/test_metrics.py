@@ -0,0 +1,81 @@
+import asyncio
+import os
+
+import pytest
+
+import ABC
+from ABC import CollegeEntity, Histogram, MetricsRegistry, timed
+
+
+def test_histogram_percentiles_are_bucket_upper_bounds():
+    histogram = Histogram()
+    assert histogram.percentile(0.5) == 0.0
+    for value in [1.5e-6] * 90 + [1e-3] * 9 + [1e3]:
+        histogram.observe(value)
+    assert histogram.percentile(0.5) == 2e-6
+    assert histogram.percentile(0.95) == Histogram.BOUNDS[10] >= 1e-3
+    assert histogram.percentile(1.0) == float("inf")
+
+
+def test_registry_snapshot_reset_and_dump(tmp_path):
+    registry = MetricsRegistry()
+    registry.observe("Library.issue_book", 0.002)
+    registry.observe("Library.issue_book", 0.004, error=True)
+    registry.observe("Hostel.pay_fees", 0.5)
+    snapshot = registry.snapshot()
+    assert snapshot["Library.issue_book"]["count"] == 2 and snapshot["Library.issue_book"]["errors"] == 1
+    assert snapshot["Library.issue_book"]["total_s"] == pytest.approx(0.006)
+    assert registry.render_text().splitlines()[1].startswith("Hostel.pay_fees")
+    assert 'cms_operation_errors_total{op="Library.issue_book"} 1' in registry.render_prometheus()
+
+    path = os.path.join(tmp_path, "metrics.prom")
+    registry.dump(path, format="prometheus")
+    with open(path) as f:
+        assert f.read() == registry.render_prometheus()
+
+    metric = registry.metric("Hostel.pay_fees")
+    registry.reset()
+    assert registry.snapshot() == {} and registry.metric("Hostel.pay_fees") is metric
+
+
+def test_timed_records_calls_and_errors(monkeypatch):
+    registry = MetricsRegistry()
+    monkeypatch.setattr(ABC, "metrics", registry)
+
+    @timed("sync")
+    def work(fail):
+        if fail:
+            raise ValueError("boom")
+        return "done"
+
+    @timed("async")
+    async def work_async():
+        return "done"
+
+    assert work(False) == "done"
+    with pytest.raises(ValueError):
+        work(True)
+    assert asyncio.run(work_async()) == "done"
+    registry.enabled = False
+    work(False)
+    snapshot = registry.snapshot()
+    assert (snapshot["sync"]["count"], snapshot["sync"]["errors"], snapshot["async"]["count"]) == (2, 1, 1)
+
+
+def test_entities_are_instrumented_automatically(monkeypatch):
+    registry = MetricsRegistry()
+    monkeypatch.setattr(ABC, "metrics", registry)
+
+    class Kiosk(CollegeEntity):
+        def open(self):
+            return self._serve()
+
+        def _serve(self):
+            return "open"
+
+        @staticmethod
+        def hours():
+            return 8
+
+    assert Kiosk("Annexe").open() == "open" and Kiosk.hours() == 8
+    assert set(registry.snapshot()) == {"Kiosk.open", "Kiosk.hours"}
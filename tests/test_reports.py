@@ -0,0 +1,19 @@
+import os
+
+from ABC import Club, ReportGenerator
+
+
+def test_reports_leave_no_snapshot_behind(tmp_path, student_db, make_student):
+    for i in range(1, 4):
+        student_db.add(make_student(i))
+    club = Club("Dance Club", None, None, {})
+    club.add_member("S1")
+    club.add_member("S3")
+    out_dir = str(tmp_path / "reports")
+
+    results = list(ReportGenerator(out_dir, formats=("txt", "csv"), workers=1).generate(student_db, clubs=[club]))
+
+    assert [(kind, count) for kind, count, paths in results] == [("club", 1)]
+    assert sorted(os.listdir(out_dir)) == ["club"]
+    with open(os.path.join(out_dir, "club", "Dance_Club.csv")) as f:
+        assert [line.split(",")[0] for line in f.read().splitlines()] == ["student_id", "S1", "S3"]
@@ -0,0 +1,27 @@
+from ABC import Library, SearchIndex
+
+
+def test_reindexing_reuses_doc_slots(student_db, make_student):
+    db = student_db
+    db.add(make_student(1, "Amit Sharma"))
+    index = SearchIndex().watch(db, {}, Library("Central Library", {}))
+    for i in range(1000):
+        db.update_student("S1", name=f"Amit Sharma {i}")
+    index.add_student(db["S1"])
+
+    assert len(index) == 1 and len(index._docs) == 1
+    assert [hit["key"] for hit in index.search("amit 999")] == ["S1"]
+    assert not index._postings["998"]  # stale tokens no longer point at the doc
+
+
+def test_removed_slots_are_reused(student_db, make_student):
+    db = student_db
+    index = SearchIndex().watch(db, {}, None)
+    for i in range(100):
+        db.add(make_student(i, f"Riya Verma {i}"))
+        del db[f"S{i}"]
+    db.add(make_student(100, "Neha Agarwal"))
+
+    assert len(index._docs) == 1
+    assert index.search("riya") == []
+    assert [hit["key"] for hit in index.search("neha agrawal")] == ["S100"]
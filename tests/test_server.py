@@ -0,0 +1,72 @@
+import asyncio
+import json
+
+import pytest
+
+from ABC import CampusClient, CampusServer, Canteen, Library
+
+
+@pytest.fixture
+def campus(student_db, make_student):
+    for i in (1, 2):
+        student_db.add(make_student(i))
+    return {"student_db": student_db, "canteen": Canteen("IET Cafeteria", {"Coffee": 20}),
+            "library": Library("Central Library", {"Digital Logic": {"rentable": 1, "non_rentable": 0}})}
+
+
+def serve(campus, scenario):
+    async def main():
+        server = CampusServer(campus["student_db"], library=campus["library"], canteen=campus["canteen"])
+        host, port = await server.start()
+        client = await CampusClient.connect(host, port)
+        try:
+            return await scenario(server, client)
+        finally:
+            await client.close()
+            await server.close()
+    return asyncio.run(main())
+
+
+def test_pipelined_requests_get_their_own_replies(campus):
+    async def scenario(server, client):
+        return await asyncio.gather(client.call("student.get", student_id="S1"),
+                                    client.call("library.issue_book", title="Digital Logic", student_id="S2"),
+                                    client.call("library.availability", title="Digital Logic"),
+                                    client.call("canteen.order", student_id="S1", item="Coffee", quantity=2))
+    student, issued, availability, order_id = serve(campus, scenario)
+    assert student["name"] == "Student 1" and issued is True and availability["rentable"] == 0
+    assert campus["canteen"].orders[order_id]["total"] == 40
+
+
+@pytest.mark.parametrize("args, error", [
+    ({"student_id": "S1", "item": "Coffee", "quantity": "2"}, "TypeError: Argument 'quantity' for 'canteen.order' must be int, got str"),
+    ({"student_id": "S1", "item": "Coffee", "quantity": True}, "must be int, got bool"),
+    ({"student_id": "S1", "item": "Coffee", "quantity": 0}, "ValueError: Quantity must be a positive whole number"),
+    ({"student_id": ["S1"], "item": "Coffee"}, "Argument 'student_id' for 'canteen.order' must be str, got list"),
+    ({"student_id": "S9", "item": "Coffee"}, "KeyError: Unknown student 'S9'"),
+])
+def test_bad_arguments_come_back_as_errors(campus, args, error):
+    async def scenario(server, client):
+        with pytest.raises(RuntimeError) as excinfo:
+            await client.call("canteen.order", **args)
+        return str(excinfo.value), server.errors
+    message, errors = serve(campus, scenario)
+    assert error in message and errors == 1
+    assert campus["canteen"].orders == {}
+
+
+def test_malformed_lines_and_unencodable_results_still_get_a_reply(campus):
+    async def scenario(server, client):
+        server._register("debug.circular", lambda a: a.setdefault("self", a))
+        reader, writer = await asyncio.open_connection(*server.address)
+        writer.write(b'not json\n{"id": 7, "op": "student.get", "args": "S1"}\n')
+        replies = [json.loads(await reader.readline()) for _ in range(2)]
+        writer.close()
+        with pytest.raises(RuntimeError, match="could not be encoded"):
+            await client.call("debug.circular")
+        stats = await client.call("server.stats")
+        return replies, stats
+    replies, stats = serve(campus, scenario)
+    assert replies[0]["ok"] is False and replies[0]["error"].startswith("JSONDecodeError")
+    assert replies[1] == {"id": 7, "ok": False, "error": "TypeError: Arguments for 'student.get' must be an object, got str"}
+    assert stats["errors"] == 3
@@ -0,0 +1,42 @@
+import io
+import json
+import os
+
+import pytest
+
+from ABC import JsonLinesSink, NullSink, OutputSink, PrintSink
+
+
+def test_print_and_null_sinks(capsys):
+    PrintSink().emit({"event": "club.member_added", "entity": "Dance Club", "message": "S1 added"})
+    NullSink().emit({"event": "club.member_added", "entity": "Dance Club", "message": "dropped"})
+    assert capsys.readouterr().out == "S1 added\n"
+    with pytest.raises(NotImplementedError):
+        OutputSink().emit({})
+
+
+def test_json_lines_sink_buffers_until_batch_or_flush():
+    stream = io.StringIO()
+    sink = JsonLinesSink(stream, batch_size=3)
+    for i in range(4):
+        sink.emit({"event": "e", "entity": "Library", "message": f"m{i}", "n": i})
+    assert [json.loads(line)["n"] for line in stream.getvalue().splitlines()] == [0, 1, 2]
+    sink.flush()
+    records = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert [r["n"] for r in records] == [0, 1, 2, 3] and all("ts" in r for r in records)
+    sink.close()
+    assert not stream.closed  # streams passed in belong to the caller
+
+
+@pytest.mark.parametrize("background", [False, True])
+def test_json_lines_sink_writes_every_record_to_a_path(tmp_path, background):
+    path = os.path.join(tmp_path, "events.jsonl")
+    sink = JsonLinesSink(path, batch_size=7, background=background)
+    for i in range(100):
+        sink.emit({"event": "e", "entity": "Hostel", "message": "naïve", "n": i, "when": tmp_path})
+    sink.close()
+    assert sink.stream.closed
+    with open(path, encoding="utf-8") as f:
+        records = [json.loads(line) for line in f]
+    assert [r["n"] for r in records] == list(range(100))
+    assert records[0]["message"] == "naïve" and records[0]["when"] == str(tmp_path)
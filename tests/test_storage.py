@@ -0,0 +1,77 @@
+import os
+
+import pytest
+
+from ABC import AccountsDepartment, FeeLedger, StorageEngine, StudentStore
+
+
+def test_in_place_updates_survive_restart(tmp_path, make_student):
+    engine = StorageEngine(str(tmp_path / "campus.log"))
+    db = StudentStore(engine.table("students"))
+    db.add(make_student(1))
+    db.update_student("S1", name="Persist")
+    AccountsDepartment("Accounts", FeeLedger(), db).pay_fees(db["S1"], 5000)
+    engine.close()
+
+    student = StorageEngine(str(tmp_path / "campus.log")).table("students")["S1"]
+    assert (student.name, student.fees) == ("Persist", 5000)
+
+
+def test_torn_tail_is_truncated_and_log_stays_usable(tmp_path):
+    path = str(tmp_path / "campus.log")
+    engine = StorageEngine(path)
+    engine.table("t")["a"] = 1
+    engine.commit()
+    engine.table("t")["b"] = 2
+    engine.close()
+    valid = os.path.getsize(path)
+    with open(path, "ab") as f:
+        f.write(b"\x80\x05\x95partial batch")  # crash halfway through a commit
+
+    engine = StorageEngine(path)
+    assert dict(engine.table("t")) == {"a": 1, "b": 2}
+    assert os.path.getsize(path) == valid
+    engine.table("t")["c"] = 3
+    engine.close()
+    assert dict(StorageEngine(path).table("t")) == {"a": 1, "b": 2, "c": 3}
+
+
+def test_replay_after_snapshot_skips_checkpointed_batches(tmp_path):
+    path = str(tmp_path / "campus.log")
+    engine = StorageEngine(path)
+    engine.table("t")["k"] = "old"
+    engine.commit()
+    with open(path, "rb") as f:
+        stale_log = f.read()
+    engine.table("t")["k"] = "new"
+    engine.table("t")["gone"] = 1
+    engine.checkpoint()
+    del engine.table("t")["gone"]
+    engine.table("t")["after"] = 1
+    engine.close()
+    # crash between writing the snapshot and truncating the log: old batches reappear
+    with open(path, "rb") as f:
+        tail = f.read()
+    with open(path, "wb") as f:
+        f.write(stale_log + tail)
+
+    assert dict(StorageEngine(path).table("t")) == {"k": "new", "after": 1}
+
+
+def test_unpicklable_value_leaves_log_untouched(tmp_path):
+    path = str(tmp_path / "campus.log")
+    engine = StorageEngine(path, batch_size=100_000)
+    engine.table("t")["before"] = 1
+    engine.commit()
+    size = os.path.getsize(path)
+    for i in range(20_000):
+        engine.table("t")[i] = "x" * 16
+    engine.table("t")["bad"] = lambda: None
+    with pytest.raises(Exception):
+        engine.commit()
+    assert os.path.getsize(path) == size and engine._lsn == 1
+
+    engine.table("t")["bad"] = "fixed"  # the batch is still pending and commits once it is picklable
+    engine.close()
+    reopened = StorageEngine(path).table("t")
+    assert len(reopened) == 20_002 and reopened["bad"] == "fixed"
@@ -0,0 +1,51 @@
+import pytest
+
+from ABC import Department
+
+
+def test_unique_indexes_reject_duplicates(student_db, make_student):
+    student_db.add(make_student(1))
+    clash = make_student(2)
+    clash.email = "s1@college.edu"
+    with pytest.raises(ValueError, match="email"):
+        student_db.add(clash)
+    assert "S2" not in student_db and student_db.get_by("email", "s1@college.edu").student_id == "S1"
+
+
+def test_update_student_moves_index_entries(student_db, make_student):
+    student_db.add(make_student(1, branch="Civil"))
+    student_db.add(make_student(2, branch="Civil"))
+    student_db.update_student("S1", roll_no="R100", branch="Electronics", year=2)
+
+    assert student_db.get_by("roll_no", "R1") is None
+    assert student_db.get_by("roll_no", "R100").student_id == "S1"
+    assert [s.student_id for s in student_db.find_by("branch", "Civil")] == ["S2"]
+    assert [s.student_id for s in student_db.find_by("branch", "Electronics")] == ["S1"]
+    assert [s.student_id for s in student_db.find_by("year", 2)] == ["S1"]
+    with pytest.raises(ValueError, match="roll_no"):
+        student_db.update_student("S2", roll_no="R100")
+    with pytest.raises(ValueError):
+        student_db.update_student("S2", hostel="Raman")
+    assert student_db["S2"].roll_no == "R2"
+
+
+def test_delete_and_replace_unindex_the_old_record(student_db, make_student):
+    student_db.add(make_student(1))
+    student_db.add(make_student(2))
+    del student_db["S1"]
+    assert student_db.get_by("email", "s1@college.edu") is None
+    assert [s.student_id for s in student_db.find_by("branch", "Civil")] == ["S2"]
+
+    student_db["S2"] = make_student(2, branch="Electronics")
+    assert student_db.find_by("branch", "Civil") == []
+    assert student_db.get_by("roll_no", "R2") is student_db["S2"]
+    with pytest.raises(ValueError):
+        student_db.find_by("email", "s2@college.edu")
+
+
+def test_derived_department_roster_is_read_only(student_db, make_student, btech):
+    civil = Department("D01", "Civil", [btech], None, student_db, [], {})
+    civil.add_student(make_student(1))
+    assert [s.student_id for s in civil.students] == ["S1"]
+    with pytest.raises(AttributeError):
+        civil.students.append(make_student(2))
@@ -0,0 +1,183 @@
+import random
+import threading
+
+import pytest
+
+from ABC import (Academic, AccountsDepartment, Club, CollegeEntity, FeeLedger, Hostel, Library, TransactionAborted,
+                 TransactionConflict, TransactionManager)
+
+
+@pytest.fixture
+def campus(student_db, make_student):
+    db = student_db
+    for i in range(1, 4):
+        db.add(make_student(i))
+    ledger = FeeLedger()
+    hostel = Hostel("Raman Hostel", {}, ledger=ledger)
+    hostel.add_room("101", 2)
+    return {"db": db, "ledger": ledger, "hostel": hostel, "accounts": AccountsDepartment("Accounts", ledger, db),
+            "library": Library("Central Library", {"Digital Logic": {"rentable": 1, "non_rentable": 0}}),
+            "academic": Academic("Academic Block"), "club": Club("Dance Club", None, None, {})}
+
+
+def state(campus):
+    return (campus["ledger"].totals(), {sid: s.fees for sid, s in campus["db"].items()}, dict(campus["hostel"].rooms),
+            dict(campus["library"].books), dict(campus["library"].loans), dict(campus["club"].members),
+            {sid: campus["academic"].transcript(sid) for sid in campus["db"]})
+
+
+def test_failed_operation_rolls_back_every_entity(campus):
+    db, manager = campus["db"], TransactionManager()
+    before = state(campus)
+    tx = manager.transaction()
+    tx.call(campus["hostel"], "add_room_members", "101", db["S1"], db["S2"])
+    tx.call(campus["hostel"], "pay_fees", "101", 15000, db)
+    tx.call(campus["accounts"], "pay_fees", db["S1"], 50000)
+    tx.call(campus["club"], "add_member", "S3")
+    tx.call(campus["academic"], "assign_grade", None, db["S1"], 1, 1, "OOP", "A")
+    tx.call(campus["library"], "issue_book", "Digital Logic", db["S1"])
+    tx.call(campus["library"], "issue_book", "Digital Logic", db["S2"])  # no copies left
+    with pytest.raises(TransactionAborted, match="unavailable"):
+        tx.commit()
+
+    assert state(campus) == before
+    assert CollegeEntity.registry.affiliations("S1") == []
+    assert manager.stats()["aborts"] == 1
+
+
+def test_hostel_fee_failure_mid_room_refunds_charged_students(campus):
+    class FlakyDb(dict):
+        def __getitem__(self, student_id):
+            if student_id == "S2":
+                raise KeyError(student_id)  # payment gateway loses the second roommate
+            return super().__getitem__(student_id)
+
+    db = FlakyDb(campus["db"].items())
+    hostel = campus["hostel"]
+    hostel.add_room_members("101", db["S1"], campus["db"]["S2"])
+    tx = TransactionManager().transaction()
+    tx.call(hostel, "pay_fees", "101", 15000, db)
+    with pytest.raises(TransactionAborted, match="KeyError"):
+        tx.commit()
+
+    assert campus["ledger"].balance("S1", "hostel_fees") == 0
+    assert db["S1"].fees == 0
+
+
+def test_stale_read_conflicts_and_run_retries(campus):
+    manager, library, db = TransactionManager(), campus["library"], campus["db"]
+    stale = manager.transaction()
+    stale.read(library)
+    stale.call(campus["accounts"], "pay_fees", db["S1"], 100)
+    manager.transaction().call(library, "issue_book", "Digital Logic", db["S2"]).commit()
+    with pytest.raises(TransactionConflict, match="Central Library"):
+        stale.commit()
+    assert campus["ledger"].balance("S1") == 0  # nothing from the refused commit ran
+
+    attempts = []
+
+    def build(tx):
+        attempts.append(tx)
+        tx.read(library)
+        if len(attempts) == 1:  # someone else commits between our read and our commit
+            manager.transaction().call(library, "update_db", {}).commit()
+        tx.call(campus["accounts"], "pay_fees", db["S1"], 100)
+
+    assert manager.run(build) == [True]
+    assert len(attempts) == 2 and campus["ledger"].balance("S1") == 100
+    assert manager.stats()["conflicts"] == 2
+
+
+def test_concurrent_circulation_never_oversells(make_student):
+    threads, titles, copies = 8, 5, 3
+    library = Library("Stress Library", {f"Title {t}": {"rentable": copies, "non_rentable": 0} for t in range(titles)})
+    students = [make_student(i) for i in range(200)]
+    barrier = threading.Barrier(threads)
+
+    def worker(seed):
+        rng = random.Random(seed)
+        barrier.wait()
+        for _ in range(200):
+            title, student = f"Title {rng.randrange(titles)}", rng.choice(students)
+            if rng.random() < 0.6:
+                library.issue_book(title, student)
+            else:
+                library.return_book(title, student)
+            library.issue_books([(f"Title {rng.randrange(titles)}", rng.choice(students)) for _ in range(3)])
+
+    workers = [threading.Thread(target=worker, args=(seed,)) for seed in range(threads)]
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+
+    assert all(book["rentable"] >= 0 for book in library.books.values())
+    assert sum(book["rentable"] for book in library.books.values()) + len(library.loans) == titles * copies
+    for t in range(titles):
+        assert library.availability(f"Title {t}")["rentable"] == library.books[f"Title {t}"]["rentable"]
+
+
+def test_rollback_restores_empty_rooms_and_reservations(campus):
+    db, hostel, library = campus["db"], campus["hostel"], campus["library"]
+    hostel.rooms["102"] = ()
+    library.reserve_book("Digital Logic", db["S1"])
+    library.reserve_book("Digital Logic", db["S2"])
+    waitlist = dict(library.waitlist["Digital Logic"])
+    tx = TransactionManager().transaction()
+    tx.call(hostel, "add_room_members", "102", db["S3"])
+    tx.call(library, "issue_book", "Digital Logic", db["S1"])
+    tx.call(library, "issue_book", "Digital Logic", db["S3"])  # the only copy is gone
+    with pytest.raises(TransactionAborted, match="unavailable"):
+        tx.commit()
+
+    assert hostel.rooms["102"] == () and "101" not in hostel.rooms
+    assert library.waitlist["Digital Logic"] == waitlist and list(library.waitlist["Digital Logic"]) == ["S1", "S2"]
+    assert library.loans == {} and library.books["Digital Logic"]["rentable"] == 1
+
+
+def test_every_undo_runs_and_failures_are_reported_together(campus):
+    db, club = campus["db"], campus["club"]
+
+    def broken_undo(result):
+        raise RuntimeError("undo exploded")
+
+    tx = TransactionManager().transaction()
+    tx.call(club, "add_member", "S1")
+    tx.call(campus["accounts"], "pay_fees", db["S1"], 500)
+    tx.call(club, "change_secretary", db["S2"], undo=broken_undo)
+    tx.call(club, "add_member", "S9")  # not in the database
+    with pytest.raises(TransactionAborted) as excinfo:
+        tx.commit()
+
+    assert "S9 not found" in str(excinfo.value) and "RuntimeError: undo exploded" in str(excinfo.value)
+    assert [str(error) for error in excinfo.value.undo_errors] == ["undo exploded"]
+    assert "S1" not in club.members and campus["ledger"].balance("S1") == 0
+
+
+def test_fee_confirmations_run_outside_the_manager_lock(campus, monkeypatch):
+    db, hostel, manager = campus["db"], campus["hostel"], TransactionManager()
+    hostel.add_room_members("101", db["S1"], db["S2"])
+    confirmed, blocked = [], []
+    confirm = hostel._confirm
+
+    def slow_confirm(room_no, student, amount):
+        # another thread must be able to commit while the gateway is slow
+        other = threading.Thread(target=lambda: manager.transaction().call(campus["accounts"], "pay_fees", db["S3"], 100).commit())
+        other.start()
+        other.join(timeout=5)
+        blocked.append(other.is_alive())
+        confirm(room_no, student, amount)
+        confirmed.append(student.student_id)
+
+    monkeypatch.setattr(hostel, "_confirm", slow_confirm)
+    manager.transaction().call(hostel, "pay_fees", "101", 15000, db).commit()
+    assert confirmed == ["S1", "S2"] and blocked == [False, False]
+    assert campus["ledger"].balance("S3") == 200
+
+    tx = manager.transaction()
+    tx.call(hostel, "pay_fees", "101", 15000, db)
+    tx.call(campus["club"], "add_member", "S9")
+    with pytest.raises(TransactionAborted):
+        tx.commit()
+    assert confirmed == ["S1", "S2"]  # nothing is confirmed for a rolled-back charge
+    assert campus["ledger"].balance("S1", "hostel_fees") == 15000